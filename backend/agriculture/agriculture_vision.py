@@ -1,17 +1,25 @@
 import os
 os.environ['KMP_DUPLICATE_LIB_OK']='TRUE'
 
-# import torch  # Temporarily commented out
+import torch
 import torch.nn as nn
 import torchvision.transforms as transforms
-from torchvision.models import resnet18, ResNet18_Weights
+from torchvision.models import (
+    resnet18, ResNet18_Weights,
+    mobilenet_v3_small,
+)
 from PIL import Image
 import numpy as np
 import io
 import base64
+from .cascade import CascadeStage, run_cascade
+from .inference import OptimizedRunner
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), 'models')
 
 class AgricultureVisionAnalyzer:
-    def __init__(self):
+    def __init__(self, cascade=False, cascade_model='mobilenet', cascade_threshold=0.9,
+                 optimized=False, jit_freeze=False):
         print("Initializing AgricultureVisionAnalyzer...")
         # Initialize model architecture
         self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
@@ -26,34 +34,27 @@ class AgricultureVisionAnalyzer:
         print(f"Modified final layer for {num_classes} classes")
         
         # Load trained weights if they exist
-        model_path = os.path.join(os.path.dirname(__file__), 'models', 'plant_disease_model.pth')
-        print(f"Looking for model weights at: {model_path}")
-        
-        if os.path.exists(model_path):
-            try:
-                state_dict = torch.load(model_path, map_location=self.device)
-                self.model.load_state_dict(state_dict)
-                print("Model weights loaded successfully!")
-            except Exception as e:
-                print(f"Error loading model weights: {str(e)}")
-                print("Using initialized model instead")
-        else:
-            print("Warning: Model weights file not found at:", model_path)
-            print("Using initialized model")
+        self._load_weights(self.model, os.path.join(MODEL_DIR, 'plant_disease_model.pth'))
         
         self.model = self.model.to(self.device)
         self.model.eval()
         print("Model ready for inference")
         
         # Define image transformations
-        self.transform = transforms.Compose([
-            transforms.Resize((224, 224)),
-            transforms.ToTensor(),
-            transforms.Normalize(
-                mean=[0.485, 0.456, 0.406],
-                std=[0.229, 0.224, 0.225]
-            )
-        ])
+        self.transform = self._build_transform(224)
+
+        # Optional inference_mode/channels-last/oneDNN path with pooled inputs
+        self.runner = OptimizedRunner(self.model, self.device, freeze=jit_freeze) if optimized else None
+
+        # Optional early-exit cascade: a cheap first stage answers confident
+        # images and only uncertain ones escalate to the full model
+        self.cascade_stages = None
+        if cascade:
+            self.cascade_stages = [
+                self._build_first_stage(cascade_model, cascade_threshold, num_classes),
+                CascadeStage('resnet18', self.model, self.transform, threshold=0.0, runner=self.runner),
+            ]
+            print(f"Cascade enabled: {self.cascade_stages[0].name} (threshold {cascade_threshold})")
         
         # PlantVillage disease classes
         self.classes = [
@@ -97,34 +98,88 @@ class AgricultureVisionAnalyzer:
             'Tomato___healthy'
         ]
 
+    def _load_weights(self, model, model_path):
+        """Load trained weights into ``model`` if the file exists"""
+        print(f"Looking for model weights at: {model_path}")
+        
+        if os.path.exists(model_path):
+            try:
+                state_dict = torch.load(model_path, map_location=self.device)
+                model.load_state_dict(state_dict)
+                print("Model weights loaded successfully!")
+            except Exception as e:
+                print(f"Error loading model weights: {str(e)}")
+                print("Using initialized model instead")
+        else:
+            print("Warning: Model weights file not found at:", model_path)
+            print("Using initialized model")
+
+    def _build_transform(self, size):
+        return transforms.Compose([
+            transforms.Resize((size, size)),
+            transforms.ToTensor(),
+            transforms.Normalize(
+                mean=[0.485, 0.456, 0.406],
+                std=[0.229, 0.224, 0.225]
+            )
+        ])
+
+    def _build_first_stage(self, kind, threshold, num_classes):
+        """Build the cheap first cascade stage"""
+        if kind == 'downscale':
+            # Same ResNet18 on a 112px input: ~4x fewer FLOPs, no extra weights
+            runner = OptimizedRunner(self.model, self.device, size=112, freeze=self.runner.freeze) if self.runner else None
+            return CascadeStage('resnet18-112px', self.model, self._build_transform(112), threshold, runner)
+        if kind != 'mobilenet':
+            raise ValueError(f"Unknown cascade model: {kind}")
+
+        # Only the fine-tuned weights make a useful first stage; never fetch
+        # the ImageNet ones on a request (download_model.py builds the file)
+        model_path = os.path.join(MODEL_DIR, 'plant_disease_model_small.pth')
+        if not os.path.exists(model_path):
+            print(f"Warning: {model_path} not found, using the 112px ResNet18 first stage")
+            return self._build_first_stage('downscale', threshold, num_classes)
+        model = mobilenet_v3_small(weights=None)
+        model.classifier[3] = nn.Linear(model.classifier[3].in_features, num_classes)
+        self._load_weights(model, model_path)
+        model = model.to(self.device)
+        model.eval()
+        runner = OptimizedRunner(model, self.device, freeze=self.runner.freeze) if self.runner else None
+        return CascadeStage('mobilenet_v3_small', model, self.transform, threshold, runner)
+
+    def load_image(self, image_data):
+        """Decode the supported upload formats into an RGB PIL image"""
+        if hasattr(image_data, 'read'):
+            # Handle uploaded file (InMemoryUploadedFile or similar)
+            print("Processing uploaded file")
+            image = Image.open(image_data)
+        elif isinstance(image_data, str) and image_data.startswith('data:image'):
+            # Handle base64 encoded images
+            print("Processing base64 image")
+            image_data = image_data.split(',')[1]
+            image_bytes = base64.b64decode(image_data)
+            image = Image.open(io.BytesIO(image_bytes))
+        elif isinstance(image_data, bytes):
+            # Handle direct binary image data
+            print("Processing binary image data")
+            image = Image.open(io.BytesIO(image_data))
+        else:
+            # Handle PIL Image
+            print("Processing PIL Image")
+            image = image_data
+        
+        # Convert to RGB if necessary
+        if image.mode != 'RGB':
+            print(f"Converting image from {image.mode} to RGB")
+            image = image.convert('RGB')
+        
+        return image
+
     def preprocess_image(self, image_data):
         """Preprocess the image for model input"""
         try:
             print(f"Preprocessing image of type: {type(image_data)}")
-            
-            if hasattr(image_data, 'read'):
-                # Handle uploaded file (InMemoryUploadedFile or similar)
-                print("Processing uploaded file")
-                image = Image.open(image_data)
-            elif isinstance(image_data, str) and image_data.startswith('data:image'):
-                # Handle base64 encoded images
-                print("Processing base64 image")
-                image_data = image_data.split(',')[1]
-                image_bytes = base64.b64decode(image_data)
-                image = Image.open(io.BytesIO(image_bytes))
-            elif isinstance(image_data, bytes):
-                # Handle direct binary image data
-                print("Processing binary image data")
-                image = Image.open(io.BytesIO(image_data))
-            else:
-                # Handle PIL Image
-                print("Processing PIL Image")
-                image = image_data
-            
-            # Convert to RGB if necessary
-            if image.mode != 'RGB':
-                print(f"Converting image from {image.mode} to RGB")
-                image = image.convert('RGB')
+            image = self.load_image(image_data)
             
             # Apply transformations
             print(f"Applying transformations to image of size {image.size}")
@@ -142,20 +197,33 @@ class AgricultureVisionAnalyzer:
         try:
             print("Starting plant disease analysis...")
             print(f"Image data type: {type(image_data)}")
+            stage_name = None
             
-            # Preprocess the image
-            input_tensor = self.preprocess_image(image_data)
-            print(f"Input tensor shape: {input_tensor.shape}")
-            input_tensor = input_tensor.to(self.device)
-            print(f"Device being used: {self.device}")
-            
-            # Get model predictions
-            with torch.no_grad():
-                print("Running model prediction...")
-                outputs = self.model(input_tensor)
-                print(f"Raw output shape: {outputs.shape}")
-                probabilities = torch.nn.functional.softmax(outputs, dim=1)
-                print(f"Probability shape: {probabilities.shape}")
+            if self.cascade_stages or self.runner:
+                try:
+                    image = self.load_image(image_data)
+                except Exception as e:
+                    raise Exception(f"Failed to process image: {str(e)}")
+                if self.cascade_stages:
+                    probabilities, stage_name = run_cascade(self.cascade_stages, image, self.device)
+                    print(f"Answered by cascade stage: {stage_name}")
+                else:
+                    print("Running optimized model prediction...")
+                    probabilities = self.runner.predict([image])
+            else:
+                # Preprocess the image
+                input_tensor = self.preprocess_image(image_data)
+                print(f"Input tensor shape: {input_tensor.shape}")
+                input_tensor = input_tensor.to(self.device)
+                print(f"Device being used: {self.device}")
+                
+                # Get model predictions
+                with torch.no_grad():
+                    print("Running model prediction...")
+                    outputs = self.model(input_tensor)
+                    print(f"Raw output shape: {outputs.shape}")
+                    probabilities = torch.nn.functional.softmax(outputs, dim=1)
+                    print(f"Probability shape: {probabilities.shape}")
                 
             # Get top prediction
             confidence, predicted_idx = torch.max(probabilities, 1)
@@ -206,13 +274,17 @@ class AgricultureVisionAnalyzer:
             # Generate recommendations based on the diagnosis
             recommendations = self._generate_recommendations(predicted_class, confidence_score)
             
-            return {
+            result = {
                 'status': 'Healthy' if is_healthy else 'Disease Detected',
                 'confidence': round(confidence_score, 1),
                 'diagnosis': predicted_class.replace('___', ' - '),
                 'details': details,
                 'recommendations': recommendations
             }
+            if stage_name:
+                # Which cascade stage answered (GET /api/agriculture/cascade-stats/ aggregates them)
+                result['cascade_stage'] = stage_name
+            return result
             
         except Exception as e:
             print(f"Error in prediction: {str(e)}")
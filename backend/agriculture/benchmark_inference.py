@@ -0,0 +1,81 @@
+"""
+Latency benchmark: default forward pass vs the optimized execution path.
+
+Run from backend/:
+
+    python -m agriculture.benchmark_inference --iterations 50 --batch-sizes 1 4 8
+
+Both paths start from decoded PIL images, so the numbers cover preprocessing
+plus the forward pass. The default path is ``preprocess_image`` followed by a
+``torch.no_grad()`` NCHW forward pass, exactly as ``analyze_plant_disease``
+does it.
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+from PIL import Image
+
+from .agriculture_vision import AgricultureVisionAnalyzer
+from .inference import OptimizedRunner
+
+
+def random_images(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        Image.fromarray(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))
+        for _ in range(count)
+    ]
+
+
+def default_predict(analyzer, images):
+    input_tensor = torch.cat([analyzer.transform(image).unsqueeze(0) for image in images])
+    input_tensor = input_tensor.to(analyzer.device)
+    with torch.no_grad():
+        outputs = analyzer.model(input_tensor)
+        return torch.nn.functional.softmax(outputs, dim=1)
+
+
+def measure(predict, images, iterations, warmup=3):
+    for _ in range(warmup):
+        predict(images)
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        predict(images)
+        timings.append((time.perf_counter() - started) * 1000)
+    return np.array(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--jit-freeze', action='store_true', help='TorchScript-freeze the optimized model')
+    args = parser.parse_args()
+
+    baseline = AgricultureVisionAnalyzer()
+    runner = OptimizedRunner(baseline.model, baseline.device, freeze=args.jit_freeze)
+
+    print(f"\ntorch {torch.__version__}, {torch.get_num_threads()} threads, "
+          f"oneDNN available: {torch.backends.mkldnn.is_available()}\n")
+    print(f"{'batch':>5} {'path':<10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'speedup':>8}")
+
+    for batch_size in args.batch_sizes:
+        images = random_images(batch_size)
+        expected = default_predict(baseline, images)
+        actual = runner.predict(images)
+        max_diff = (expected - actual).abs().max().item()
+
+        base = measure(lambda imgs: default_predict(baseline, imgs), images, args.iterations)
+        fast = measure(runner.predict, images, args.iterations)
+        for name, timings in (('default', base), ('optimized', fast)):
+            speedup = np.median(base) / np.median(timings)
+            print(f"{batch_size:>5} {name:<10} {timings.mean():>9.2f} {np.percentile(timings, 50):>9.2f} "
+                  f"{np.percentile(timings, 95):>9.2f} {speedup:>7.2f}x")
+        print(f"{'':>5} max |probability difference|: {max_diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
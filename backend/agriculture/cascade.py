@@ -0,0 +1,87 @@
+"""
+Early-exit cascade for the plant disease classifier.
+
+Each stage is a (model, transform, threshold) triple. Stages run in order and
+the first one whose top-1 probability clears its threshold answers; the last
+stage (the full ResNet18) always answers.
+"""
+import threading
+import time
+
+
+class CascadeStage:
+    def __init__(self, name, model, transform, threshold, runner=None):
+        self.name = name
+        self.model = model
+        self.transform = transform
+        self.threshold = threshold
+        self.runner = runner
+
+    def predict(self, image, device):
+        """Return the softmax probabilities for a PIL image"""
+        # Imported here so the stats below can be read without loading torch
+        import torch
+
+        if self.runner:
+            return self.runner.predict([image])
+        input_tensor = self.transform(image).unsqueeze(0).to(device)
+        with torch.no_grad():
+            outputs = self.model(input_tensor)
+            return torch.nn.functional.softmax(outputs, dim=1)
+
+
+class CascadeStats:
+    """Thread-safe per-stage run/hit counters shared by all analyzer instances"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = 0
+            self._stages = {}
+
+    def record(self, stage_name, seconds, answered, first=False):
+        with self._lock:
+            if first:
+                self._requests += 1
+            stage = self._stages.setdefault(stage_name, {'runs': 0, 'hits': 0, 'seconds': 0.0})
+            stage['runs'] += 1
+            stage['seconds'] += seconds
+            if answered:
+                stage['hits'] += 1
+
+    def snapshot(self):
+        """Hit rates are relative to all requests entering the cascade"""
+        with self._lock:
+            requests = self._requests
+            return {
+                'requests': requests,
+                'stages': {
+                    name: {
+                        'runs': stage['runs'],
+                        'hits': stage['hits'],
+                        'hit_rate': round(stage['hits'] / requests, 4) if requests else 0.0,
+                        'avg_ms': round(stage['seconds'] * 1000 / stage['runs'], 2) if stage['runs'] else 0.0,
+                    }
+                    for name, stage in self._stages.items()
+                },
+            }
+
+
+cascade_stats = CascadeStats()
+
+
+def run_cascade(stages, image, device, stats=cascade_stats):
+    """Run ``image`` through ``stages`` and return (probabilities, stage name)"""
+    for position, stage in enumerate(stages):
+        started = time.perf_counter()
+        probabilities = stage.predict(image, device)
+        elapsed = time.perf_counter() - started
+
+        is_last = position == len(stages) - 1
+        answered = is_last or probabilities.max().item() >= stage.threshold
+        stats.record(stage.name, elapsed, answered, first=position == 0)
+        if answered:
+            return probabilities, stage.name
@@ -6,6 +6,7 @@ import torch.nn as nn
 import torchvision.models as models
 import torchvision.transforms as transforms
 from torchvision.models import resnet18, ResNet18_Weights
+from torchvision.models import mobilenet_v3_small, MobileNet_V3_Small_Weights
 
 def create_model():
     print("Creating plant disease detection model...")
@@ -39,5 +40,31 @@ def create_model():
         print(f"Error saving model: {str(e)}")
         return False
 
+def create_small_model():
+    print("Creating first-stage cascade model...")
+    
+    model_dir = os.path.join(os.path.dirname(__file__), 'models')
+    os.makedirs(model_dir, exist_ok=True)
+    output_path = os.path.join(model_dir, 'plant_disease_model_small.pth')
+
+    # MobileNetV3-Small: roughly 1/30th of ResNet18's FLOPs
+    model = mobilenet_v3_small(weights=MobileNet_V3_Small_Weights.DEFAULT)
+    
+    # Same 38 PlantVillage classes as the full model
+    num_classes = 38
+    model.classifier[3] = nn.Linear(model.classifier[3].in_features, num_classes)
+    
+    try:
+        torch.save(model.state_dict(), output_path)
+        print(f"Model successfully created and saved to: {output_path}")
+        
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            print("Model file verification successful!")
+            return True
+    except Exception as e:
+        print(f"Error saving model: {str(e)}")
+        return False
+
 if __name__ == "__main__":
     create_model()
+    create_small_model()
@@ -0,0 +1,106 @@
+"""
+Accuracy/latency report for the early-exit cascade on a labelled sample set.
+
+Run from backend/:
+
+    python -m agriculture.evaluate_cascade path/to/samples --thresholds 0.7 0.8 0.9 0.95
+
+The sample directory uses the PlantVillage layout: one sub-directory per class
+(e.g. ``Tomato___healthy/``) holding that class's images. Every image goes
+through both stages once; each threshold is then scored from those results, so
+the report compares thresholds on identical predictions and timings.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+from PIL import Image
+
+from .agriculture_vision import AgricultureVisionAnalyzer
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+
+
+def load_samples(sample_dir, classes):
+    samples = []
+    for class_name in sorted(os.listdir(sample_dir)):
+        class_dir = os.path.join(sample_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        if class_name not in classes:
+            print(f"Skipping unknown class directory: {class_name}")
+            continue
+        for filename in sorted(os.listdir(class_dir)):
+            if filename.lower().endswith(IMAGE_EXTENSIONS):
+                samples.append((os.path.join(class_dir, filename), classes.index(class_name)))
+    return samples
+
+
+def timed_predict(stage, image, device):
+    started = time.perf_counter()
+    probabilities = stage.predict(image, device)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    confidence, predicted_idx = probabilities.max(dim=1)
+    return confidence.item(), predicted_idx.item(), elapsed_ms
+
+
+def format_row(name, correct, latencies, hit_rate):
+    latencies = np.array(latencies)
+    return (
+        f"{name:<16} {correct.mean() * 100:>8.2f}% {hit_rate * 100:>9.1f}% "
+        f"{latencies.mean():>9.2f} {np.percentile(latencies, 50):>9.2f} "
+        f"{np.percentile(latencies, 95):>9.2f}"
+    )
+
+
+def evaluate(sample_dir, thresholds, cascade_model):
+    analyzer = AgricultureVisionAnalyzer(cascade=True, cascade_model=cascade_model)
+    first_stage, full_stage = analyzer.cascade_stages
+    device = analyzer.device
+
+    samples = load_samples(sample_dir, analyzer.classes)
+    if not samples:
+        print(f"No labelled images found under {sample_dir}")
+        return
+
+    # Warm up both stages so one-off allocation cost is not counted
+    warmup_image = analyzer.load_image(Image.open(samples[0][0]))
+    for stage in (first_stage, full_stage):
+        stage.predict(warmup_image, device)
+
+    records = []
+    for path, label in samples:
+        image = analyzer.load_image(Image.open(path))
+        records.append((label,) + timed_predict(first_stage, image, device) + timed_predict(full_stage, image, device))
+
+    labels = np.array([r[0] for r in records])
+    first_conf = np.array([r[1] for r in records])
+    first_pred = np.array([r[2] for r in records])
+    first_ms = np.array([r[3] for r in records])
+    full_pred = np.array([r[5] for r in records])
+    full_ms = np.array([r[6] for r in records])
+
+    print(f"\n{len(records)} images, first stage: {first_stage.name}\n")
+    print(f"{'config':<16} {'accuracy':>9} {'stage1 hit':>10} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9}")
+    print(format_row('full model', full_pred == labels, full_ms, 0.0))
+    print(format_row(first_stage.name[:16], first_pred == labels, first_ms, 1.0))
+    for threshold in thresholds:
+        answered = first_conf >= threshold
+        predictions = np.where(answered, first_pred, full_pred)
+        latencies = np.where(answered, first_ms, first_ms + full_ms)
+        print(format_row(f'cascade@{threshold:g}', predictions == labels, latencies, answered.mean()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('sample_dir', help='Directory with one sub-directory of images per class')
+    parser.add_argument('--thresholds', type=float, nargs='+', default=[0.7, 0.8, 0.9, 0.95])
+    parser.add_argument('--model', choices=['mobilenet', 'downscale'], default='mobilenet',
+                        help='First-stage model')
+    args = parser.parse_args()
+    evaluate(args.sample_dir, args.thresholds, args.model)
+
+
+if __name__ == "__main__":
+    main()
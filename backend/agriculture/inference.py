@@ -0,0 +1,102 @@
+"""
+Optimized execution path for the agriculture classifiers.
+
+Compared with the default ``preprocess_image`` + ``torch.no_grad()`` path this:
+
+* writes resized pixels straight into a pooled, channels-last input buffer and
+  normalizes it in place, instead of allocating a fresh NCHW tensor per step
+  of the transform pipeline;
+* runs the forward pass under ``torch.inference_mode()``;
+* on CPU, with ``freeze=True`` (AGRICULTURE_JIT_FREEZE), freezes the model
+  with TorchScript so oneDNN can fold conv/batch-norm/relu into fused
+  kernels. TorchScript is deprecated in recent torch releases (the calls emit
+  FutureWarning), so this is opt-in.
+
+The runner works on its own copy of the model: the caller's model keeps its
+NCHW layout for the default path.
+"""
+import copy
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+from PIL import Image
+
+MEAN = torch.tensor([0.485, 0.456, 0.406]).view(1, 3, 1, 1)
+STD = torch.tensor([0.229, 0.224, 0.225]).view(1, 3, 1, 1)
+
+
+class InputBufferPool:
+    """Reusable channels-last input tensors, keyed by batch size"""
+
+    def __init__(self, size, pin_memory=False):
+        self.size = size
+        self.pin_memory = pin_memory
+        self._lock = threading.Lock()
+        self._free = {}
+
+    def _allocate(self, batch_size):
+        buffer = torch.empty(
+            (batch_size, 3, self.size, self.size),
+            pin_memory=self.pin_memory,
+        )
+        return buffer.contiguous(memory_format=torch.channels_last)
+
+    @contextmanager
+    def borrow(self, batch_size):
+        with self._lock:
+            free = self._free.setdefault(batch_size, [])
+            buffer = free.pop() if free else None
+        if buffer is None:
+            buffer = self._allocate(batch_size)
+        try:
+            yield buffer
+        finally:
+            with self._lock:
+                self._free[batch_size].append(buffer)
+
+
+class OptimizedRunner:
+    def __init__(self, model, device, size=224, freeze=False):
+        self.device = device
+        self.size = size
+        self.freeze = freeze
+        self.buffers = InputBufferPool(size, pin_memory=device.type == 'cuda')
+        self.model = self._optimize(model)
+
+    def _optimize(self, model):
+        # .to(memory_format=...) converts parameters in place
+        model = copy.deepcopy(model).to(memory_format=torch.channels_last)
+        if not self.freeze or self.device.type != 'cpu' or not torch.backends.mkldnn.is_available():
+            return model
+        try:
+            example = torch.rand(1, 3, self.size, self.size).contiguous(memory_format=torch.channels_last)
+            with torch.no_grad():
+                frozen = torch.jit.freeze(torch.jit.trace(model, example))
+                frozen = torch.jit.optimize_for_inference(frozen)
+                # The first two calls run the profiling and optimization passes
+                frozen(example)
+                frozen(example)
+            print("oneDNN fused model ready")
+            return frozen
+        except Exception as e:
+            print(f"Model freezing failed, using eager channels-last model: {str(e)}")
+            return model
+
+    def _fill(self, buffer, images):
+        for position, image in enumerate(images):
+            if image.size != (self.size, self.size):
+                image = image.resize((self.size, self.size), Image.BILINEAR)
+            pixels = torch.from_numpy(np.array(image))
+            buffer[position].copy_(pixels.permute(2, 0, 1))
+        buffer.div_(255).sub_(MEAN).div_(STD)
+
+    def predict(self, images):
+        """Return softmax probabilities for a list of RGB PIL images"""
+        with self.buffers.borrow(len(images)) as buffer:
+            self._fill(buffer, images)
+            with torch.inference_mode():
+                input_tensor = buffer.to(self.device)
+                outputs = self.model(input_tensor)
+                return torch.nn.functional.softmax(outputs, dim=1)
@@ -0,0 +1,96 @@
+"""
+Upload limits for the analysis endpoint.
+
+Everything here runs before the model is involved: the declared body size is
+checked before DRF parses anything, multipart file parts are counted while
+they stream in, and images are sized from their header alone (PIL's
+``Image.open`` is lazy) before any pixel data is decoded.
+"""
+import base64
+import binascii
+import io
+import warnings
+
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image, UnidentifiedImageError
+
+ALLOWED_FORMATS = ('JPEG', 'PNG', 'WEBP', 'BMP', 'GIF', 'TIFF')
+
+
+class UploadRejected(Exception):
+    status_code = 400
+
+
+class UploadTooLarge(UploadRejected):
+    status_code = 413
+
+
+def check_content_length(request, max_bytes):
+    """Reject a request from its Content-Length header alone"""
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        raise UploadRejected('Invalid Content-Length header')
+    if content_length > max_bytes:
+        raise UploadTooLarge(f'Request body exceeds the {max_bytes} byte limit')
+
+
+class UploadSizeLimitHandler(FileUploadHandler):
+    """
+    Upload handler that aborts a multipart upload as soon as its file parts
+    exceed ``max_bytes``, before the rest of the body is read. It must be
+    first in ``request.upload_handlers``; it passes chunks through unchanged.
+    """
+
+    def __init__(self, request=None, max_bytes=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_bytes:
+            raise UploadTooLarge(f'Upload exceeds the {self.max_bytes} byte limit')
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+def open_image(image_data, max_bytes, max_pixels, max_dimension):
+    """
+    Open an uploaded file or base64 data URL without decoding its pixels and
+    check its size and dimensions. Returns a lazily-loaded PIL image.
+    """
+    if hasattr(image_data, 'read'):
+        if getattr(image_data, 'size', 0) > max_bytes:
+            raise UploadTooLarge(f'Upload exceeds the {max_bytes} byte limit')
+        source = image_data
+    elif isinstance(image_data, str) and image_data.startswith('data:image'):
+        encoded = image_data.split(',', 1)[-1]
+        if len(encoded) * 3 // 4 > max_bytes:
+            raise UploadTooLarge(f'Upload exceeds the {max_bytes} byte limit')
+        try:
+            source = io.BytesIO(base64.b64decode(encoded, validate=True))
+        except (binascii.Error, ValueError):
+            raise UploadRejected('Invalid base64 image data')
+    else:
+        raise UploadRejected('Image must be a file upload or a base64 data URL')
+
+    try:
+        # Turn PIL's decompression bomb warning into a hard failure too
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', Image.DecompressionBombWarning)
+            image = Image.open(source, formats=ALLOWED_FORMATS)
+    except (Image.DecompressionBombWarning, Image.DecompressionBombError):
+        raise UploadTooLarge('Image dimensions are too large')
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise UploadRejected('Unsupported or corrupt image file')
+
+    width, height = image.size
+    if width > max_dimension or height > max_dimension or width * height > max_pixels:
+        raise UploadTooLarge(
+            f'Image is {width}x{height}; the limit is {max_dimension}px per side '
+            f'and {max_pixels} pixels in total'
+        )
+    return image
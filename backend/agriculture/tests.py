@@ -0,0 +1,194 @@
+import base64
+import io
+import struct
+import warnings
+import zlib
+from contextlib import redirect_stdout
+
+import numpy as np
+import torch
+import torchvision.transforms as transforms
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from PIL import Image
+
+from core.testing import TestCase
+
+from .cascade import CascadeStats, run_cascade
+from .inference import OptimizedRunner
+from .views import get_analyzer
+
+
+class StubStage:
+    """A cascade stage whose model always returns ``probabilities``"""
+
+    def __init__(self, name, probabilities, threshold):
+        self.name = name
+        self.probabilities = torch.tensor([probabilities])
+        self.threshold = threshold
+        self.calls = 0
+
+    def predict(self, image, device):
+        self.calls += 1
+        return self.probabilities
+
+
+class CascadeTests(TestCase):
+    def setUp(self):
+        self.stats = CascadeStats()
+
+    def test_confident_first_stage_answers(self):
+        small = StubStage('small', [0.95, 0.05], threshold=0.9)
+        full = StubStage('full', [0.6, 0.4], threshold=0.0)
+        probabilities, stage = run_cascade([small, full], None, 'cpu', stats=self.stats)
+        self.assertEqual(stage, 'small')
+        self.assertEqual(probabilities.tolist(), small.probabilities.tolist())
+        self.assertEqual(full.calls, 0)
+
+    def test_uncertain_first_stage_escalates(self):
+        small = StubStage('small', [0.55, 0.45], threshold=0.9)
+        full = StubStage('full', [0.3, 0.7], threshold=0.0)
+        probabilities, stage = run_cascade([small, full], None, 'cpu', stats=self.stats)
+        self.assertEqual(stage, 'full')
+        self.assertEqual(probabilities.tolist(), full.probabilities.tolist())
+        self.assertEqual((small.calls, full.calls), (1, 1))
+
+    def test_last_stage_always_answers(self):
+        full = StubStage('full', [0.5, 0.5], threshold=0.99)
+        self.assertEqual(run_cascade([full], None, 'cpu', stats=self.stats)[1], 'full')
+
+    def test_stats(self):
+        small = StubStage('small', [0.95, 0.05], threshold=0.9)
+        full = StubStage('full', [0.6, 0.4], threshold=0.0)
+        run_cascade([small, full], None, 'cpu', stats=self.stats)
+        small.probabilities = torch.tensor([[0.5, 0.5]])
+        run_cascade([small, full], None, 'cpu', stats=self.stats)
+
+        snapshot = self.stats.snapshot()
+        self.assertEqual(snapshot['requests'], 2)
+        self.assertEqual(
+            {name: (stage['runs'], stage['hits'], stage['hit_rate']) for name, stage in snapshot['stages'].items()},
+            {'small': (2, 1, 0.5), 'full': (1, 1, 0.5)},
+        )
+
+    def test_stats_endpoint(self):
+        api = APIClient(HTTP_HOST='localhost')
+        self.assertEqual(api.get('/api/agriculture/cascade-stats/').status_code, 403)
+        api.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+        response = api.get('/api/agriculture/cascade-stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'requests', 'stages', 'enabled'})
+
+
+class OptimizedRunnerTests(TestCase):
+    size = 64
+
+    def setUp(self):
+        torch.manual_seed(0)
+        self.model = torch.nn.Sequential(
+            torch.nn.Conv2d(3, 8, 3, padding=1), torch.nn.BatchNorm2d(8), torch.nn.ReLU(),
+            torch.nn.AdaptiveAvgPool2d(1), torch.nn.Flatten(), torch.nn.Linear(8, 5),
+        ).eval()
+        transform = transforms.Compose([
+            transforms.ToTensor(),
+            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]),
+        ])
+        rng = np.random.default_rng(0)
+        self.images = [
+            Image.fromarray(rng.integers(0, 256, (self.size, self.size, 3), dtype=np.uint8)) for _ in range(3)
+        ]
+        with torch.no_grad():
+            batch = torch.stack([transform(image) for image in self.images])
+            self.expected = torch.nn.functional.softmax(self.model(batch), dim=1)
+
+    def test_matches_eager_output(self):
+        runner = OptimizedRunner(self.model, torch.device('cpu'), size=self.size)
+        torch.testing.assert_close(runner.predict(self.images), self.expected, atol=1e-5, rtol=1e-4)
+        # The caller's model keeps its layout
+        self.assertIsNot(runner.model, self.model)
+        self.assertTrue(self.model[0].weight.is_contiguous())
+
+    def test_frozen_matches_eager_output(self):
+        with warnings.catch_warnings(), redirect_stdout(io.StringIO()):
+            warnings.simplefilter('ignore', FutureWarning)
+            runner = OptimizedRunner(self.model, torch.device('cpu'), size=self.size, freeze=True)
+            actual = runner.predict(self.images)
+        torch.testing.assert_close(actual, self.expected, atol=1e-5, rtol=1e-4)
+
+
+def png_header(width, height):
+    """A PNG that only declares its size: enough for Image.open, which never decodes pixels"""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    return (
+        b'\x89PNG\r\n\x1a\n'
+        + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        + chunk(b'IDAT', zlib.compress(b''))
+        + chunk(b'IEND', b'')
+    )
+
+
+def encoded_image(size, format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, 'green').save(buffer, format)
+    return buffer.getvalue()
+
+
+class UploadLimitTests(TestCase):
+    """Every rejection happens before the model is loaded or any pixel is decoded"""
+
+    def setUp(self):
+        get_analyzer.cache_clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+
+    def tearDown(self):
+        self.assertEqual(get_analyzer.cache_info().currsize, 0)
+
+    def upload(self, content, name='leaf.png'):
+        return self.api.post('/api/agriculture/analyze/', {
+            'image': SimpleUploadedFile(name, content), 'type': 'plant-disease',
+        }, format='multipart')
+
+    def post_data_url(self, content):
+        data_url = 'data:image/png;base64,' + base64.b64encode(content).decode()
+        return self.api.post('/api/agriculture/analyze/', {'image': data_url}, format='json')
+
+    def assertRejected(self, response, status_code):
+        self.assertEqual(response.status_code, status_code, response.data)
+        self.assertIn('error', response.data)
+
+    @override_settings(AGRICULTURE_MAX_REQUEST_BYTES=1000)
+    def test_oversize_content_length(self):
+        self.assertRejected(self.upload(b'\0' * 2000), 413)
+
+    @override_settings(AGRICULTURE_MAX_UPLOAD_BYTES=1000)
+    def test_oversize_multipart_file(self):
+        self.assertRejected(self.upload(b'\0' * 2000), 413)
+
+    @override_settings(AGRICULTURE_MAX_UPLOAD_BYTES=1000)
+    def test_oversize_base64(self):
+        self.assertRejected(self.post_data_url(b'\0' * 2000), 413)
+
+    def test_too_many_pixels(self):
+        self.assertRejected(self.upload(encoded_image((9000, 10))), 413)
+        with override_settings(AGRICULTURE_MAX_IMAGE_PIXELS=10_000):
+            self.assertRejected(self.post_data_url(encoded_image((200, 200))), 413)
+
+    def test_decompression_bombs(self):
+        # Past PIL's error threshold, and past its warning threshold
+        self.assertRejected(self.upload(png_header(20000, 20000)), 413)
+        self.assertRejected(self.upload(png_header(10000, 10000)), 413)
+        self.assertRejected(self.post_data_url(png_header(20000, 20000)), 413)
+
+    def test_disallowed_format(self):
+        self.assertRejected(self.upload(encoded_image((32, 32), 'PPM'), 'leaf.ppm'), 400)
+
+    def test_garbage(self):
+        self.assertRejected(self.upload(b'not an image at all'), 400)
+        response = self.api.post('/api/agriculture/analyze/', {'image': 'data:image/png;base64,@@@'}, format='json')
+        self.assertRejected(response, 400)
+        self.assertRejected(self.api.post('/api/agriculture/analyze/', {'image': 'a path'}, format='json'), 400)
+        self.assertRejected(self.api.post('/api/agriculture/analyze/', {}, format='json'), 400)
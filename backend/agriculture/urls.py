@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import AgricultureAnalysisView
+from .views import AgricultureAnalysisView, CascadeStatsView
 
 urlpatterns = [
     path('analyze/', AgricultureAnalysisView.as_view(), name='agriculture-analyze'),
+    path('cascade-stats/', CascadeStatsView.as_view(), name='agriculture-cascade-stats'),
 ]
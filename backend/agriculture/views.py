@@ -1,21 +1,45 @@
+from functools import lru_cache
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import permissions, status
+from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from .agriculture_vision import AgricultureVisionAnalyzer
-import base64
-from PIL import Image
-import io
+from .cascade import cascade_stats
+from .limits import UploadRejected, UploadSizeLimitHandler, check_content_length, open_image
+
+ANALYSIS_TYPES = ('plant-disease', 'crop-health', 'weed-detection', 'irrigation')
+
+
+@lru_cache(maxsize=None)
+def get_analyzer():
+    """Build the analyzer (and load the model) once per worker process"""
+    # torch and torchvision take seconds and hundreds of MB to import; only
+    # workers that actually run an analysis pay for them
+    from .agriculture_vision import AgricultureVisionAnalyzer
+    return AgricultureVisionAnalyzer(
+        cascade=settings.AGRICULTURE_CASCADE_ENABLED,
+        cascade_model=settings.AGRICULTURE_CASCADE_MODEL,
+        cascade_threshold=settings.AGRICULTURE_CASCADE_THRESHOLD,
+        optimized=settings.AGRICULTURE_OPTIMIZED_INFERENCE,
+        jit_freeze=settings.AGRICULTURE_JIT_FREEZE,
+    )
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class AgricultureAnalysisView(APIView):
-    def __init__(self):
-        super().__init__()
-        self.analyzer = AgricultureVisionAnalyzer()
+    # An analysis keeps a model worker busy; price it well above a read
+    throttle_cost = {'POST': settings.AGRICULTURE_THROTTLE_COST}
 
     def post(self, request):
+        # Reject oversized or malformed uploads before the body is buffered
+        # or any pixel data is decoded
         try:
+            check_content_length(request, settings.AGRICULTURE_MAX_REQUEST_BYTES)
+            request.upload_handlers.insert(
+                0, UploadSizeLimitHandler(request, settings.AGRICULTURE_MAX_UPLOAD_BYTES)
+            )
+
             image_data = request.data.get('image')
             analysis_type = request.data.get('type', 'plant-disease')
 
@@ -24,21 +48,33 @@ class AgricultureAnalysisView(APIView):
                     {'error': 'No image provided'},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            if analysis_type not in ANALYSIS_TYPES:
+                return Response(
+                    {'error': 'Invalid analysis type'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            image = open_image(
+                image_data,
+                max_bytes=settings.AGRICULTURE_MAX_UPLOAD_BYTES,
+                max_pixels=settings.AGRICULTURE_MAX_IMAGE_PIXELS,
+                max_dimension=settings.AGRICULTURE_MAX_IMAGE_DIMENSION,
+            )
+        except UploadRejected as e:
+            return Response({'error': str(e)}, status=e.status_code)
+
+        try:
+            analyzer = get_analyzer()
 
             # Process the image based on the analysis type
             if analysis_type == 'plant-disease':
-                results = self.analyzer.analyze_plant_disease(image_data)
+                results = analyzer.analyze_plant_disease(image)
             elif analysis_type == 'crop-health':
-                results = self.analyzer.analyze_crop_health(image_data)
+                results = analyzer.analyze_crop_health(image)
             elif analysis_type == 'weed-detection':
-                results = self.analyzer.detect_weeds(image_data)
-            elif analysis_type == 'irrigation':
-                results = self.analyzer.analyze_irrigation(image_data)
+                results = analyzer.detect_weeds(image)
             else:
-                return Response(
-                    {'error': 'Invalid analysis type'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+                results = analyzer.analyze_irrigation(image)
 
             return Response(results, status=status.HTTP_200_OK)
 
@@ -48,3 +84,11 @@ class AgricultureAnalysisView(APIView):
                 {'error': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+
+
+class CascadeStatsView(APIView):
+    """Per-stage runs, hits and latency of the early-exit cascade in this worker process"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(dict(cascade_stats.snapshot(), enabled=settings.AGRICULTURE_CASCADE_ENABLED))
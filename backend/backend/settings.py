@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import copy
 import os
 from pathlib import Path
 from datetime import timedelta
@@ -68,6 +69,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Development aid: log requests that exceed their query budget (core/querybudget.py)
+QUERY_BUDGET_LOGGING = os.getenv('QUERY_BUDGET_LOGGING', 'False') == 'True'
+if QUERY_BUDGET_LOGGING:
+    MIDDLEWARE.insert(0, 'core.querybudget.QueryBudgetMiddleware')
+QUERY_BUDGET_DEFAULT = int(os.getenv('QUERY_BUDGET_DEFAULT', '10'))
+QUERY_REPEAT_THRESHOLD = int(os.getenv('QUERY_REPEAT_THRESHOLD', '3'))
+
 ROOT_URLCONF = 'backend.urls'
 
 TEMPLATES = [
@@ -95,8 +103,112 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+    }
+}
+
+# SQLITE_PROFILE=production tunes SQLite for a multi-threaded server. Every new
+# connection runs the pragmas below: WAL lets readers carry on while a write
+# commits, synchronous=NORMAL drops the fsync per commit (still crash-safe in
+# WAL, the last commits may be lost on power failure) and reads go through
+# mmap. Transactions BEGIN IMMEDIATE, so concurrent writers queue on the busy
+# timeout instead of failing with "database is locked" when a read lock
+# cannot be upgraded, and connections are kept open between requests.
+SQLITE_PROFILE = os.getenv('SQLITE_PROFILE', 'default')
+SQLITE_PRODUCTION_PRAGMAS = [
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    f"mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))}",
+    # Truncate the WAL back to this size after checkpoints
+    'journal_size_limit=67108864',
+    'temp_store=MEMORY',
+]
+SQLITE_PRODUCTION_OPTIONS = {
+    'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRODUCTION_PRAGMAS),
+    'transaction_mode': 'IMMEDIATE',
+    # Seconds a statement waits for a lock before "database is locked"
+    'timeout': float(os.getenv('SQLITE_BUSY_TIMEOUT', '20')),
+}
+if SQLITE_PROFILE == 'production':
+    DATABASES['default'].update(
+        CONN_MAX_AGE=int(os.getenv('SQLITE_CONN_MAX_AGE', '600')),
+        CONN_HEALTH_CHECKS=True,
+        OPTIONS=SQLITE_PRODUCTION_OPTIONS,
+    )
+
+# DATABASE_ENGINE=postgresql moves the data to PostgreSQL so that several
+# nodes can share it (pip install "psycopg[binary,pool]"). Each worker process
+# keeps a pool of POSTGRES_POOL_MIN_SIZE to POSTGRES_POOL_MAX_SIZE connections
+# and requests borrow one instead of connecting; a request waits up to
+# POSTGRES_POOL_TIMEOUT seconds for a free one. Behind PgBouncer, set
+# POSTGRES_POOL=False to keep one connection per thread open instead.
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite')
+if DATABASE_ENGINE == 'postgresql':
+    POSTGRES_POOL = os.getenv('POSTGRES_POOL', 'True') == 'True'
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('POSTGRES_DB', 'sarb'),
+        'USER': os.getenv('POSTGRES_USER', 'sarb'),
+        'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+        'HOST': os.getenv('POSTGRES_HOST', 'localhost'),
+        'PORT': os.getenv('POSTGRES_PORT', '5432'),
+        # Pooled connections go back to the pool at the end of each request
+        'CONN_MAX_AGE': 0 if POSTGRES_POOL else int(os.getenv('POSTGRES_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'connect_timeout': int(os.getenv('POSTGRES_CONNECT_TIMEOUT', '5')),
+            **({'pool': {
+                'min_size': int(os.getenv('POSTGRES_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('POSTGRES_POOL_MAX_SIZE', '10')),
+                'timeout': float(os.getenv('POSTGRES_POOL_TIMEOUT', '10')),
+            }} if POSTGRES_POOL else {}),
+        },
     }
+
+# Read replica (core/replicas.py): viewset list/retrieve reads go to it, and a
+# client that writes reads from the primary for DATABASE_REPLICA_LAG seconds.
+# POSTGRES_REPLICA_HOST/PORT point at a streaming replica with the primary's
+# credentials. SQLITE_REPLICA_PATH is a local stand-in: a copy of db.sqlite3
+# never catches up, which makes the stickiness easy to see.
+DATABASE_REPLICA_LAG = float(os.getenv('DATABASE_REPLICA_LAG', '5'))
+if DATABASE_ENGINE == 'postgresql' and os.getenv('POSTGRES_REPLICA_HOST'):
+    DATABASES['replica'] = dict(
+        copy.deepcopy(DATABASES['default']),
+        HOST=os.getenv('POSTGRES_REPLICA_HOST'),
+        PORT=os.getenv('POSTGRES_REPLICA_PORT', DATABASES['default']['PORT']),
+    )
+elif DATABASE_ENGINE != 'postgresql' and os.getenv('SQLITE_REPLICA_PATH'):
+    DATABASES['replica'] = dict(copy.deepcopy(DATABASES['default']), NAME=os.getenv('SQLITE_REPLICA_PATH'))
+if 'replica' in DATABASES:
+    # Tests read the replica's data from the test database
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+    # Outside SessionMiddleware, so that session saves count as writes
+    MIDDLEWARE.insert(MIDDLEWARE.index('django.contrib.sessions.middleware.SessionMiddleware'),
+                      'core.replicas.ReplicaPinningMiddleware')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# The 'api' cache holds rendered responses of the public read endpoints (see
+# core/cache.py). Local memory is per process; point API_CACHE_BACKEND at
+# django.core.cache.backends.filebased.FileBasedCache or
+# django.core.cache.backends.redis.RedisCache to share it between workers.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        'BACKEND': os.getenv('API_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('API_CACHE_LOCATION', 'sarb-api'),
+        'TIMEOUT': int(os.getenv('API_CACHE_TIMEOUT', '86400')),
+    },
+    # Token buckets of core.throttling.CacheBuckets
+    'throttle': {
+        'BACKEND': os.getenv('THROTTLE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', 'sarb-throttle'),
+    },
 }
 
 
@@ -136,9 +248,18 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# The Vite build (npm run build in frontend/) is collected along with
+# backend/static when present
+FRONTEND_DIST = Path(os.getenv('FRONTEND_DIST', BASE_DIR.parent / 'frontend' / 'dist'))
 STATICFILES_DIRS = [
-    BASE_DIR / 'static',
+    directory for directory in (BASE_DIR / 'static', FRONTEND_DIST) if directory.is_dir()
 ]
+# collectstatic fingerprints every file and writes .gz/.br variants
+# (core/staticfiles.py); core/serving.py serves them from STATIC_ROOT by
+# Accept-Encoding, fingerprinted names as immutable. Set STATIC_SERVE to False
+# when the front server maps STATIC_URL to STATIC_ROOT itself.
+STATIC_SERVE = os.getenv('STATIC_SERVE', 'True') == 'True'
+STATIC_CACHE_MAX_AGE = int(os.getenv('STATIC_CACHE_MAX_AGE', '300'))
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
@@ -167,6 +288,32 @@ CORS_ALLOW_HEADERS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media is served by core/serving.py with byte ranges, conditional GETs and
+# caching headers (content-addressed files are immutable). Set MEDIA_SERVE to
+# False when the front server maps MEDIA_URL to MEDIA_ROOT itself, or
+# MEDIA_SENDFILE to 'xsendfile' / 'nginx' to let it send the files Django
+# routes (nginx: an internal location at MEDIA_SENDFILE_PREFIX aliased to
+# MEDIA_ROOT).
+MEDIA_SERVE = os.getenv('MEDIA_SERVE', 'True') == 'True'
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_SENDFILE_PREFIX = os.getenv('MEDIA_SENDFILE_PREFIX', '/protected-media/')
+MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', '3600'))
+
+# Uploads are stored once per distinct content (core/storage.py)
+STORAGES = {
+    'default': {
+        'BACKEND': os.getenv('MEDIA_STORAGE_BACKEND', 'core.storage.ContentAddressedStorage'),
+    },
+    'staticfiles': {
+        'BACKEND': os.getenv('STATIC_STORAGE_BACKEND', 'core.staticfiles.CompressedManifestStaticFilesStorage'),
+    },
+}
+
+# Resized copies of uploaded case study and team images (core/images.py),
+# one per width and format; the first formats are offered first in srcsets
+IMAGE_DERIVATIVE_WIDTHS = [int(width) for width in os.getenv('IMAGE_DERIVATIVE_WIDTHS', '320,640,960,1280').split(',')]
+IMAGE_DERIVATIVE_FORMATS = os.getenv('IMAGE_DERIVATIVE_FORMATS', 'avif,webp,jpeg').split(',')
+
 # CSRF settings
 CSRF_TRUSTED_ORIGINS = [
     "http://localhost:5173",
@@ -190,8 +337,57 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
+    # orjson-backed JSON (core/renderers.py, core/parsers.py); same output as
+    # DRF's stdlib classes, which API_FAST_JSON=False switches back to
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer' if os.getenv('API_FAST_JSON', 'True') == 'True'
+        else 'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser' if os.getenv('API_FAST_JSON', 'True') == 'True'
+        else 'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Token buckets per user, or per address when anonymous (core/throttling.py)
+    'DEFAULT_THROTTLE_CLASSES': ['core.throttling.TokenBucketThrottle'],
+    'DEFAULT_THROTTLE_RATES': {
+        'anon': os.getenv('API_THROTTLE_ANON_RATE', '300/min'),
+        'user': os.getenv('API_THROTTLE_USER_RATE', '1200/min'),
+    },
+    # Proxies in front of Django that append to X-Forwarded-For; the client
+    # address is taken that many entries from the end. 0 ignores the header,
+    # which clients can set to anything, and uses REMOTE_ADDR
+    'NUM_PROXIES': int(os.getenv('API_NUM_PROXIES', '0')),
 }
 
+# Upper bound for the ?page_size= query parameter
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '200'))
+
+# Throttling. Reads cost one token, writes API_THROTTLE_WRITE_COST. Buckets are
+# per process in the 'throttle' cache; THROTTLE_BACKEND=core.throttling.SQLiteBuckets
+# shares them between the workers of a host through THROTTLE_SQLITE_PATH.
+API_THROTTLE_ENABLED = os.getenv('API_THROTTLE_ENABLED', 'True') == 'True'
+API_THROTTLE_WRITE_COST = int(os.getenv('API_THROTTLE_WRITE_COST', '5'))
+THROTTLE_BACKEND = os.getenv('THROTTLE_BACKEND', 'core.throttling.CacheBuckets')
+THROTTLE_SQLITE_PATH = os.getenv('THROTTLE_SQLITE_PATH', str(BASE_DIR / 'throttle.sqlite3'))
+
+# Contact form ingestion (core/ingest.py). 'direct' inserts each message in the
+# request; 'batched' acknowledges with 202 once the message is fsync'ed to an
+# append-only log in CONTACT_INGEST_DIR, and a flusher thread per worker
+# stores the log with bulk_create every CONTACT_INGEST_FLUSH_INTERVAL seconds
+# (0: only `manage.py flush_contact_messages`). Identical messages within
+# CONTACT_DUPLICATE_WINDOW seconds are stored once.
+CONTACT_INGEST_MODE = os.getenv('CONTACT_INGEST_MODE', 'direct')
+CONTACT_INGEST_DIR = os.getenv('CONTACT_INGEST_DIR', str(BASE_DIR / 'ingest'))
+CONTACT_INGEST_BATCH_SIZE = int(os.getenv('CONTACT_INGEST_BATCH_SIZE', '500'))
+CONTACT_INGEST_FLUSH_INTERVAL = float(os.getenv('CONTACT_INGEST_FLUSH_INTERVAL', '1.0'))
+CONTACT_INGEST_FSYNC = os.getenv('CONTACT_INGEST_FSYNC', 'True') == 'True'
+CONTACT_DUPLICATE_WINDOW = int(os.getenv('CONTACT_DUPLICATE_WINDOW', '600'))
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -241,6 +437,32 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# Agriculture AI settings
+# Optional early-exit cascade in front of the full ResNet18 classifier.
+# AGRICULTURE_CASCADE_MODEL is 'mobilenet' (MobileNetV3-Small) or 'downscale'
+# (ResNet18 on a 112px input).
+AGRICULTURE_CASCADE_ENABLED = os.getenv('AGRICULTURE_CASCADE_ENABLED', 'False') == 'True'
+AGRICULTURE_CASCADE_MODEL = os.getenv('AGRICULTURE_CASCADE_MODEL', 'mobilenet')
+AGRICULTURE_CASCADE_THRESHOLD = float(os.getenv('AGRICULTURE_CASCADE_THRESHOLD', '0.9'))
+# inference_mode + channels-last + oneDNN-frozen model with pooled input buffers
+AGRICULTURE_OPTIMIZED_INFERENCE = os.getenv('AGRICULTURE_OPTIMIZED_INFERENCE', 'False') == 'True'
+# Also freeze the model with TorchScript for oneDNN-fused CPU kernels (deprecated
+# in recent torch, emits FutureWarning)
+AGRICULTURE_JIT_FREEZE = os.getenv('AGRICULTURE_JIT_FREEZE', 'False') == 'True'
+# torch and the model are loaded on the first analysis, so API-only workers
+# never import them. Workers dedicated to /api/agriculture/ set
+# AGRICULTURE_PRELOAD=True to load the model at startup instead (backend/wsgi.py).
+AGRICULTURE_PRELOAD = os.getenv('AGRICULTURE_PRELOAD', 'False') == 'True'
+# Tokens one analysis takes from the client's throttle bucket
+AGRICULTURE_THROTTLE_COST = int(os.getenv('AGRICULTURE_THROTTLE_COST', '30'))
+# Upload limits for /api/agriculture/analyze/, enforced before the body is
+# parsed (request bytes), while multipart files stream in (upload bytes) and
+# from the image header before decoding (dimensions/pixels)
+AGRICULTURE_MAX_REQUEST_BYTES = int(os.getenv('AGRICULTURE_MAX_REQUEST_BYTES', str(15 * 1024 * 1024)))
+AGRICULTURE_MAX_UPLOAD_BYTES = int(os.getenv('AGRICULTURE_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+AGRICULTURE_MAX_IMAGE_DIMENSION = int(os.getenv('AGRICULTURE_MAX_IMAGE_DIMENSION', '8000'))
+AGRICULTURE_MAX_IMAGE_PIXELS = int(os.getenv('AGRICULTURE_MAX_IMAGE_PIXELS', str(40_000_000)))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -17,8 +17,8 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
-from django.conf.urls.static import static
-from core.views import IndexView
+from core.serving import serve_media, serve_static
+from core.views import CacheStatsView, IndexView
 from drf_spectacular.views import (
     SpectacularAPIView,
     SpectacularRedocView,
@@ -33,6 +33,7 @@ from rest_framework_simplejwt.views import (
 urlpatterns = [
     path('', IndexView.as_view(), name='index'),
     path('admin/', admin.site.urls),
+    path('api/cache/stats/', CacheStatsView.as_view(), name='cache-stats'),
     path('api/', include('sarb_api.urls')),
     path('api/', include('case_studies.urls')),
     path('api/agriculture/', include('agriculture.urls')),
@@ -47,4 +48,9 @@ urlpatterns = [
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
+
+if settings.STATIC_SERVE:
+    urlpatterns.append(path(f"{settings.STATIC_URL.strip('/')}/<path:path>", serve_static, name='static'))
+if settings.MEDIA_SERVE:
+    urlpatterns.append(path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'))
@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.AGRICULTURE_PRELOAD:
+    # ML workers load the model before taking traffic
+    from agriculture.views import get_analyzer
+    get_analyzer()
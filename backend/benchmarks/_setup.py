@@ -0,0 +1,26 @@
+"""
+Django bootstrap shared by the benchmark scripts.
+
+Benchmarks run against a throwaway SQLite database so they never touch
+db.sqlite3, with API throttling off so repeated requests are not answered
+with 429s. Import this module before any model.
+"""
+import os
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+if 'SQLITE_PATH' not in os.environ:
+    os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='sarb-bench-'), 'bench.sqlite3')
+os.environ.setdefault('API_THROTTLE_ENABLED', 'False')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.management import call_command  # noqa: E402
+
+call_command('migrate', verbosity=0)
@@ -0,0 +1,56 @@
+"""
+Response size and latency of the case study list per representation.
+
+Run from backend/:
+
+    python -m benchmarks.fieldsets --rows 10000 --page-size 50
+
+Compares the full representation with ``?fields=`` (serializer trimmed,
+``.only()`` on the queryset) and ``?view=compact`` (``.values()`` with a
+200-character summary, no model serializer). The response cache is cleared
+before every request so each one renders from the database.
+"""
+import argparse
+import io
+import statistics
+import time
+
+from . import _setup  # noqa: F401
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from core.cache import get_cache
+
+VARIANTS = [
+    ('full', ''),
+    ('fields=id,title,slug,image', '&fields=id,title,slug,image'),
+    ('view=compact', '&view=compact'),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    call_command('reset_and_populate_db', case_studies=args.rows, stdout=io.StringIO())
+    client = APIClient(HTTP_HOST='localhost')
+    cache = get_cache()
+
+    print(f"{'variant':<28} {'bytes':>8} {'median ms':>10}")
+    for label, query in VARIANTS:
+        url = f'/api/case-studies/?page_size={args.page_size}&page=3{query}'
+        timings = []
+        for _ in range(args.repeat):
+            cache.clear()
+            started = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+        print(f"{label:<28} {len(response.content):>8} {statistics.median(timings):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Per-page latency of the contact message list as the table grows.
+
+Run from backend/:
+
+    python -m benchmarks.pagination --sizes 1000,10000,100000
+
+For each table size the database is reseeded with synthetic messages, then
+the first and last page are fetched with page-number pagination (ordered the
+same way) and the first and a middle page with the cursor pagination the
+endpoint actually uses. Page-number latency grows with the table - COUNT(*)
+on every page, plus an OFFSET scan for deep pages - while cursor pages stay
+flat because each one is a single range scan on (created_at, id).
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from . import _setup  # noqa: F401
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from rest_framework.pagination import Cursor
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from core.models import ContactMessage
+from core.pagination import CreatedAtCursorPagination, StandardPagination
+from sarb_api.views import ContactMessageViewSet
+
+PATH = '/api/contact/'
+
+
+class PageNumberContactMessageViewSet(ContactMessageViewSet):
+    """The same endpoint with page-number pagination, for comparison"""
+    queryset = ContactMessage.objects.order_by('-created_at', '-id')
+    pagination_class = StandardPagination
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def middle_cursor(size):
+    """Cursor pointing at the middle of the table, as if paged there"""
+    position = ContactMessage.objects.order_by('-created_at', '-id').values_list('created_at', flat=True)[size // 2]
+    paginator = CreatedAtCursorPagination()
+    paginator.base_url = f'http://testserver{PATH}'
+    url = paginator.encode_cursor(Cursor(offset=0, reverse=False, position=str(position)))
+    return url.split('?', 1)[1]
+
+
+def measure(view, query, user, repeat):
+    factory = APIRequestFactory()
+    timings = []
+    counter = QueryCounter()
+    for _ in range(repeat):
+        request = factory.get(f'{PATH}?{query}', HTTP_HOST='localhost')
+        force_authenticate(request, user)
+        counter.count = 0
+        # The viewset prints debugging output on every request
+        with connection.execute_wrapper(counter), contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(timings), counter.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated table sizes')
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    user = User.objects.filter(username='bench').first() or User.objects.create_superuser('bench', 'bench@example.com', 'bench')
+    page_view = PageNumberContactMessageViewSet.as_view({'get': 'list'})
+    cursor_view = ContactMessageViewSet.as_view({'get': 'list'})
+    size_param = f'page_size={args.page_size}'
+
+    columns = ('page 1', 'last page', 'cursor 1', 'cursor mid')
+    print(f"{'rows':>8} " + ''.join(f'{c:>18}' for c in columns) + '   (median ms / queries)')
+    for size in (int(s) for s in args.sizes.split(',')):
+        call_command('reset_and_populate_db', contact_messages=size, stdout=io.StringIO())
+        last_page = max(1, -(-size // args.page_size))
+        results = [
+            measure(page_view, f'{size_param}&page=1', user, args.repeat),
+            measure(page_view, f'{size_param}&page={last_page}', user, args.repeat),
+            measure(cursor_view, size_param, user, args.repeat),
+            measure(cursor_view, f'{size_param}&{middle_cursor(size)}', user, args.repeat),
+        ]
+        print(f"{size:>8} " + ''.join(f'{f"{ms:.2f} / {queries}":>18}' for ms, queries in results))
+
+
+if __name__ == "__main__":
+    main()
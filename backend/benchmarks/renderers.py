@@ -0,0 +1,102 @@
+"""
+JSON rendering and parsing time, DRF's stdlib classes against the orjson ones.
+
+Run from backend/:
+
+    python -m benchmarks.renderers --rows 2000 --page-size 200
+
+Renders the data of every list endpoint with ``JSONRenderer`` and
+``core.renderers.FastJSONRenderer`` (checking both produce the same bytes),
+next to the median time of the whole request. Then parses the bodies the API
+receives: base64 images as posted to /api/agriculture/analyze/ and a full
+bulk create payload.
+"""
+import argparse
+import base64
+import io
+import os
+import statistics
+import time
+from contextlib import redirect_stdout
+
+from . import _setup  # noqa: F401
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.bulk import MAX_BULK_ITEMS
+from core.cache import get_cache
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+ENDPOINTS = ['/api/services/', '/api/team/', '/api/case-studies/', '/api/contact/']
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--page-size', type=int, default=200)
+    parser.add_argument('--image-mb', type=float, nargs='+', default=[1, 5, 10])
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    call_command('reset_and_populate_db', case_studies=args.rows, services=args.rows, team_members=args.rows,
+                 contact_messages=args.rows, stdout=io.StringIO())
+    client = APIClient(HTTP_HOST='localhost')
+    client.force_authenticate(User.objects.create_superuser('bench', 'bench@example.com', 'bench'))
+    cache = get_cache()
+    stdlib, fast = JSONRenderer(), FastJSONRenderer()
+
+    print(f"{'endpoint':<24} {'bytes':>8} {'request ms':>11} {'json ms':>9} {'orjson ms':>10} {'speedup':>8}")
+    for endpoint in ENDPOINTS:
+        url = f'{endpoint}?page_size={args.page_size}'
+
+        def request():
+            cache.clear()
+            # The contact views print debug output
+            with redirect_stdout(io.StringIO()):
+                return client.get(url)
+
+        response = request()
+        assert response.status_code == 200, (url, response.status_code)
+        assert fast.render(response.data) == stdlib.render(response.data), url
+        total = median_ms(request, args.repeat)
+        slow = median_ms(lambda: stdlib.render(response.data), args.repeat)
+        quick = median_ms(lambda: fast.render(response.data), args.repeat)
+        print(f"{endpoint:<24} {len(response.content):>8} {total:>11.2f} {slow:>9.2f} {quick:>10.2f} {slow / quick:>7.1f}x")
+
+    bodies = [
+        (f'analyze, {size:g} MB image', stdlib.render({
+            'image': 'data:image/jpeg;base64,' + base64.b64encode(os.urandom(int(size * 1024 * 1024))).decode(),
+            'type': 'plant-disease',
+        }))
+        for size in args.image_mb
+    ]
+    items = client.get(f'/api/case-studies/?page_size={MAX_BULK_ITEMS}').data['results']
+    bodies.append((f'bulk, {len(items)} case studies', stdlib.render([
+        {key: value for key, value in item.items() if key not in ('id', 'image', 'image_variants')}
+        for item in items
+    ])))
+
+    print()
+    print(f"{'request body':<30} {'bytes':>10} {'json ms':>9} {'orjson ms':>10} {'speedup':>8}")
+    for label, body in bodies:
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(io.BytesIO(body)), label
+        slow = median_ms(lambda: JSONParser().parse(io.BytesIO(body)), args.repeat)
+        quick = median_ms(lambda: FastJSONParser().parse(io.BytesIO(body)), args.repeat)
+        print(f"{label:<30} {len(body):>10} {slow:>9.2f} {quick:>10.2f} {slow / quick:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
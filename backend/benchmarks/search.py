@@ -0,0 +1,81 @@
+"""
+Case study search: FTS5 index vs icontains scans.
+
+Run from backend/:
+
+    python -m benchmarks.search --rows 100000
+
+Seeds the table with synthetic case studies, then times one page of results
+(COUNT plus the first 20 rows) for each query both ways. The icontains
+version is what admin search and client-side filtering used to do: an OR
+across title, description, client name and industry per term, evaluated
+against every row. The FTS version matches prefixes through the inverted
+index and ranks with bm25. FTS also covers challenge, solution and results,
+so match counts can differ. Terms that occur in most rows are the slow case
+for FTS, since every match has to be ranked before the first page is known.
+"""
+import argparse
+import io
+import re
+import statistics
+import time
+from functools import reduce
+from operator import or_
+
+from . import _setup  # noqa: F401
+from django.core.management import call_command
+from django.db.models import Q
+
+from case_studies.models import CaseStudy
+from case_studies.search import case_study_index
+
+QUERIES = ['fraud', 'retail', 'forecast energy', 'anomaly detection insurance', 'vision', 'quokka']
+
+# The fields admin search and the old client-side filter looked at
+ICONTAINS_FIELDS = ('title', 'description', 'client_name', 'client_industry')
+
+
+def icontains_page(query, page_size):
+    queryset = CaseStudy.objects.all()
+    for term in re.findall(r'\w+', query):
+        queryset = queryset.filter(reduce(or_, (Q(**{f'{field}__icontains': term}) for field in ICONTAINS_FIELDS)))
+    return queryset.count(), list(queryset[:page_size])
+
+
+def fts_page(query, page_size):
+    results = case_study_index.search(query)
+    return results.count(), results[0:page_size]
+
+
+def timed(function, query, page_size, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        count, _ = function(query, page_size)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    call_command('reset_and_populate_db', case_studies=args.rows, stdout=io.StringIO())
+    print(f"Seeded {CaseStudy.objects.count()} case studies in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"{'query':<30} {'matches':>8} {'icontains ms':>13} {'fts ms':>9} {'speedup':>8}")
+    for query in QUERIES:
+        slow, slow_count = timed(icontains_page, query, args.page_size, args.repeat)
+        fast, fast_count = timed(fts_page, query, args.page_size, args.repeat)
+        # Prefix matching can find more than substring-of-four-fields and
+        # vice versa, so report both counts when they differ
+        matches = str(fast_count) if fast_count == slow_count else f'{fast_count}/{slow_count}'
+        print(f"{query:<30} {matches:>8} {slow:>13.2f} {fast:>9.2f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Bulk-import benchmark for CaseStudy slug allocation.
+
+Run from backend/:
+
+    python -m benchmarks.slugs --records 5000 --legacy-records 500
+
+Imports records that all share one title, which is the worst case: every save
+collides with all previous ones. The legacy loop issued one query per
+collision, i.e. O(n^2) queries for n imports; the current allocator issues a
+constant number of unique-index lookups per save (SlugCounter), so
+records/s stays flat as the import grows.
+"""
+import argparse
+import time
+
+from . import _setup  # noqa: F401
+from django.db import connection
+from django.utils.text import slugify
+
+from case_studies.models import CaseStudy, SlugCounter
+
+
+def legacy_save(instance):
+    """The original CaseStudy.save loop, kept here for comparison"""
+    if not instance.slug:
+        instance.slug = slugify(instance.title)
+    original_slug = instance.slug
+    counter = 1
+    while CaseStudy.objects.filter(slug=instance.slug).exclude(pk=instance.pk).exists():
+        instance.slug = f"{original_slug}-{counter}"
+        counter += 1
+    super(CaseStudy, instance).save()
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def run(label, records, save):
+    CaseStudy.objects.all().delete()
+    SlugCounter.objects.all().delete()
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        started = time.perf_counter()
+        for i in range(records):
+            save(CaseStudy(title='Imported Case Study', description='Bulk import', order=i))
+        elapsed = time.perf_counter() - started
+    count = counter.count
+    print(f"{label:<10} {records:>8} {count:>10} {count / records:>12.1f} {elapsed:>9.2f} "
+          f"{records / elapsed:>10.0f}")
+    return CaseStudy.objects.values_list('slug', flat=True).distinct().count() == records
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--records', type=int, default=5000)
+    parser.add_argument('--legacy-records', type=int, default=500,
+                        help='The legacy loop is quadratic; keep this small')
+    args = parser.parse_args()
+
+    print(f"{'allocator':<10} {'records':>8} {'queries':>10} {'queries/rec':>12} {'seconds':>9} {'records/s':>10}")
+    ok = run('legacy', args.legacy_records, legacy_save)
+    ok &= run('current', args.legacy_records, CaseStudy.save)
+    ok &= run('current', args.records, CaseStudy.save)
+    print("\nAll slugs unique" if ok else "\nDUPLICATE SLUGS FOUND")
+
+
+if __name__ == "__main__":
+    main()
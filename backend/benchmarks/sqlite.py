@@ -0,0 +1,72 @@
+"""
+Read throughput while writes occur, per SQLite profile.
+
+Run from backend/:
+
+    python -m benchmarks.sqlite --readers 40 --writers 10 --duration 20
+
+For the default settings and for SQLITE_PROFILE=production, a local server
+is started on a freshly seeded database (loadtest/server.py) with the
+response cache disabled, so every read reaches SQLite. Reader users fetch
+the services, team and case study lists back to back while writer users
+submit contact messages, each of which inserts a row and bumps the content
+version. Throughput, latency and errors ("database is locked" surfaces as
+500) are reported per group.
+"""
+import argparse
+import asyncio
+
+from loadtest.__main__ import run
+from loadtest.scenarios import parse_mix
+from loadtest.server import LocalServer
+
+PROFILES = ('default', 'production')
+READS = 'services=1,team=1,case-studies=1'
+WRITES = 'contact=1'
+
+
+async def measure(port, readers, writers, duration, ramp_up):
+    return await asyncio.gather(
+        run('127.0.0.1', port, parse_mix(READS), readers, duration, ramp_up, seed=0),
+        run('127.0.0.1', port, parse_mix(WRITES), writers, duration, ramp_up, seed=10_000),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--readers', type=int, default=40)
+    parser.add_argument('--writers', type=int, default=10)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--ramp-up', type=float, default=2)
+    parser.add_argument('--case-studies', type=int, default=2000)
+    parser.add_argument('--contact-messages', type=int, default=20000)
+    args = parser.parse_args()
+
+    rows = []
+    for profile in PROFILES:
+        server = LocalServer()
+        server.env.update(
+            SQLITE_PROFILE=profile,
+            API_CACHE_BACKEND='django.core.cache.backends.dummy.DummyCache',
+            CONTACT_INGEST_MODE='direct',
+        )
+        server.prepare(seed_options=(
+            f'--case-studies={args.case_studies}', f'--contact-messages={args.contact_messages}',
+        ))
+        server.start()
+        try:
+            results = asyncio.run(measure(server.port, args.readers, args.writers, args.duration, args.ramp_up))
+        finally:
+            server.stop()
+        for group, (result, elapsed) in zip(('reads', 'writes'), results):
+            rows.append((profile, group, result.summary(elapsed)['TOTAL']))
+
+    print(f"\n{args.readers} readers, {args.writers} writers, {args.duration:g}s\n")
+    columns = ('requests', 'errors', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')
+    print(f"{'profile':<12}{'group':<8}" + ''.join(f'{column:>10}' for column in columns))
+    for profile, group, row in rows:
+        print(f"{profile:<12}{group:<8}" + ''.join(f"{row.get(column, '-'):>10}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
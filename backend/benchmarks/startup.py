@@ -0,0 +1,138 @@
+"""
+Worker startup time and memory, with and without the ML stack.
+
+Run from backend/:
+
+    python -m benchmarks.startup --repeat 3
+
+Each mode boots a fresh interpreter under ``python -X importtime`` the way a
+WSGI server does (backend/wsgi.py plus the URLconf), then serves a
+/api/services/ request and one plant disease analysis:
+
+* ``api``: the default. torch is only imported by the first analysis.
+* ``eager``: also imports the analyzer module at startup, which is what
+  every worker did while agriculture/views.py imported it at module level.
+* ``ml``: AGRICULTURE_PRELOAD=True, a worker dedicated to /api/agriculture/
+  that loads the model before taking traffic.
+
+Reported per mode (medians): boot time, peak RSS after boot, the first
+request latencies and the peak RSS at the end; then, from -X importtime,
+the time spent importing during the boot, in total and for the heaviest
+packages.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from . import _setup  # noqa: F401
+
+MODES = ('api', 'eager', 'ml')
+PACKAGES = ('PIL', 'numpy', 'torch', 'torchvision')
+BOOTED = '-- booted --'
+
+WORKER = r'''
+BOOTED = %r
+import io, json, os, resource, sys, time
+from contextlib import redirect_stdout
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+started = time.perf_counter()
+with redirect_stdout(io.StringIO()):
+    from backend.wsgi import application
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    if sys.argv[1] == 'eager':
+        import agriculture.agriculture_vision
+result = {'boot_ms': (time.perf_counter() - started) * 1000, 'boot_rss_mb': peak_rss_mb(),
+          'torch_at_boot': 'torch' in sys.modules}
+print(BOOTED, file=sys.stderr, flush=True)
+
+from django.test import Client
+from PIL import Image
+client = Client(HTTP_HOST='localhost')
+image = io.BytesIO()
+Image.new('RGB', (256, 256), 'green').save(image, 'PNG')
+image.seek(0)
+image.name = 'leaf.png'
+with redirect_stdout(io.StringIO()):
+    started = time.perf_counter()
+    assert client.get('/api/services/').status_code == 200
+    result['services_ms'] = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    response = client.post('/api/agriculture/analyze/', {'image': image, 'type': 'plant-disease'})
+    result['analyze_ms'] = (time.perf_counter() - started) * 1000
+assert response.status_code == 200, response.content
+result['end_rss_mb'] = peak_rss_mb()
+print(json.dumps(result))
+''' % BOOTED
+
+
+def import_times(stderr):
+    """
+    Microseconds spent importing during the boot, from the -X importtime
+    output: in total, and cumulatively for each of PACKAGES
+    """
+    times = {'total': 0}
+    for line in stderr.split(BOOTED)[0].splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$', line)
+        if not match:
+            continue
+        times['total'] += int(match.group(1))
+        if match.group(3) in PACKAGES:
+            times[match.group(3)] = int(match.group(2))
+    return times
+
+
+def boot(mode):
+    env = dict(os.environ, ALLOWED_HOSTS='localhost', API_THROTTLE_ENABLED='False',
+               AGRICULTURE_PRELOAD=str(mode == 'ml'))
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', WORKER, mode],
+        cwd=_setup.BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if process.returncode:
+        sys.exit(process.stderr[-3000:])
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result['imports'] = import_times(process.stderr)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = {}
+    for mode in MODES:
+        runs = [boot(mode) for _ in range(args.repeat)]
+        row = {key: statistics.median(run[key] for run in runs)
+               for key in ('boot_ms', 'boot_rss_mb', 'services_ms', 'analyze_ms', 'end_rss_mb')}
+        row['torch_at_boot'] = runs[0]['torch_at_boot']
+        row['imports'] = {package: statistics.median(run['imports'].get(package, 0) for run in runs) / 1000
+                          for package in ('total', *PACKAGES)}
+        rows[mode] = row
+
+    print(f"\nmedian of {args.repeat} boots\n")
+    columns = ('boot_ms', 'boot_rss_mb', 'torch_at_boot', 'services_ms', 'analyze_ms', 'end_rss_mb')
+    print(f"{'mode':<8}" + ''.join(f'{column:>15}' for column in columns))
+    for mode, row in rows.items():
+        print(f"{mode:<8}" + ''.join(
+            f'{row[column]!s:>15}' if isinstance(row[column], bool) else f'{row[column]:>15.1f}'
+            for column in columns))
+
+    print("\nimport time during the boot (ms)\n")
+    print(f"{'mode':<8}" + ''.join(f'{package:>15}' for package in ('total', *PACKAGES)))
+    for mode, row in rows.items():
+        print(f"{mode:<8}" + ''.join(f"{row['imports'][package]:>15.1f}" for package in ('total', *PACKAGES)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 from django.contrib import admin
+from core.search import FullTextSearchAdminMixin
+
 from .models import CaseStudy
+from .search import case_study_index
 
 # Register your models here.
 
 @admin.register(CaseStudy)
-class CaseStudyAdmin(admin.ModelAdmin):
+class CaseStudyAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('title', 'slug', 'order', 'client_name', 'client_industry')
     list_filter = ('client_industry',)
     search_fields = ('title', 'description', 'client_name', 'client_industry')
     prepopulated_fields = {'slug': ('title',)}
+    search_index = case_study_index
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CaseStudiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'case_studies'
+
+    def ready(self):
+        from core import media
+        from . import search, signals  # noqa: F401
+        from .models import CaseStudy
+
+        media.track(CaseStudy)
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case_studies', '0004_remove_casestudy_technologies_alter_casestudy_slug'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.CharField(max_length=255, unique=True)),
+                ('last_suffix', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
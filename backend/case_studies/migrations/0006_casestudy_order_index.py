@@ -0,0 +1,22 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case_studies', '0005_slugcounter'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='casestudy',
+            name='order',
+            field=models.IntegerField(blank=True),
+        ),
+        migrations.AddIndex(
+            model_name='casestudy',
+            index=models.Index(fields=['order', 'title'], name='case_study_order_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case_studies', '0006_casestudy_order_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casestudy',
+            index=models.Index(fields=['client_industry', 'order', 'title'], name='case_study_industry_idx'),
+        ),
+    ]
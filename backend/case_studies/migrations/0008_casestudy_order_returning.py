@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 13:13
+
+import case_studies.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('case_studies', '0007_casestudy_industry_index'),
+    ]
+
+    # The column is unchanged; altering it on SQLite would rebuild the table
+    # and drop the search index triggers
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='casestudy',
+                    name='order',
+                    field=case_studies.models.PositionField(blank=True),
+                ),
+            ],
+        ),
+    ]
@@ -1,8 +1,49 @@
-from django.db import models
+import re
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import BigIntegerField, F, Max, Subquery
+from django.db.models.functions import Cast, Coalesce, Substr
 from django.utils.text import slugify
 
 # Create your models here.
 
+SLUG_SAVE_ATTEMPTS = 5
+
+
+class SlugCounter(models.Model):
+    """Highest numeric suffix handed out per base slug"""
+    base = models.CharField(max_length=255, unique=True)
+    last_suffix = models.PositiveBigIntegerField(default=0)
+
+    @classmethod
+    def reserve(cls, base, count, seed):
+        """
+        Atomically advance the counter for ``base`` by ``count`` and return the
+        reserved suffixes. ``seed()`` gives the highest suffix already in use
+        and is only called the first time a base collides.
+        """
+        with transaction.atomic():
+            if not cls.objects.filter(base=base).update(last_suffix=F('last_suffix') + count):
+                counter, created = cls.objects.get_or_create(base=base, defaults={'last_suffix': seed() + count})
+                if not created:
+                    cls.objects.filter(base=base).update(last_suffix=F('last_suffix') + count)
+            last = cls.objects.filter(base=base).values_list('last_suffix', flat=True).get()
+        return range(last - count + 1, last + 1)
+
+    def __str__(self):
+        return f"{self.base}: {self.last_suffix}"
+
+
+class PositionField(models.IntegerField):
+    """
+    An integer the database may compute on insert. Its value is read back
+    with RETURNING where the backend supports it, in the INSERT statement.
+    """
+
+    @property
+    def db_returning(self):
+        return connection.features.can_return_columns_from_insert
+
+
 class CaseStudy(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, blank=True, null=True)  # Allow blank for auto-generation
@@ -13,21 +54,97 @@ class CaseStudy(models.Model):
     solution = models.TextField(blank=True)   # Optional
     results = models.TextField(blank=True)    # Optional
     image = models.ImageField(upload_to='case_studies/', null=True, blank=True)
-    order = models.IntegerField(default=0)
+    order = PositionField(blank=True)  # Left empty, the next free position is assigned on save
+
+    @staticmethod
+    def _max_slug_suffix(base):
+        """Highest N among existing ``base-N`` slugs (0 if none), from an index range scan"""
+        return CaseStudy.objects.filter(
+            slug__gt=f'{base}-',
+            slug__lt=f'{base}.',  # '.' sorts right after '-'
+            slug__regex=rf'^{re.escape(base)}-[0-9]+$',
+        ).aggregate(
+            max_suffix=Max(Cast(Substr('slug', len(base) + 2), BigIntegerField()))
+        )['max_suffix'] or 0
+
+    def _next_free_slug(self, base):
+        """
+        Return ``base`` if it is free, otherwise ``base-N`` from the base's
+        SlugCounter. Both are unique-index lookups, so the cost does not grow
+        with the number of earlier collisions.
+        """
+        if not CaseStudy.objects.filter(slug=base).exclude(pk=self.pk).exists():
+            return base
+        return f"{base}-{self.reserve_slug_suffixes(base, 1)[0]}"
+
+    @classmethod
+    def prepare_bulk_save(cls, instances):
+        """
+        Apply save()'s slug and order defaults to a batch headed for
+        bulk_create/bulk_update, with a fixed number of queries per batch
+        (plus one counter reservation per colliding title).
+        """
+        pks = [instance.pk for instance in instances if instance.pk]
+        groups = {}
+        for instance in instances:
+            groups.setdefault(instance.slug or slugify(instance.title), []).append(instance)
+
+        taken = set(
+            cls.objects.filter(slug__in=list(groups)).exclude(pk__in=pks).values_list('slug', flat=True)
+        )
+        for base, group in groups.items():
+            if base not in taken:
+                group[0].slug = base
+                group = group[1:]
+            if group:
+                suffixes = cls.reserve_slug_suffixes(base, len(group))
+                for instance, suffix in zip(group, suffixes):
+                    instance.slug = f"{base}-{suffix}"
+
+        unordered = [instance for instance in instances if instance.order is None]
+        if unordered:
+            last_order = cls.objects.order_by('-order').values_list('order', flat=True).first() or 0
+            for position, instance in enumerate(unordered, start=last_order + 1):
+                instance.order = position
+
+    @classmethod
+    def reserve_slug_suffixes(cls, base, count):
+        return SlugCounter.reserve(base, count, lambda: cls._max_slug_suffix(base))
 
     def save(self, *args, **kwargs):
         # Generate slug from title if not provided
         if not self.slug:
             self.slug = slugify(self.title)
         
-        # Ensure unique slug
-        original_slug = self.slug
-        counter = 1
-        while CaseStudy.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
-            self.slug = f"{original_slug}-{counter}"
-            counter += 1
-        
-        super().save(*args, **kwargs)
+        # Ensure unique slug. A concurrent insert can claim the same slug
+        # between the lookup and our write; the unique constraint catches
+        # that and we pick the next suffix.
+        base_slug = self.slug
+
+        # Append new case studies at the end, and move existing ones there
+        # when their order is cleared. The position is computed by a subquery
+        # inside the INSERT or UPDATE statement itself (an index lookup on
+        # order), so concurrent saves cannot both read the same maximum.
+        assign_order = self.order is None
+        if assign_order:
+            last_order = CaseStudy.objects.order_by('-order').values('order')[:1]
+            self.order = Coalesce(Subquery(last_order), 0) + 1
+
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            self.slug = self._next_free_slug(base_slug)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                break
+            except IntegrityError:
+                slug_clash = CaseStudy.objects.filter(slug=self.slug).exclude(pk=self.pk).exists()
+                if not slug_clash or attempt == SLUG_SAVE_ATTEMPTS - 1:
+                    raise
+
+        # The INSERT returns the assigned position; an UPDATE, or a backend
+        # without RETURNING, leaves the expression behind
+        if assign_order and not isinstance(self.order, int):
+            self.order = CaseStudy.objects.filter(pk=self.pk).values_list('order', flat=True).get()
 
     def __str__(self):
         return self.title
@@ -35,3 +152,8 @@ class CaseStudy(models.Model):
     class Meta:
         ordering = ['order', 'title']
         verbose_name_plural = 'Case Studies'
+        indexes = [
+            models.Index(fields=['order', 'title'], name='case_study_order_idx'),
+            # Admin industry filter, in list order
+            models.Index(fields=['client_industry', 'order', 'title'], name='case_study_industry_idx'),
+        ]
@@ -0,0 +1,9 @@
+from core.search import FullTextIndex
+
+from .models import CaseStudy
+
+case_study_index = FullTextIndex(
+    CaseStudy,
+    columns=('title', 'description', 'client_name', 'client_industry', 'challenge', 'solution', 'results'),
+    weights=(10.0, 4.0, 3.0, 3.0, 1.0, 1.0, 1.0),
+)
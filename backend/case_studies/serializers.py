@@ -1,19 +1,22 @@
 from rest_framework import serializers
 from django.utils.text import slugify
+from core.fieldsets import SparseFieldsetSerializerMixin
+from core.images import ResponsiveImageField
 from .models import CaseStudy
 import json
 
-class CaseStudySerializer(serializers.ModelSerializer):
+class CaseStudySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     slug = serializers.CharField(required=False)  # Make slug optional
     order = serializers.IntegerField(required=False)
     client_name = serializers.CharField(required=True)  # Make client name required
     client_industry = serializers.CharField(required=True)  # Make client industry required
     image = serializers.ImageField(required=False, allow_null=True)
+    image_variants = ResponsiveImageField(source='image')
 
     class Meta:
         model = CaseStudy
         fields = ['id', 'title', 'slug', 'description', 'client_name', 'client_industry',
-                 'challenge', 'solution', 'results', 'image', 'order']
+                 'challenge', 'solution', 'results', 'image', 'image_variants', 'order']
 
     def to_internal_value(self, data):
         # Create a mutable copy of the data
@@ -26,10 +29,7 @@ class CaseStudySerializer(serializers.ModelSerializer):
         if 'title' in data and not data.get('slug'):
             data['slug'] = slugify(data['title'])
 
-        # Set default order if not provided
-        if 'order' not in data:
-            last_order = CaseStudy.objects.all().order_by('-order').first()
-            data['order'] = (last_order.order + 1) if last_order else 1
+        # A missing order is assigned by CaseStudy.save on insert
 
         # Ensure required fields are present
         required_fields = {
@@ -46,10 +46,6 @@ class CaseStudySerializer(serializers.ModelSerializer):
         return data
 
     def create(self, validated_data):
-        # Ensure technologies is a list
-        if 'technologies' not in validated_data:
-            validated_data['technologies'] = []
-        
         # Handle image separately
         image = validated_data.pop('image', None)
         instance = super().create(validated_data)
@@ -86,6 +82,8 @@ class CaseStudySerializer(serializers.ModelSerializer):
 
     def to_representation(self, instance):
         ret = super().to_representation(instance)
+        if self.sparse_fields is not None:
+            return ret
         # Ensure technologies is always a list
         ret['technologies'] = ret.get('technologies', [])
         if not isinstance(ret['technologies'], list):
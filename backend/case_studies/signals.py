@@ -0,0 +1,6 @@
+from django.db.models.signals import post_save, post_delete
+from core.signals import handle_content_change
+from .models import CaseStudy
+
+post_save.connect(handle_content_change, sender=CaseStudy, dispatch_uid='content-save-case_studies.casestudy')
+post_delete.connect(handle_content_change, sender=CaseStudy, dispatch_uid='content-delete-case_studies.casestudy')
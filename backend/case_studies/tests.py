@@ -1,3 +1,200 @@
-from django.test import TestCase
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.cache import get_cache
+from core.testing import QueryBudgetAssertionsMixin, QueryPlanAssertionsMixin, TestCase
+
+from .models import CaseStudy, SlugCounter
+
+
+class QueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', case_studies=60, stdout=StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+
+    def test_list_uses_order_index(self):
+        api = APIClient(HTTP_HOST='localhost')
+        with self.assertQueriesUseIndex('case_studies_casestudy', 'case_study_order_idx'):
+            self.assertEqual(api.get('/api/case-studies/').status_code, 200)
+
+    def test_admin_industry_filter_uses_index(self):
+        self.client.force_login(self.admin)
+        with self.assertQueriesUseIndex('case_studies_casestudy', 'case_study_industry_idx'):
+            response = self.client.get('/admin/case_studies/casestudy/', {'client_industry': 'Retail'}, HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+
+
+class QueryBudgetTests(QueryBudgetAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', case_studies=30, stdout=StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+        self.admin_api = APIClient(HTTP_HOST='localhost')
+        self.admin_api.force_authenticate(self.admin)
+        # The viewset prints debugging output on every write
+        quiet = redirect_stdout(StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def assertStatus(self, response, status_code):
+        self.assertEqual(response.status_code, status_code, getattr(response, 'data', response))
+
+    def test_case_study_endpoints(self):
+        case_study = CaseStudy.objects.first()
+        url = f'/api/case-studies/{case_study.pk}/'
+        payload = {
+            'title': 'AI Assistant Healthcare',  # Collides with a seeded slug
+            'description': 'Triage assistant',
+            'client_name': 'Clinic',
+            'client_industry': 'Healthcare',
+        }
+
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/case-studies/'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', url), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/case-studies/search/?q=vision'), 200)
+        # Deferred columns must not be loaded row by row
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/case-studies/?fields=id,title,image'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/case-studies/?view=compact'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'POST', '/api/case-studies/', payload), 201)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PUT', url, dict(payload, title='Renamed')), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', url, dict(payload, results='Faster triage')), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', url), 204)
+
+    def test_case_study_bulk_endpoints(self):
+        items = [
+            {'title': 'Imported Case Study', 'description': 'Bulk', 'client_name': 'Client', 'client_industry': 'Retail'}
+            for _ in range(20)
+        ]
+        response = self.assertWithinQueryBudget(self.admin_api, 'POST', '/api/case-studies/bulk/', items, format='json')
+        self.assertStatus(response, 201)
+        ids = [result['data']['id'] for result in response.data['results']]
+        updates = [dict(item, id=pk, results='Updated') for item, pk in zip(items, ids)]
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', '/api/case-studies/bulk/', updates, format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', '/api/case-studies/bulk/', {'ids': ids}, format='json'), 200)
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', stdout=StringIO())
+
+    def search(self, query):
+        response = APIClient(HTTP_HOST='localhost').get('/api/case-studies/search/', {'q': query})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_ranked_prefix_matches_with_highlights(self):
+        results = self.search('fraud detect')
+        self.assertEqual(results[0]['slug'], 'financial-fraud-detection')
+        self.assertEqual(results[0]['search']['title'], 'Financial <mark>Fraud</mark> <mark>Detection</mark> System')
+
+    def test_index_follows_writes_that_skip_signals(self):
+        CaseStudy.objects.filter(slug='autonomous-drone-navigation').update(title='Autonomous <Quadcopter> Routing')
+        match = self.search('quadcop')[0]['search']
+        self.assertEqual(match['title'], 'Autonomous &lt;<mark>Quadcopter</mark>&gt; Routing')
+
+        CaseStudy.objects.filter(slug='autonomous-drone-navigation').delete()
+        self.assertEqual(self.search('quadcop'), [])
+
+
+class FieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', stdout=StringIO())
+
+    def setUp(self):
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+
+    def test_sparse_fields(self):
+        response = self.api.get('/api/case-studies/', {'fields': 'id,title'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title'})
+
+    def test_sparse_fields_load_only_their_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.api.get('/api/case-studies/', {'fields': 'id,title'})
+        page = [query['sql'] for query in queries if 'LIMIT' in query['sql'] and 'case_studies_casestudy' in query['sql']][-1]
+        self.assertIn('"title"', page)
+        self.assertNotIn('"description"', page)
+
+    def test_unknown_field_is_rejected(self):
+        self.assertEqual(self.api.get('/api/case-studies/', {'fields': 'id,secret'}).status_code, 400)
+
+    def test_compact_view(self):
+        response = self.api.get('/api/case-studies/', {'view': 'compact'})
+        self.assertEqual(response.status_code, 200)
+        item = response.data['results'][0]
+        self.assertEqual(item['slug'], 'ai-assistant-healthcare')
+        self.assertEqual(item['image'], 'http://localhost/media/case_studies/healthcare_ai.jpg')
+        self.assertLessEqual(len(item['summary']), 200)
+        self.assertNotIn('challenge', item)
+
+
+class OrderAndSlugTests(TestCase):
+    def create(self, title, **fields):
+        return CaseStudy.objects.create(title=title, description='Body', **fields)
+
+    def test_creates_are_appended_in_order(self):
+        self.assertEqual([self.create(f'Study {n}').order for n in range(3)], [1, 2, 3])
+        self.assertEqual(self.create('Pinned', order=10).order, 10)
+        self.assertEqual(self.create('After pinned').order, 11)
+
+    def test_order_is_returned_by_the_insert(self):
+        self.create('First')
+        with CaptureQueriesContext(connection) as queries:
+            case_study = self.create('Second')
+        self.assertEqual(case_study.order, 2)
+        self.assertFalse([query for query in queries if query['sql'].startswith('SELECT "case_studies_casestudy"."order"')])
+
+    def test_update_without_order_query(self):
+        case_study = self.create('First')
+        with CaptureQueriesContext(connection) as queries:
+            case_study.description = 'Changed'
+            case_study.save()
+        self.assertFalse([query for query in queries if 'MAX' in query['sql'] or 'ORDER BY' in query['sql']])
+        self.assertEqual(CaseStudy.objects.get(pk=case_study.pk).order, 1)
+
+    def test_clearing_order_moves_to_the_end(self):
+        first = self.create('First')
+        self.create('Second')
+        first.order = None
+        first.save()
+        self.assertEqual(first.order, 3)
+        self.assertEqual(list(CaseStudy.objects.values_list('title', flat=True)), ['Second', 'First'])
+
+    def test_colliding_titles_get_suffixes(self):
+        slugs = [self.create('Vision Platform').slug for _ in range(3)]
+        self.assertEqual(slugs, ['vision-platform', 'vision-platform-1', 'vision-platform-2'])
+        self.assertEqual(SlugCounter.objects.get(base='vision-platform').last_suffix, 2)
+
+    def test_slug_claimed_between_lookup_and_insert_is_retried(self):
+        self.create('Vision Platform')
+        original = CaseStudy._next_free_slug
+        calls = []
+
+        def stale_lookup(instance, base):
+            # The first lookup misses the row inserted by a concurrent save
+            calls.append(base)
+            return base if len(calls) == 1 else original(instance, base)
+
+        with mock.patch.object(CaseStudy, '_next_free_slug', stale_lookup):
+            case_study = self.create('Vision Platform')
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(case_study.slug, 'vision-platform-1')
+        self.assertEqual(case_study.order, 2)
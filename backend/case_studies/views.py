@@ -3,25 +3,37 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
+from django.db.models.functions import Substr
 from .models import CaseStudy
+from .search import case_study_index
 from .serializers import CaseStudySerializer
 from rest_framework.parsers import MultiPartParser, FormParser
 import json
 from rest_framework.exceptions import ValidationError
 from rest_framework import serializers
+from core.cache import CachedResponseMixin
+from core.bulk import BulkModelMixin
+from core.conditional import ConditionalGetMixin
+from core.replicas import ReplicaReadMixin
+from core.fieldsets import SparseFieldsetMixin
+from core.search import FullTextSearchMixin
 
 # Create your views here.
 
-class CaseStudyViewSet(viewsets.ModelViewSet):
+class CaseStudyViewSet(ReplicaReadMixin, FullTextSearchMixin, BulkModelMixin, ConditionalGetMixin, CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     queryset = CaseStudy.objects.all()
     serializer_class = CaseStudySerializer
     parser_classes = [MultiPartParser, FormParser]
+    search_index = case_study_index
+    # ?view=compact: card data only, with the first 200 characters of the description
+    compact_fields = ('id', 'title', 'slug', 'client_name', 'client_industry', 'image', 'order')
+    compact_annotations = {'summary': Substr('description', 1, 200)}
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search']:
             permission_classes = [AllowAny]
         else:
             permission_classes = [IsAuthenticated]
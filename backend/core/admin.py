@@ -1,11 +1,13 @@
 from django.contrib import admin
 from .models import Service, CaseStudy, TeamMember, ContactMessage
+from .search import FullTextSearchAdminMixin, service_index
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ('name', 'created_at', 'updated_at')
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name', 'description')
+    search_index = service_index
 
 @admin.register(CaseStudy)
 class CaseStudyAdmin(admin.ModelAdmin):
@@ -23,5 +25,6 @@ class TeamMemberAdmin(admin.ModelAdmin):
 class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'company', 'created_at', 'is_read')
     list_filter = ('is_read', 'created_at')
+    ordering = ('-created_at',)
     search_fields = ('name', 'email', 'company', 'message')
     readonly_fields = ('created_at',)
@@ -1,6 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import images, media, signals, storage  # noqa: F401
+        from .models import CaseStudy, TeamMember
+        from .search import ensure_indexes
+
+        media.track(CaseStudy)
+        media.track(TeamMember)
+
+        # Sent for every app once the migration run is complete; ensure() is
+        # a no-op when the FTS tables and triggers are already in place
+        post_migrate.connect(ensure_indexes, dispatch_uid='core-fts-indexes')
@@ -0,0 +1,205 @@
+"""
+Bulk create/update/delete for model viewsets.
+
+``POST``, ``PATCH`` and ``DELETE`` on ``<resource>/bulk/`` take a JSON array
+(``{"ids": [...]}`` for delete). Every item is validated with the viewset's
+own serializer first; if any item fails nothing is written and the response
+lists the errors per item. Otherwise the whole batch is written with
+bulk_create/bulk_update/one DELETE inside a single transaction, and cache
+invalidation / content versions are bumped once for the batch.
+
+Models may define a ``prepare_bulk_save(instances)`` classmethod to apply the
+defaults their ``save()`` would otherwise fill in (slugs, ordering), since
+bulk writes bypass ``save()``.
+
+Bulk requests are JSON only, so file fields are left untouched; images are
+uploaded through the regular per-item endpoints. Resources with a required
+file field cannot be created in bulk.
+"""
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from .signals import bulk_change
+
+MAX_BULK_ITEMS = 500
+# The configured JSON parser(s), without form/multipart
+JSON_PARSERS = [parser for parser in api_settings.DEFAULT_PARSER_CLASSES if parser.media_type == 'application/json']
+
+
+class BulkModelMixin:
+    bulk_max_items = MAX_BULK_ITEMS
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        serializer = self.get_serializer(*args, **kwargs)
+        for field in serializer.fields.values():
+            if isinstance(field, serializers.FileField):
+                field.required = False
+                field.read_only = True
+        return serializer
+
+    def _required_file_fields(self):
+        return [
+            name for name, field in self.get_serializer().fields.items()
+            if isinstance(field, serializers.FileField) and field.required and not field.read_only
+        ]
+
+    def _coerce_ids(self, ids):
+        """Client ids as integers, or (None, per-item results) if any is not one"""
+        try:
+            return serializers.ListField(child=serializers.IntegerField()).run_validation(ids), None
+        except serializers.ValidationError as e:
+            return None, [
+                {'index': index, 'status': 'invalid', 'errors': {'id': errors}}
+                for index, errors in sorted(e.detail.items())
+            ]
+
+    def _bulk_error(self, message, results=None, status_code=status.HTTP_400_BAD_REQUEST):
+        data = {'error': True, 'message': message}
+        if results is not None:
+            data['results'] = results
+        return Response(data, status=status_code)
+
+    def _check_bulk_items(self, items):
+        if not isinstance(items, list) or not items:
+            return self._bulk_error('Expected a non-empty JSON array')
+        if len(items) > self.bulk_max_items:
+            return self._bulk_error(f'At most {self.bulk_max_items} items per request')
+        return None
+
+    def _validate_bulk_items(self, items, ids=None, instances=None):
+        """Validate every item; return (serializers, per-item results, ok)"""
+        validated, results, ok = [], [], True
+        for index, item in enumerate(items):
+            instance = None
+            if instances is not None:
+                instance = instances.get(ids[index])
+                if instance is None:
+                    results.append({'index': index, 'status': 'not_found', 'id': ids[index]})
+                    ok = False
+                    continue
+            serializer = self.get_bulk_serializer(instance, data=item, partial=instance is not None)
+            if serializer.is_valid():
+                results.append({'index': index, 'status': 'valid'})
+            else:
+                results.append({'index': index, 'status': 'invalid', 'errors': serializer.errors})
+                ok = False
+            validated.append(serializer)
+        return validated, results, ok
+
+    def _prepare_bulk(self, model, instances):
+        prepare = getattr(model, 'prepare_bulk_save', None)
+        if prepare is not None:
+            prepare(instances)
+
+    def _bulk_results(self, instances, result_status):
+        data = self.get_serializer(instances, many=True).data
+        return [
+            {'index': index, 'status': result_status, 'data': item}
+            for index, item in enumerate(data)
+        ]
+
+    @action(detail=False, methods=['post', 'patch', 'delete'], url_path='bulk', parser_classes=JSON_PARSERS)
+    def bulk(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            return self.bulk_create(request)
+        if request.method == 'PATCH':
+            return self.bulk_update(request)
+        return self.bulk_destroy(request)
+
+    def bulk_create(self, request):
+        items = request.data
+        error = self._check_bulk_items(items)
+        if error:
+            return error
+
+        file_fields = self._required_file_fields()
+        if file_fields:
+            return self._bulk_error(f"Cannot create in bulk without files for: {', '.join(file_fields)}")
+
+        validated, results, ok = self._validate_bulk_items(items)
+        if not ok:
+            return self._bulk_error('Validation error', results)
+
+        model = self.get_queryset().model
+        instances = [model(**serializer.validated_data) for serializer in validated]
+        try:
+            with bulk_change(model), transaction.atomic():
+                self._prepare_bulk(model, instances)
+                instances = model.objects.bulk_create(instances)
+        except IntegrityError as e:
+            return self._bulk_error(str(e), status_code=status.HTTP_409_CONFLICT)
+        return Response({'results': self._bulk_results(instances, 'created')}, status=status.HTTP_201_CREATED)
+
+    def bulk_update(self, request):
+        items = request.data
+        error = self._check_bulk_items(items)
+        if error:
+            return error
+
+        ids, errors = self._coerce_ids([item.get('id') if isinstance(item, dict) else None for item in items])
+        if errors:
+            return self._bulk_error('Invalid ids', errors)
+
+        instances = self.get_queryset().in_bulk(ids)
+        validated, results, ok = self._validate_bulk_items(items, ids, instances)
+        if not ok:
+            return self._bulk_error('Validation error', results)
+
+        model = self.get_queryset().model
+        concrete = model._meta.concrete_fields
+        original = {
+            serializer.instance.pk: [getattr(serializer.instance, f.attname) for f in concrete]
+            for serializer in validated
+        }
+        now = timezone.now()
+        updated = []
+        for serializer in validated:
+            instance = serializer.instance
+            for attr, value in serializer.validated_data.items():
+                setattr(instance, attr, value)
+            for field in concrete:
+                if getattr(field, 'auto_now', False):
+                    setattr(instance, field.attname, now)
+            updated.append(instance)
+
+        try:
+            with bulk_change(model), transaction.atomic():
+                self._prepare_bulk(model, updated)
+                # Only write the columns that changed, including any that
+                # prepare_bulk_save() filled in
+                fields = {
+                    field.name
+                    for instance in updated
+                    for field, before in zip(concrete, original[instance.pk])
+                    if not field.primary_key and getattr(instance, field.attname) != before
+                }
+                if fields:
+                    model.objects.bulk_update(updated, sorted(fields))
+        except IntegrityError as e:
+            return self._bulk_error(str(e), status_code=status.HTTP_409_CONFLICT)
+        return Response({'results': self._bulk_results(updated, 'updated')})
+
+    def bulk_destroy(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        error = self._check_bulk_items(ids)
+        if error:
+            return error
+        ids, errors = self._coerce_ids(ids)
+        if errors:
+            return self._bulk_error('Invalid ids', errors)
+
+        model = self.get_queryset().model
+        queryset = self.get_queryset().filter(pk__in=ids)
+        with bulk_change(model), transaction.atomic():
+            existing = set(queryset.values_list('pk', flat=True))
+            queryset.delete()
+        results = [
+            {'index': index, 'status': 'deleted' if pk in existing else 'not_found', 'id': pk}
+            for index, pk in enumerate(ids)
+        ]
+        return Response({'results': results})
+
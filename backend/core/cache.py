@@ -0,0 +1,149 @@
+"""
+Rendered-response cache for the public read endpoints.
+
+Keys embed a per-model generation number. Saving or deleting an instance
+bumps that model's generation (see ``signals.py``), so every cached list and
+detail page for the model is invalidated at once without having to find and
+delete individual keys - which also works on backends that cannot scan keys.
+
+The backend is the ``api`` entry in ``CACHES``: local memory by default, or a
+file/Redis cache shared between workers.
+"""
+import hashlib
+import threading
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from . import replicas
+
+CACHE_ALIAS = 'api'
+
+
+class CacheMetrics:
+    """Per-endpoint hit/miss counters for this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, endpoint, hit):
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            counts['hits' if hit else 'misses'] += 1
+
+    def reset(self):
+        with self._lock:
+            self._counts = {}
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                endpoint: dict(counts, hit_rate=round(counts['hits'] / (counts['hits'] + counts['misses']), 4))
+                for endpoint, counts in self._counts.items()
+            }
+
+
+cache_metrics = CacheMetrics()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def _generation_key(model):
+    return f'api-generation:{model._meta.label_lower}'
+
+
+def get_generation(model):
+    return get_cache().get(_generation_key(model), 0)
+
+
+def _changed_key(model):
+    return f'api-changed:{model._meta.label_lower}'
+
+
+def changed_recently(model):
+    """Whether ``model`` changed within DATABASE_REPLICA_LAG seconds, i.e. the replica may not have it yet"""
+    return get_cache().get(_changed_key(model)) is not None
+
+
+def invalidate_model(model):
+    """Invalidate every cached response built from ``model``"""
+    cache = get_cache()
+    if replicas.enabled():
+        cache.set(_changed_key(model), True, settings.DATABASE_REPLICA_LAG)
+    key = _generation_key(model)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def response_cache_key(request, model):
+    """Key on host, path, sorted query params and the negotiated format"""
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.md5(f'{request.accepted_renderer.format}:{url}'.encode()).hexdigest()
+    return f'api-response:{model._meta.label_lower}:{get_generation(model)}:{digest}'
+
+
+class CachedResponseMixin:
+    """
+    Serve ``list`` and ``retrieve`` from the rendered-response cache. Only
+    successful JSON responses to anonymous clients are stored; everything
+    else, including every request of an authenticated user, passes through,
+    so editors always see the database and nothing per-user is shared.
+    Hits and misses are counted per endpoint (GET /api/cache/stats/).
+    """
+    cached_actions = ('list', 'retrieve')
+
+    def _cache_endpoint(self):
+        return f'{self.basename}-{self.action}'
+
+    def dispatch(self, request, *args, **kwargs):
+        self._response_cache_key = None
+        return super().dispatch(request, *args, **kwargs)
+
+    def _cached(self, request, handler, *args, **kwargs):
+        if request.accepted_renderer.format != 'json' or request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+
+        key = response_cache_key(request, self.get_queryset().model)
+        cached = get_cache().get(key)
+        cache_metrics.record(self._cache_endpoint(), hit=cached is not None)
+        if cached is not None:
+            content, status_code, headers = cached
+            response = HttpResponse(content, status=status_code)
+            for name, value in headers:
+                response[name] = value
+            response['X-Cache'] = 'HIT'
+            return response
+
+        # A lagging replica would store the old rows under the new generation
+        if not (replicas.reading_from_replica() and changed_recently(self.get_queryset().model)):
+            self._response_cache_key = key
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached(request, super().retrieve, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = self._response_cache_key
+        if key and response.status_code == 200 and hasattr(response, 'add_post_render_callback'):
+            response['X-Cache'] = 'MISS'
+
+            def store(rendered):
+                headers = [(name, value) for name, value in rendered.items() if name != 'X-Cache']
+                get_cache().set(key, (rendered.content, rendered.status_code, headers))
+
+            response.add_post_render_callback(store)
+        return response
@@ -0,0 +1,60 @@
+"""
+Conditional GET support (ETag / Last-Modified / 304) for the read API.
+
+Validators come from the per-table ``ContentVersion`` counter: one indexed
+lookup, so a 304 is answered without running the endpoint's queryset or
+serializer. The ETag also covers the host, path, query string and negotiated
+format, since each of those changes the response body.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .models import ContentVersion
+
+
+def compute_validators(request, model):
+    version, updated_at = ContentVersion.lookup(model)
+    query = urlencode(sorted(request.query_params.lists()), doseq=True)
+    representation = (
+        f'{model._meta.label_lower}:{version}:{request.accepted_renderer.format}:'
+        f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    )
+    etag = f'"{hashlib.sha1(representation.encode()).hexdigest()}"'
+    last_modified = int(updated_at.timestamp()) if updated_at else None
+    return etag, last_modified
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match`` / ``If-Modified-Since`` on ``list`` and
+    ``retrieve`` with 304, and tag full responses with ETag and
+    Last-Modified. Runs after authentication, permissions and content
+    negotiation, so a 304 never leaks what a 403 would have hidden.
+    """
+
+    def _conditional(self, request, handler, *args, **kwargs):
+        etag, last_modified = compute_validators(request, self.get_queryset().model)
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            if not_modified.status_code == 304:
+                not_modified['ETag'] = etag
+                patch_cache_control(not_modified, no_cache=True)
+            return not_modified
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Let clients keep a copy but revalidate it on every use
+            patch_cache_control(response, no_cache=True)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,121 @@
+"""
+Sparse fieldsets and compact list representations.
+
+``?fields=id,title,slug`` on list, retrieve and search returns only those
+fields, and the queryset loads only the columns behind them (``.only()``).
+
+``?view=compact`` on list skips the model serializer: rows come straight
+from ``.values()`` over ``compact_fields`` plus ``compact_annotations``
+(e.g. a truncated description), with file fields turned into absolute URLs.
+"""
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+@lru_cache(maxsize=None)
+def field_sources(serializer_class):
+    """
+    Serializer field name -> the model attribute it reads. Building a model
+    serializer's fields costs about a millisecond, so this is done once per
+    class rather than on every get_queryset() call.
+    """
+    return {name: field.source.split('.')[0] for name, field in serializer_class().fields.items()}
+
+
+class SparseFieldsetSerializerMixin:
+    """Serializer accepting ``fields=[...]`` to drop every other field"""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        self.sparse_fields = fields
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+        if self.sparse_fields is not None:
+            # Also drops keys added by to_representation overrides
+            for name in set(ret) - set(self.sparse_fields):
+                ret.pop(name)
+        return ret
+
+
+class SparseFieldsetMixin:
+    sparse_actions = ('list', 'retrieve', 'search')
+    compact_fields = ()
+    compact_annotations = {}
+
+    def requested_fields(self):
+        """Validated ``?fields=`` names, or None for the full representation"""
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self._parse_fields()
+        return self._requested_fields
+
+    def _parse_fields(self):
+        if self.action not in self.sparse_actions or self.request.method != 'GET':
+            return None
+        value = self.request.query_params.get('fields')
+        if not value:
+            return None
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        available = field_sources(self.get_serializer_class())
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValidationError({'fields': f"Unknown field(s): {', '.join(unknown)}. "
+                                             f"Available: {', '.join(available)}"})
+        return names
+
+    def _columns_for(self, names):
+        """Concrete model fields backing the serializer fields ``names``"""
+        serializer_class = self.get_serializer_class()
+        model = serializer_class.Meta.model
+        sources = field_sources(serializer_class)
+        columns = {model._meta.pk.name}
+        for name in names:
+            source = sources[name]
+            try:
+                field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete:
+                columns.add(field.name)
+        return columns
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names = self.requested_fields()
+        if names:
+            queryset = queryset.only(*self._columns_for(names))
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        names = self.requested_fields()
+        if names:
+            kwargs.setdefault('fields', names)
+        return super().get_serializer(*args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get('view') == 'compact' and self.compact_fields:
+            return self.compact_list(request)
+        return super().list(request, *args, **kwargs)
+
+    def compact_list(self, request):
+        queryset = super().get_queryset()
+        rows = self.filter_queryset(queryset).values(*self.compact_fields, **self.compact_annotations)
+        page = self.paginate_queryset(rows)
+        items = page if page is not None else list(rows)
+        file_fields = [
+            field for field in queryset.model._meta.concrete_fields
+            if isinstance(field, models.FileField) and field.name in self.compact_fields
+        ]
+        for row in items:
+            for field in file_fields:
+                name = row[field.name]
+                row[field.name] = request.build_absolute_uri(field.storage.url(name)) if name else None
+        return self.get_paginated_response(items) if page is not None else Response(items)
@@ -0,0 +1,228 @@
+"""
+Responsive derivatives of uploaded images.
+
+Every image field tracked by ``core.media`` (case study and team member
+photos) gets resized copies at ``IMAGE_DERIVATIVE_WIDTHS`` in each of
+``IMAGE_DERIVATIVE_FORMATS`` (AVIF/WebP plus a JPEG fallback). They are
+generated once the upload's transaction commits, and stored content-addressed
+under ``derived/<sha256 of the original>/`` so identical uploads share them.
+A ``ResponsiveImage`` row maps each original to its derivatives.
+
+Serializers expose them through ``ResponsiveImageField``: per-format srcsets
+ready for ``<picture>``, looked up with one query for the whole page. Saving
+a ``ResponsiveImage`` changes those responses, so it invalidates the cached
+responses and content versions of the models that reference its original.
+
+When an image is replaced or its row deleted, its ``ResponsiveImage`` is
+dropped once no tracked field references the original any more, and the
+derived files go with the last ``ResponsiveImage`` sharing their digest.
+
+    python manage.py generate_image_derivatives
+
+generates derivatives for images uploaded before this existed.
+"""
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from . import media
+from .models import ResponsiveImage
+from .signals import notify_change
+
+DERIVED_PREFIX = 'derived'
+
+# Pillow format name, file extension, MIME type and encoder options
+FORMATS = {
+    'avif': ('AVIF', 'avif', 'image/avif', {'quality': 55, 'speed': 8}),
+    'webp': ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+FALLBACK_FORMAT = 'jpeg'
+
+
+def file_digest(file):
+    sha = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        sha.update(chunk)
+    file.seek(0)
+    return sha.hexdigest()
+
+
+def target_widths(source_width, widths=None):
+    """Configured widths below the original's, plus the original if it is no wider than the largest"""
+    widths = sorted(widths or settings.IMAGE_DERIVATIVE_WIDTHS)
+    targets = [width for width in widths if width < source_width]
+    if source_width <= widths[-1]:
+        targets.append(source_width)
+    return targets
+
+
+def can_encode(name):
+    """Whether this Pillow build can save the derivative format ``name`` (AVIF needs libavif)"""
+    Image.init()
+    return FORMATS[name][0] in Image.SAVE
+
+
+def _prepare(image, image_format):
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    if not has_alpha:
+        return image if image.mode == 'RGB' else image.convert('RGB')
+    image = image.convert('RGBA')
+    if image_format != 'jpeg':
+        return image
+    # JPEG has no alpha channel: flatten onto white
+    background = Image.new('RGB', image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def encode_derivatives(file, digest, formats=None, widths=None):
+    """
+    Resize and encode ``file`` and store the results under ``derived/<digest>/``.
+    Returns (width, height, variants) for a ``ResponsiveImage``.
+    """
+    formats = [name for name in (formats or settings.IMAGE_DERIVATIVE_FORMATS) if name in FORMATS and can_encode(name)]
+    largest = max(widths or settings.IMAGE_DERIVATIVE_WIDTHS)
+    with Image.open(file) as image:
+        # Let the JPEG decoder downscale by a power of two while decoding;
+        # asking for the largest width in both dimensions keeps enough pixels
+        # whatever the EXIF orientation turns out to be
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        source_width, source_height = image.size
+
+        variants = []
+        for width in target_widths(source_width, widths):
+            height = max(1, round(source_height * width / source_width))
+            resized = image if width == source_width else image.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+            for name in formats:
+                pil_format, extension, _, options = FORMATS[name]
+                buffer = io.BytesIO()
+                _prepare(resized, name).save(buffer, pil_format, **options)
+                path = f'{DERIVED_PREFIX}/{digest[:2]}/{digest}/{width}w.{extension}'
+                if not default_storage.exists(path):
+                    path = default_storage.save(path, ContentFile(buffer.getvalue()))
+                variants.append({
+                    'format': name, 'width': width, 'height': height,
+                    'name': path, 'size': len(buffer.getvalue()),
+                })
+    return source_width, source_height, variants
+
+
+def generate(source, force=False):
+    """Create the ``ResponsiveImage`` for the stored file ``source``; reuse derivatives of identical files"""
+    if not force and ResponsiveImage.objects.filter(source=source).exists():
+        return None
+    try:
+        with default_storage.open(source, 'rb') as file:
+            digest = file_digest(file)
+            same = ResponsiveImage.objects.filter(digest=digest).exclude(source=source).first()
+            if same is not None and not force:
+                width, height, variants = same.width, same.height, same.variants
+            else:
+                width, height, variants = encode_derivatives(file, digest)
+    except (OSError, UnidentifiedImageError, Image.DecompressionBombError) as e:
+        print(f"Could not generate derivatives for {source}: {e}")
+        return None
+
+    responsive, _ = ResponsiveImage.objects.update_or_create(
+        source=source,
+        defaults={'digest': digest, 'width': width, 'height': height, 'variants': variants},
+    )
+    for model in media.referencing_models(source):
+        notify_change(model)
+    return responsive
+
+
+def release(names):
+    """Drop derivatives of originals nothing references any more; returns the number of files deleted"""
+    names = set(names) - set(media.references(names))
+    if not names:
+        return 0
+    released = ResponsiveImage.objects.filter(source__in=names)
+    orphans = {responsive.digest: responsive.variants for responsive in released}
+    released.delete()
+    still_used = set(ResponsiveImage.objects.filter(digest__in=orphans).values_list('digest', flat=True))
+    deleted = 0
+    for digest, variants in orphans.items():
+        if digest in still_used:
+            continue
+        for variant in variants:
+            default_storage.delete(variant['name'])
+            deleted += 1
+    return deleted
+
+
+@media.on_change
+def update_derivatives(names):
+    """Generate derivatives for newly referenced files, release the ones nothing references"""
+    referenced = media.references(names)
+    for name in sorted(referenced):
+        generate(name)
+    if set(names) - set(referenced):
+        release(set(names) - set(referenced))
+
+
+class ResponsiveImageField(serializers.Field):
+    """
+    Read-only ``<picture>`` data for an image field::
+
+        {"width": 1024, "height": 683,
+         "src": ".../1024w.jpg", "srcset": ".../320w.jpg 320w, ...",
+         "sources": [{"type": "image/avif", "srcset": "..."}, ...]}
+
+    ``null`` until the derivatives exist. All rows being serialized are
+    looked up together, so a page costs one query.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return _source_name(instance, self.source)
+
+    def _lookup(self, name):
+        root = self.root
+        found = getattr(root, '_responsive_images', None)
+        if found is None:
+            instances = root.instance if isinstance(root, serializers.ListSerializer) else [root.instance]
+            names = {_source_name(instance, self.source) for instance in instances} - {None}
+            found = {responsive.source: responsive for responsive in ResponsiveImage.objects.filter(source__in=names)}
+            root._responsive_images = found
+        return found.get(name)
+
+    def _url(self, name):
+        url = default_storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+    def to_representation(self, name):
+        responsive = self._lookup(name) if name else None
+        if responsive is None or not responsive.variants:
+            return None
+        srcsets = {}
+        for variant in responsive.variants:
+            srcsets.setdefault(variant['format'], []).append(f"{self._url(variant['name'])} {variant['width']}w")
+        fallback = FALLBACK_FORMAT if FALLBACK_FORMAT in srcsets else list(srcsets)[-1]
+        return {
+            'width': responsive.width,
+            'height': responsive.height,
+            'src': srcsets[fallback][-1].rsplit(' ', 1)[0],
+            'srcset': ', '.join(srcsets[fallback]),
+            'sources': [
+                {'type': FORMATS[name][2], 'srcset': ', '.join(srcset)}
+                for name, srcset in srcsets.items() if name != fallback
+            ],
+        }
+
+
+def _source_name(instance, source):
+    value = getattr(instance, source, None)
+    return getattr(value, 'name', value) or None
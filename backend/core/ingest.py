@@ -0,0 +1,296 @@
+"""
+Batched ingestion of contact messages.
+
+With CONTACT_INGEST_MODE = 'batched', ``POST /api/contact/`` validates the
+message, appends it to a local append-only log and answers 202 without
+touching the database. Each entry is one ``write()`` under an exclusive
+lock followed by ``fsync``, so an acknowledged message survives a crash of
+the worker or the host.
+
+The flusher moves the log into the database. It renames the active log to a
+segment, then inserts each segment, oldest first, with bulk_create
+(CONTACT_INGEST_BATCH_SIZE rows per INSERT) in one transaction with a single
+content version bump, and deletes the segment after the commit. Every worker
+runs it in a thread every CONTACT_INGEST_FLUSH_INTERVAL seconds, or sooner
+once a batch is waiting; only one process flushes at a time. The same runs
+from cron or after an outage with
+
+    python manage.py flush_contact_messages
+    python manage.py flush_contact_messages --status   # queue depth, flush latency
+
+Duplicate submissions (same name, email, company and message within
+CONTACT_DUPLICATE_WINDOW seconds) are acknowledged but stored once. They are
+caught at submission through the default cache, and again at flush time
+against the batch and the rows already stored. The flush-time check also
+makes replaying a segment whose commit went through before a crash harmless.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ContactMessage
+from .signals import bulk_change
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: the locks below only exclude threads of this process
+    fcntl = None
+
+FIELDS = ('name', 'email', 'company', 'message')
+LOG_NAME = 'contact.log'
+SEGMENT_PREFIX = 'segment-'
+STATS_NAME = 'stats.json'
+
+_thread_locks = {'append': threading.Lock(), 'flush': threading.Lock()}
+_flusher = None
+_wake = threading.Event()
+_pending = 0
+
+
+def batched():
+    return settings.CONTACT_INGEST_MODE == 'batched'
+
+
+def _path(name):
+    return os.path.join(settings.CONTACT_INGEST_DIR, name)
+
+
+@contextmanager
+def _lock(name, blocking=True):
+    """Exclusive lock shared by threads and processes; yields whether it was acquired"""
+    thread_lock = _thread_locks[name]
+    if not thread_lock.acquire(blocking):
+        yield False
+        return
+    try:
+        os.makedirs(settings.CONTACT_INGEST_DIR, exist_ok=True)
+        if fcntl is None:
+            yield True
+            return
+        with open(_path(f'{name}.lock'), 'a') as file:
+            try:
+                fcntl.flock(file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+    finally:
+        thread_lock.release()
+
+
+def fingerprint(data):
+    """Hash of the normalized message fields, equal for resubmissions of the same message"""
+    normalized = [' '.join(str(data.get(field) or '').split()).casefold() for field in FIELDS]
+    return hashlib.sha256('\x1f'.join(normalized).encode()).hexdigest()
+
+
+def enqueue(data):
+    """
+    Append the validated message ``data`` to the log. Returns the entry
+    ({'fingerprint', 'created_at', <fields>}) and whether it was
+    recognized as a duplicate, in which case nothing is written.
+    """
+    global _pending
+    entry = {
+        'fingerprint': fingerprint(data),
+        'created_at': timezone.now().isoformat(),
+        **{field: data.get(field) or '' for field in FIELDS},
+    }
+    key = f'contact-fingerprint:{entry["fingerprint"]}'
+    if not cache.add(key, True, settings.CONTACT_DUPLICATE_WINDOW):
+        return entry, True
+
+    line = (json.dumps(entry, ensure_ascii=False) + '\n').encode()
+    try:
+        with _lock('append'):
+            fd = os.open(_path(LOG_NAME), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line)
+                if settings.CONTACT_INGEST_FSYNC:
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+    except OSError:
+        # Not written: the client's retry must not be taken for a duplicate
+        cache.delete(key)
+        raise
+
+    _pending += 1
+    if _pending >= settings.CONTACT_INGEST_BATCH_SIZE:
+        _wake.set()
+    start_flusher()
+    return entry, False
+
+
+def _segments():
+    directory = settings.CONTACT_INGEST_DIR
+    if not os.path.isdir(directory):
+        return []
+    return sorted(_path(name) for name in os.listdir(directory) if name.startswith(SEGMENT_PREFIX))
+
+
+def _rotate():
+    """Turn the active log into a segment; writers start a new log"""
+    with _lock('append'):
+        log = _path(LOG_NAME)
+        if os.path.exists(log) and os.path.getsize(log):
+            os.replace(log, _path(f'{SEGMENT_PREFIX}{time.time_ns():020d}.log'))
+
+
+def _read(path):
+    """(entries, unreadable lines) of a log file; a torn last line is unreadable"""
+    entries, unreadable = [], 0
+    with open(path, 'rb') as file:
+        for line in file:
+            try:
+                entry = json.loads(line)
+                entry['created_at'] = parse_datetime(entry['created_at'])
+            except (ValueError, KeyError, TypeError):
+                unreadable += 1
+                continue
+            entries.append(entry)
+    return entries, unreadable
+
+
+def _new_entries(entries, seen):
+    """
+    ``entries`` without duplicates of each other or of recently stored
+    messages; ``seen`` maps fingerprints to the times already accepted
+    """
+    window = timedelta(seconds=settings.CONTACT_DUPLICATE_WINDOW)
+    stored = ContactMessage.objects.filter(
+        email__in={entry['email'] for entry in entries},
+        created_at__gte=min(entry['created_at'] for entry in entries) - window,
+    ).values(*FIELDS, 'created_at')
+    for row in stored:
+        times = seen.setdefault(fingerprint(row), [])
+        if row['created_at'] not in times:
+            times.append(row['created_at'])
+
+    fresh = []
+    for entry in entries:
+        times = seen.setdefault(entry['fingerprint'], [])
+        if any(abs(entry['created_at'] - other) <= window for other in times):
+            continue
+        times.append(entry['created_at'])
+        fresh.append(entry)
+    return fresh
+
+
+def _store(entries):
+    """Insert the new messages among ``entries`` a batch at a time; returns how many"""
+    size, seen, stored = settings.CONTACT_INGEST_BATCH_SIZE, {}, 0
+    # Invalidate once the batch has committed, as core/bulk.py does
+    with bulk_change(ContactMessage), transaction.atomic():
+        for start in range(0, len(entries), size):
+            fresh = _new_entries(entries[start:start + size], seen)
+            ContactMessage.objects.bulk_create([
+                ContactMessage(created_at=entry['created_at'], **{field: entry[field] for field in FIELDS})
+                for entry in fresh
+            ])
+            stored += len(fresh)
+    return stored
+
+
+def _write_stats(update):
+    stats = read_stats()
+    for key in ('flushes', 'stored', 'duplicates', 'unreadable'):
+        stats[key] = stats.get(key, 0) + update.pop(key)
+    stats['max_flush_ms'] = max(stats.get('max_flush_ms', 0), update['last_flush_ms'])
+    stats.update(update)
+    temp = _path(f'.{STATS_NAME}.tmp')
+    with open(temp, 'w') as file:
+        json.dump(stats, file)
+    os.replace(temp, _path(STATS_NAME))
+
+
+def read_stats():
+    try:
+        with open(_path(STATS_NAME)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def flush(blocking=False):
+    """
+    Store every logged message. Returns (stored, duplicates), or None when
+    another thread or process is flushing already.
+    """
+    global _pending
+    stored = duplicates = 0
+    with _lock('flush', blocking) as acquired:
+        if not acquired:
+            return None
+        _pending = 0
+        _rotate()
+        for segment in _segments():
+            started = time.perf_counter()
+            entries, unreadable = _read(segment)
+            if unreadable:
+                print(f"Skipped {unreadable} unreadable lines in {segment}")
+            count = _store(entries) if entries else 0
+            os.unlink(segment)
+            stored += count
+            duplicates += len(entries) - count
+            _write_stats({
+                'flushes': 1, 'stored': count, 'duplicates': len(entries) - count, 'unreadable': unreadable,
+                'last_flush_at': timezone.now().isoformat(), 'last_batch': count,
+                'last_flush_ms': round((time.perf_counter() - started) * 1000, 2),
+            })
+    return stored, duplicates
+
+
+def status():
+    """Queue depth (messages waiting in the log), age of the oldest one and the flush stats"""
+    depth, oldest = 0, None
+    for path in [*_segments(), _path(LOG_NAME)]:
+        if not os.path.exists(path):
+            continue
+        entries, _ = _read(path)
+        depth += len(entries)
+        if entries and oldest is None:
+            oldest = entries[0]['created_at']
+    return {
+        'mode': settings.CONTACT_INGEST_MODE,
+        'queue_depth': depth,
+        'oldest_seconds': round((timezone.now() - oldest).total_seconds(), 1) if oldest else None,
+        **read_stats(),
+    }
+
+
+def _run(interval):
+    while True:
+        _wake.wait(interval)
+        _wake.clear()
+        try:
+            flush()
+        except Exception as e:
+            # The messages stay in the log for the next attempt
+            print(f"Contact message flush failed: {e}")
+        finally:
+            close_old_connections()
+
+
+def start_flusher():
+    """Start this process's flusher thread unless CONTACT_INGEST_FLUSH_INTERVAL is 0"""
+    global _flusher
+    interval = settings.CONTACT_INGEST_FLUSH_INTERVAL
+    if interval <= 0 or (_flusher is not None and _flusher.is_alive()):
+        return
+    _flusher = threading.Thread(target=_run, args=(interval,), name='contact-ingest', daemon=True)
+    _flusher.start()
@@ -0,0 +1,26 @@
+"""
+Store the contact messages queued by batched ingestion (core/ingest.py):
+
+    python manage.py flush_contact_messages
+    python manage.py flush_contact_messages --status
+
+Waits for a flush already running in a worker, then stores whatever is left
+in the log. --status prints the queue depth and the flush statistics.
+"""
+from django.core.management.base import BaseCommand
+
+from core import ingest
+
+
+class Command(BaseCommand):
+    help = 'Store queued contact messages, or show the ingestion queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='store_true', help='Show queue depth and flush statistics')
+
+    def handle(self, *args, **options):
+        if not options['status']:
+            stored, duplicates = ingest.flush(blocking=True)
+            self.stdout.write(f'Stored {stored} messages, skipped {duplicates} duplicates')
+        for key, value in ingest.status().items():
+            self.stdout.write(f'{key}: {value}')
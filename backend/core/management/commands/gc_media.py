@@ -0,0 +1,44 @@
+"""
+Garbage-collect the content-addressed media store (core/storage.py):
+
+    python manage.py gc_media --dry-run
+    python manage.py gc_media
+    python manage.py gc_media --adopt --grace-hours 0
+
+Reference counts are recomputed from the database, then blobs nothing
+references are deleted once they are older than the grace period. --adopt
+first moves uploads saved under their original names (case_studies/,
+team/, ...) into the store, deduplicating them, and deletes the copies no
+row points to.
+"""
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core import storage
+
+
+class Command(BaseCommand):
+    help = 'Delete unreferenced media blobs, optionally adopting older uploads first'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adopt', action='store_true', help='Move files stored before deduplication into the store')
+        parser.add_argument('--grace-hours', type=float, default=1.0,
+                            help='Keep unreferenced files modified more recently than this')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+
+    def handle(self, *args, **options):
+        if not isinstance(default_storage, storage.ContentAddressedStorage):
+            raise CommandError('The default storage is not core.storage.ContentAddressedStorage')
+        grace, dry_run = options['grace_hours'] * 3600, options['dry_run']
+        verb = 'Would delete' if dry_run else 'Deleted'
+
+        if options['adopt']:
+            adopted, deleted, freed = storage.adopt(grace, dry_run)
+            blobs = set(adopted.values()) - {None}
+            self.stdout.write(f'Adopted {len(adopted)} files' + (f' into {len(blobs)} blobs' if blobs else ''))
+            self.stdout.write(f'{verb} {len(deleted)} old files, {freed} bytes')
+
+        orphans, freed, missing = storage.collect_garbage(grace, dry_run)
+        self.stdout.write(f'{verb} {len(orphans)} unreferenced blobs, {freed} bytes')
+        for name in missing:
+            self.stderr.write(f'Referenced but missing: {name}')
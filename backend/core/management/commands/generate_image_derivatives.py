@@ -0,0 +1,56 @@
+"""
+Create responsive derivatives (core/images.py) for images that do not have
+them yet, e.g. uploads from before the pipeline existed or seeded rows:
+
+    python manage.py generate_image_derivatives
+    python manage.py generate_image_derivatives --force   # re-encode everything
+    python manage.py generate_image_derivatives --prune   # drop unreferenced ones
+
+Prints the bytes a browser fetching the largest fallback variant saves over
+the original. Cached API responses of the models with images are
+invalidated once, at the end.
+"""
+from contextlib import ExitStack
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core import images, media
+from core.models import ResponsiveImage
+from core.signals import bulk_change
+
+
+class Command(BaseCommand):
+    help = 'Generate missing responsive image derivatives'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-encode images that already have derivatives')
+        parser.add_argument('--prune', action='store_true', help='Delete derivatives no image field references')
+
+    def handle(self, *args, **options):
+        sources = set(media.references())
+
+        generated = original_bytes = fallback_bytes = 0
+        with ExitStack() as stack:
+            for model in {model for model, _ in media.FIELDS}:
+                stack.enter_context(bulk_change(model))
+            for source in sorted(sources):
+                responsive = images.generate(source, force=options['force'])
+                if responsive is None:
+                    continue
+                generated += 1
+                fallback = [v for v in responsive.variants if v['format'] == images.FALLBACK_FORMAT]
+                if fallback:
+                    original_bytes += default_storage.size(source)
+                    fallback_bytes += fallback[-1]['size']
+        self.stdout.write(f'Generated derivatives for {generated} of {len(sources)} images')
+        if original_bytes:
+            self.stdout.write(
+                f'Largest {images.FALLBACK_FORMAT} variants: {fallback_bytes} bytes vs {original_bytes} '
+                f'for the originals ({100 - 100 * fallback_bytes // original_bytes}% smaller)'
+            )
+
+        if options['prune']:
+            unreferenced = set(ResponsiveImage.objects.values_list('source', flat=True)) - sources
+            deleted = images.release(unreferenced) if unreferenced else 0
+            self.stdout.write(f'Pruned {len(unreferenced)} unreferenced images, {deleted} derived files')
@@ -0,0 +1,130 @@
+"""
+Replace the content tables with the curated demo records, optionally
+followed by deterministic synthetic rows:
+
+    python manage.py reset_and_populate_db
+    python manage.py reset_and_populate_db --case-studies 10000 --contact-messages 100000 --seed 42
+
+Contact messages are submissions from real visitors, not site content: they
+are only replaced when ``--contact-messages`` asks for synthetic ones.
+
+Everything runs in one transaction and ids restart from 1, so a given seed
+always produces the same rows. Rows are written with bulk_create in
+batches, and cache invalidation / content versions are bumped once per table.
+"""
+import random
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from case_studies.models import CaseStudy, SlugCounter
+from core import models as core
+from core import seed
+from core.signals import bulk_change
+from services.models import Service
+from team.models import TeamMember
+
+
+@contextmanager
+def explicit_timestamps(model):
+    """Let bulk_create keep the created_at/updated_at values we set"""
+    fields = [f for f in model._meta.concrete_fields if getattr(f, 'auto_now', False) or getattr(f, 'auto_now_add', False)]
+    saved = [(f, f.auto_now, f.auto_now_add) for f in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = ('Replace all site content with the demo data, plus optional synthetic rows. '
+            'Contact messages are only replaced when --contact-messages is given.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--case-studies', type=int, default=0, help='Synthetic case studies to add')
+        parser.add_argument('--services', type=int, default=0, help='Synthetic services to add')
+        parser.add_argument('--team-members', type=int, default=0, help='Synthetic team members to add')
+        parser.add_argument('--contact-messages', type=int, default=0, help='Replace all contact messages with this many synthetic ones')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic rows')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        self.batch_size = options['batch_size']
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            self.reset(TeamMember, (TeamMember(**member) for member in seed.TEAM_MEMBERS))
+            self.reset(Service, (Service(**service) for service in seed.SERVICES))
+
+            # Tables served by the API
+            self.reset(core.TeamMember, (
+                core.TeamMember(**row) for row in self.core_team_members(options['team_members'], rng)
+            ))
+            self.reset(core.Service, (
+                core.Service(**row) for row in self.core_services(options['services'], rng)
+            ))
+            SlugCounter.objects.all().delete()
+            self.reset(CaseStudy, (
+                CaseStudy(**row) for row in self.case_studies(options['case_studies'], rng)
+            ))
+            if options['contact_messages'] > 0:
+                self.reset(core.ContactMessage, (
+                    core.ContactMessage(**row) for row in seed.synthetic_contact_messages(options['contact_messages'], rng)
+                ))
+
+        self.stdout.write(self.style.SUCCESS('Database reset and populated successfully!'))
+
+    def reset(self, model, objects):
+        label = model._meta.label
+        with bulk_change(model), explicit_timestamps(model):
+            # Flush instead of delete(): nothing references these tables, the
+            # regular delete() would load every row to send post_delete
+            # signals, and resetting the id sequence keeps reruns identical
+            deleted = model.objects.count()
+            statements = connection.ops.sql_flush(no_style(), [model._meta.db_table], reset_sequences=True)
+            connection.ops.execute_sql_flush(statements)
+            created = 0
+            while batch := list(islice(objects, self.batch_size)):
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+                created += len(batch)
+        self.stdout.write(f"{label}: deleted {deleted}, created {created}")
+
+    def core_team_members(self, extra, rng):
+        for member in seed.TEAM_MEMBERS:
+            yield {
+                'name': member['name'],
+                'position': member['role'],
+                'bio': member['bio'],
+                'image': member['image'],
+                'linkedin_url': member['linkedin'],
+                'github_url': member['github'],
+                'order': member['order'],
+                'created_at': seed.EPOCH,
+                'updated_at': seed.EPOCH,
+            }
+        yield from seed.synthetic_team_members(extra, rng, first_order=len(seed.TEAM_MEMBERS) + 1)
+
+    def core_services(self, extra, rng):
+        seen = {}
+        for service in seed.SERVICES:
+            seen[service['slug']] = 0
+            yield {
+                'name': service['name'],
+                'slug': service['slug'],
+                'description': service['description'],
+                'icon': service['icon'],
+                'created_at': seed.EPOCH,
+                'updated_at': seed.EPOCH,
+            }
+        yield from seed.synthetic_services(extra, rng, seen)
+
+    def case_studies(self, extra, rng):
+        seen = {case_study['slug']: 0 for case_study in seed.CASE_STUDIES}
+        yield from seed.CASE_STUDIES
+        yield from seed.synthetic_case_studies(extra, rng, len(seed.CASE_STUDIES) + 1, seen)
@@ -0,0 +1,40 @@
+"""
+Bytes saved per static asset by the precompressed variants that the last
+``collectstatic`` wrote (core/staticfiles.py):
+
+    python manage.py static_report
+    python manage.py static_report --top 10
+"""
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Show the bytes saved per static asset by gzip/brotli precompression'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=0, help='Only the N assets with the largest savings')
+
+    def handle(self, *args, **options):
+        if not hasattr(staticfiles_storage, 'compression_report'):
+            raise CommandError('The staticfiles storage does not precompress assets')
+        report = staticfiles_storage.compression_report()
+        if not report:
+            raise CommandError('No compression report; run collectstatic first')
+
+        def best(entry):
+            return min(entry.get('br', entry['size']), entry.get('gzip', entry['size']))
+
+        rows = sorted(report.items(), key=lambda item: item[1]['size'] - best(item[1]), reverse=True)
+        if options['top']:
+            rows = rows[:options['top']]
+
+        self.stdout.write(f"{'asset':<60} {'bytes':>10} {'gzip':>10} {'br':>10} {'saved':>10}")
+        for name, entry in rows:
+            self.stdout.write(
+                f"{name[-60:]:<60} {entry['size']:>10} {entry.get('gzip', '-'):>10} "
+                f"{entry.get('br', '-'):>10} {entry['size'] - best(entry):>10}"
+            )
+        total = sum(entry['size'] for entry in report.values())
+        saved = sum(entry['size'] - best(entry) for entry in report.values())
+        self.stdout.write(f"{len(report)} assets, {total} bytes, {saved} saved ({100 * saved // max(total, 1)}%)")
@@ -0,0 +1,117 @@
+"""
+Tracking of the files that model file fields point to.
+
+``track(model, field)`` watches a file field: whenever a save or delete
+changes which file a row references, the old and new names are queued, and
+once the transaction commits every ``on_change`` handler gets the whole
+batch of names at once. Handlers re-read the current references from the
+database (``references()``) rather than trusting the queued events, so a
+batch left behind by a rolled-back transaction, or rows written with
+bulk_create/update() that send no signals, only cost a recount.
+"""
+import threading
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_init, post_save
+
+# (model, field name) pairs being tracked
+FIELDS = []
+
+_handlers = []
+_pending = threading.local()
+_DEFERRED = object()
+
+
+def on_change(handler):
+    """Call ``handler(names)`` after commit with the file names whose references changed"""
+    _handlers.append(handler)
+    return handler
+
+
+def references(names=None):
+    """Counter of name -> rows referencing it across tracked fields, for ``names`` or all files"""
+    counts = Counter()
+    for model, field in FIELDS:
+        queryset = model._base_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+        if names is not None:
+            queryset = queryset.filter(**{f'{field}__in': list(names)})
+        for name, count in queryset.values_list(field).annotate(count=Count('pk')).order_by():
+            counts[name] += count
+    return counts
+
+
+def referencing_models(name):
+    """Tracked models with at least one row whose field references ``name``"""
+    return {
+        model for model, field in FIELDS
+        if model._base_manager.filter(**{field: name}).exists()
+    }
+
+
+def _queue(name):
+    """
+    Queue ``name`` for the handlers. Every call registers the flush, which
+    drains the whole queue the first time it runs, so a bulk delete is
+    handled as one batch.
+    """
+    pending = getattr(_pending, 'names', None)
+    if pending is None:
+        pending = _pending.names = set()
+    pending.add(name)
+    transaction.on_commit(flush)
+
+
+def flush():
+    names = getattr(_pending, 'names', None)
+    if not names:
+        return
+    _pending.names = None
+    changed(names)
+
+
+def changed(names):
+    """Run the handlers for ``names`` now, e.g. after rewriting references with update()"""
+    for handler in _handlers:
+        handler(set(names))
+
+
+def _field_name(instance, attname):
+    value = instance.__dict__.get(attname, _DEFERRED)
+    if value is _DEFERRED:
+        return _DEFERRED
+    return getattr(value, 'name', value) or None
+
+
+def track(model, field='image'):
+    """Report changes to the files ``model.<field>`` references"""
+    if (model, field) in FIELDS:
+        return
+    FIELDS.append((model, field))
+    attname = model._meta.get_field(field).attname
+    uid = f'media-{model._meta.label_lower}-{field}'
+    original = f'_media_{field}_original'
+
+    def remember(sender, instance, **kwargs):
+        setattr(instance, original, _field_name(instance, attname))
+
+    def saved(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        before, now = getattr(instance, original, _DEFERRED), _field_name(instance, attname)
+        if now is _DEFERRED or before == now:
+            return
+        for name in (before, now):
+            if name and name is not _DEFERRED:
+                _queue(name)
+        setattr(instance, original, now)
+
+    def deleted(sender, instance, **kwargs):
+        name = _field_name(instance, attname)
+        if name and name is not _DEFERRED:
+            _queue(name)
+
+    post_init.connect(remember, sender=model, weak=False, dispatch_uid=f'{uid}-init')
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'{uid}-save')
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'{uid}-delete')
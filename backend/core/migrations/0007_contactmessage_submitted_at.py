@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-19 12:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_mediablob'),
+    ]
+
+    # auto_now_add -> default=timezone.now is the same column; skip the table
+    # rebuild SQLite would otherwise do
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='contactmessage',
+                    name='created_at',
+                    field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+                ),
+            ],
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from django.utils.text import slugify
 
 # Create your models here.
@@ -16,6 +18,13 @@ class Service(models.Model):
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def prepare_bulk_save(cls, instances):
+        """Apply save()'s defaults to a batch headed for bulk_create/bulk_update"""
+        for instance in instances:
+            if not instance.slug:
+                instance.slug = slugify(instance.name)
+
     def __str__(self):
         return self.name
 
@@ -37,6 +46,13 @@ class CaseStudy(models.Model):
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def prepare_bulk_save(cls, instances):
+        """Apply save()'s defaults to a batch headed for bulk_create/bulk_update"""
+        for instance in instances:
+            if not instance.slug:
+                instance.slug = slugify(instance.title)
+
     def __str__(self):
         return self.title
 
@@ -53,6 +69,9 @@ class TeamMember(models.Model):
 
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            models.Index(fields=['order', 'name'], name='team_member_order_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -62,8 +81,92 @@ class ContactMessage(models.Model):
     email = models.EmailField()
     company = models.CharField(max_length=200, blank=True)
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: batched ingestion (core/ingest.py) keeps the time the
+    # message was submitted, not the time it was flushed
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Cursor pagination walks this index, newest first
+            models.Index(fields=['created_at', 'id'], name='contact_created_idx'),
+            # Admin "is read" filter, newest first
+            models.Index(fields=['is_read', 'created_at', 'id'], name='contact_unread_idx'),
+        ]
+
     def __str__(self):
         return f"Message from {self.name} ({self.email})"
+
+class ContentVersion(models.Model):
+    """
+    Per-table change counter, bumped on every save/delete through signals.
+    Conditional GETs read it instead of running the endpoint's queryset.
+
+    The price is one extra UPDATE per write (per bulk operation inside
+    ``bulk_change``), on a single row per table, so concurrent writers to
+    the same table serialize on it until they commit.
+    """
+    table = models.CharField(max_length=100, unique=True)  # model label, e.g. core.service
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    @classmethod
+    def bump(cls, model):
+        table = model._meta.label_lower
+        now = timezone.now()
+        if not cls.objects.filter(table=table).update(version=F('version') + 1, updated_at=now):
+            obj, created = cls.objects.get_or_create(table=table, defaults={'version': 1, 'updated_at': now})
+            if not created:
+                cls.objects.filter(table=table).update(version=F('version') + 1, updated_at=now)
+
+    @classmethod
+    def lookup(cls, model):
+        """Return (version, updated_at) for ``model``; (0, None) if never bumped"""
+        row = cls.objects.filter(table=model._meta.label_lower).values_list('version', 'updated_at').first()
+        return row or (0, None)
+
+    def __str__(self):
+        return f"{self.table} v{self.version}"
+
+class ResponsiveImage(models.Model):
+    """
+    Resized derivatives of one uploaded image (see core/images.py). Files
+    live under derived/<digest>/, shared by every upload with that content.
+    """
+    source = models.CharField(max_length=255, unique=True)  # storage name of the original
+    digest = models.CharField(max_length=64, db_index=True)  # sha256 of the original
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    variants = models.JSONField(default=list)  # [{format, width, height, name, size}], smallest first
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.source
+
+class MediaBlob(models.Model):
+    """
+    One deduplicated file in ContentAddressedStorage (see core/storage.py)
+    and the number of rows pointing to it.
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Garbage collection looks for unreferenced blobs
+            models.Index(fields=['refcount'], name='media_blob_refcount_idx'),
+        ]
+
+    @classmethod
+    def refresh(cls, sizes, counts):
+        """Upsert the size and reference count of every name in ``sizes``"""
+        cls.objects.bulk_create(
+            [cls(name=name, size=size, refcount=counts.get(name, 0)) for name, size in sizes.items()],
+            update_conflicts=True, unique_fields=['name'], update_fields=['size', 'refcount', 'updated_at'],
+            batch_size=500,
+        )
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount} refs)"
@@ -0,0 +1,22 @@
+"""
+Pagination for the list endpoints.
+
+Page-number pagination is the default (``?page=2&page_size=20``). It costs a
+COUNT plus an OFFSET scan, which is fine for the small curated tables. Contact
+messages grow without bound, so they use cursor pagination instead: each page
+is one range scan on the (created_at, id) index, whatever its depth.
+"""
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class StandardPagination(PageNumberPagination):
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """Newest first; ``id`` breaks ties between equal timestamps"""
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = settings.API_MAX_PAGE_SIZE
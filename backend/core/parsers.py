@@ -0,0 +1,38 @@
+"""
+JSON parser backed by orjson.
+
+Reads the body in one go and hands it to orjson, which matters most for the
+multi-megabyte base64 images posted to /api/agriculture/analyze/. Bodies
+orjson rejects (invalid JSON, lone surrogate escapes) are parsed again by
+DRF's ``JSONParser``, so what is accepted and the ``JSON parse error - ...``
+messages stay the same. One difference: integers beyond 64 bits are read as
+floats, which IntegerField rejects anyway. Without orjson installed this is
+``JSONParser``.
+"""
+import codecs
+import io
+
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+
+        encoding = (parser_context or {}).get('encoding') or 'utf-8'
+        body = stream.read()
+        try:
+            # orjson reads UTF-8 bytes directly; other charsets are decoded first
+            return orjson.loads(body if codecs.lookup(encoding).name == 'utf-8' else body.decode(encoding))
+        except (orjson.JSONDecodeError, UnicodeDecodeError):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
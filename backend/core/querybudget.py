@@ -0,0 +1,149 @@
+"""
+SQL query budgets per endpoint, and repeated-query (N+1) detection.
+
+``QUERY_BUDGETS`` maps ``"<METHOD> <url name>"`` to the most queries a
+request to that endpoint may run. The test suite asserts every endpoint
+stays within its budget (see ``core.testing``), and
+``QueryBudgetMiddleware`` can log overruns during development:
+
+    QUERY_BUDGET_LOGGING=True python manage.py runserver
+
+Besides the total, a request is flagged when it runs the exact same query
+(SQL and parameters) more than once, or the same SQL with different
+parameters ``QUERY_REPEAT_THRESHOLD`` or more times - the shape of an N+1
+loop over related rows.
+"""
+import logging
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGETS = {
+    'GET index': 0,
+    'GET api-root': 0,
+    'GET media': 0,
+    'GET static': 0,
+
+    # Reads: content version lookup, then COUNT + page, or the row. Contact
+    # messages are cursor-paginated and skip the COUNT. Team and case study
+    # responses look up the image derivatives of all their rows at once.
+    'GET service-list': 3,
+    'GET service-detail': 2,
+    'GET teammember-list': 4,
+    'GET teammember-detail': 3,
+    'GET casestudy-list': 4,
+    'GET casestudy-detail': 3,
+    'GET contactmessage-list': 2,
+    'GET contactmessage-detail': 2,
+    # Full-text search: match count, ranked page, then the rows by id
+    'GET service-search': 3,
+    'GET casestudy-search': 4,
+    # Batched contact ingestion status, read from the log files
+    'GET contactmessage-ingest-status': 0,
+    # Response cache metrics, kept in memory
+    'GET cache-stats': 0,
+
+    # Writes: the row, plus the content version bump (and the image
+    # derivatives lookup for team members and case studies). A new upload
+    # adds a few more once its write commits, to store the derivatives.
+    'POST service-list': 2,
+    'PUT service-detail': 3,
+    'PATCH service-detail': 3,
+    'DELETE service-detail': 3,
+    'POST teammember-list': 3,
+    'PUT teammember-detail': 4,
+    'PATCH teammember-detail': 4,
+    'DELETE teammember-detail': 3,
+    # None when batched: the message goes to the log (core/ingest.py)
+    'POST contactmessage-list': 2,
+    'PUT contactmessage-detail': 3,
+    'PATCH contactmessage-detail': 3,
+    'DELETE contactmessage-detail': 3,
+    # Case study saves check the slug; a clashing title reserves a suffix,
+    # which seeds the slug counter the first time. The INSERT returns the
+    # assigned order.
+    'POST casestudy-list': 8,
+    'PUT casestudy-detail': 10,
+    'PATCH casestudy-detail': 10,
+    'DELETE casestudy-detail': 3,
+
+    # Bulk endpoints: constant per batch, whatever its size
+    'POST service-bulk': 2,
+    'PATCH service-bulk': 3,
+    'DELETE service-bulk': 4,
+    'POST teammember-bulk': 3,
+    'PATCH teammember-bulk': 4,
+    'DELETE teammember-bulk': 4,
+    'POST casestudy-bulk': 10,
+    'PATCH casestudy-bulk': 7,
+    'DELETE casestudy-bulk': 4,
+}
+
+
+def endpoint_name(method, path):
+    """``"GET service-list"`` for a request, or None for unrouted paths"""
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return None
+    return f'{method} {match.url_name}' if match.url_name else None
+
+
+def get_budget(endpoint):
+    return QUERY_BUDGETS.get(endpoint, settings.QUERY_BUDGET_DEFAULT)
+
+
+# Transaction control differs between tests (savepoints) and requests
+# (BEGIN/COMMIT), so it is not counted
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE SAVEPOINT')
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` hook that keeps every query run"""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self.queries.append((sql, repr(params)))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def duplicates(self):
+        """Identical queries (same SQL and parameters) run more than once"""
+        return {query: count for query, count in Counter(self.queries).items() if count > 1}
+
+    def repeated(self, threshold=None):
+        """SQL run with different parameters at least ``threshold`` times"""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        counts = Counter(sql for sql, _ in set(self.queries))
+        return {sql: count for sql, count in counts.items() if count >= threshold}
+
+
+class QueryBudgetMiddleware:
+    """Log requests that go over their query budget or repeat queries"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        endpoint = endpoint_name(request.method, request.path_info) or f'{request.method} {request.path_info}'
+        budget = get_budget(endpoint)
+        if len(recorder) > budget:
+            logger.warning('%s ran %d queries (budget %d)', endpoint, len(recorder), budget)
+        for (sql, params), count in recorder.duplicates().items():
+            logger.warning('%s ran an identical query %d times: %s %s', endpoint, count, sql, params)
+        for sql, count in recorder.repeated().items():
+            logger.warning('%s ran a query %d times with different parameters (N+1?): %s', endpoint, count, sql)
+        return response
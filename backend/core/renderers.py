@@ -0,0 +1,48 @@
+"""
+JSON renderer backed by orjson.
+
+Produces the same bytes as DRF's ``JSONRenderer`` for API responses: compact
+separators, UTF-8 rather than ``\\uXXXX`` escapes, U+2028/U+2029 escaped,
+and every type orjson does not handle itself (datetimes, Decimal, lazy
+strings, querysets, numpy values...) converted by DRF's own
+``JSONEncoder.default`` - so datetimes keep the ``Z`` suffix and plain
+Decimals still become numbers (serializers render them as strings).
+
+Falls back to the stdlib renderer when orjson is not installed, for indented
+output (browsable API, ``Accept: application/json; indent=4``), when
+COMPACT_JSON/UNICODE_JSON are turned off, and for data orjson rejects
+(integers beyond 64 bits), which keeps the stdlib's errors too. Unlike the
+stdlib, orjson writes NaN and Infinity as ``null`` instead of raising.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+_LINE_SEPARATORS = (('\u2028'.encode(), b'\\u2028'), ('\u2029'.encode(), b'\\u2029'))
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact or \
+                self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Keep the output a strict JavaScript subset, like JSONRenderer
+        for raw, escaped in _LINE_SEPARATORS:
+            if raw in ret:
+                ret = ret.replace(raw, escaped)
+        return ret
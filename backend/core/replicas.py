@@ -0,0 +1,121 @@
+"""
+Read replica routing with read-your-writes stickiness.
+
+When a ``replica`` database is configured (POSTGRES_REPLICA_HOST, or
+SQLITE_REPLICA_PATH as a local stand-in), ``ReplicaRouter`` sends the reads
+of viewset ``list`` and ``retrieve`` actions to it and everything else -
+writes, reads of write requests, admin, authentication - to ``default``.
+
+A replica trails the primary by up to DATABASE_REPLICA_LAG seconds, so a
+client that just wrote would otherwise not see its own change. Any write in
+a request pins that client to the primary for DATABASE_REPLICA_LAG seconds:
+by cookie, and for authenticated users also by user in the default cache,
+so token clients that drop cookies are pinned too. Reads later in the same
+request go to the primary as well.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE = 'db-primary'
+
+_state = threading.local()
+
+
+def enabled():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def _user_pin_key(user):
+    return f'replica-pin:{user.pk}'
+
+
+@contextmanager
+def replica_reads(user=None):
+    """Send the reads inside the block to the replica, unless the client is pinned to the primary"""
+    previous = getattr(_state, 'replica_reads', False)
+    pinned = user is not None and user.is_authenticated and cache.get(_user_pin_key(user)) is not None
+    _state.replica_reads = not pinned
+    try:
+        yield
+    finally:
+        _state.replica_reads = previous
+
+
+def reading_from_replica():
+    """Whether reads made now would go to the replica"""
+    return (
+        getattr(_state, 'replica_reads', False)
+        and not getattr(_state, 'pinned', False)
+        and not getattr(_state, 'wrote', False)
+    )
+
+
+class ReplicaRouter:
+    """
+    Route reads to the replica inside ``replica_reads()``, everything else to
+    the primary. Aliases are always returned explicitly: falling back to the
+    instance hint would save objects loaded from the replica back to it.
+    """
+
+    def db_for_read(self, model, **hints):
+        return REPLICA_ALIAS if reading_from_replica() else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema from the primary
+        return db != REPLICA_ALIAS
+
+
+class ReplicaPinningMiddleware:
+    """Pin clients that write to the primary for DATABASE_REPLICA_LAG seconds"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        _state.pinned = PIN_COOKIE in request.COOKIES
+        _state.wrote = False
+        try:
+            response = self.get_response(request)
+            wrote = _state.wrote
+        finally:
+            _state.pinned = _state.wrote = False
+
+        if wrote:
+            lag = settings.DATABASE_REPLICA_LAG
+            response.set_cookie(PIN_COOKIE, '1', max_age=lag, httponly=True, samesite='Lax')
+            # DRF copies the user it authenticated onto the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                cache.set(_user_pin_key(user), True, lag)
+        return response
+
+
+class ReplicaReadMixin:
+    """
+    Serve ``list`` and ``retrieve`` from the replica. Goes first among the
+    mixins, so the content version lookups of the conditional GET and the
+    response cache read the same copy of the data as the serializer.
+    """
+
+    def _replica(self, request, handler, *args, **kwargs):
+        with replica_reads(request.user):
+            return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self._replica(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._replica(request, super().retrieve, *args, **kwargs)
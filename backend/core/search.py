@@ -0,0 +1,216 @@
+"""
+Full-text search over SQLite FTS5.
+
+Each searchable model has an external-content FTS5 table that triggers keep
+in step with every INSERT, UPDATE and DELETE, including bulk_create,
+bulk_update and raw deletes that skip Django signals. The table and triggers
+are (re)created after every ``migrate`` rather than in a migration: SQLite
+schema changes rebuild the content table, which silently drops its triggers.
+
+Queries are tokenized here and every term is matched as a prefix, so "vis
+insp" finds "Computer Vision inspection". Results are ranked with bm25 using
+per-column weights and come with a highlighted title and a snippet of the
+best-matching column. Matches are wrapped in <mark>; the rest of the text
+is HTML-escaped.
+
+On other databases search falls back to ``icontains`` over the same columns,
+unranked and without highlights.
+"""
+import html
+import re
+from functools import reduce
+from operator import or_
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from .models import Service
+
+MAX_TERMS = 10
+SNIPPET_TOKENS = 16
+
+# Control characters as match delimiters, swapped for <mark> after escaping
+_OPEN, _CLOSE = '\x02', '\x03'
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """FTS5 MATCH expression for user input: every term quoted, prefix-matched"""
+    terms = re.findall(r'\w+', query.lower())[:MAX_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _mark(text):
+    if text is None:
+        return None
+    return html.escape(text).replace(_OPEN, '<mark>').replace(_CLOSE, '</mark>')
+
+
+class SearchResults:
+    """Lazy, sliceable search results; paginators call count() and slice"""
+
+    def __init__(self, index, query):
+        self.index = index
+        self.query = query
+        self.expression = match_expression(query)
+
+    def count(self):
+        if not self.expression:
+            return 0
+        if not fts_available():
+            return self.index.fallback_queryset(self.query).count()
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.index.table} WHERE {self.index.table} MATCH %s',
+                           [self.expression])
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if not isinstance(page, slice) or not self.expression:
+            return []
+        offset = page.start or 0
+        limit = page.stop - offset
+        if not fts_available():
+            return [
+                (instance, {'rank': None, 'title': None, 'snippet': None})
+                for instance in self.index.fallback_queryset(self.query)[offset:offset + limit]
+            ]
+
+        table = self.index.table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid, bm25({table}, {', '.join(map(str, self.index.weights))}) AS rank, "
+                f"highlight({table}, 0, %s, %s), "
+                f"snippet({table}, -1, %s, %s, '…', {SNIPPET_TOKENS}) "
+                f"FROM {table} WHERE {table} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+                [_OPEN, _CLOSE, _OPEN, _CLOSE, self.expression, limit, offset],
+            )
+            rows = cursor.fetchall()
+
+        instances = self.index.model.objects.in_bulk([row[0] for row in rows])
+        return [
+            (instances[pk], {'rank': round(-rank, 4), 'title': _mark(title), 'snippet': _mark(snippet)})
+            for pk, rank, title, snippet in rows
+            if pk in instances
+        ]
+
+
+INDEXES = []
+
+
+class FullTextIndex:
+    """
+    An FTS5 table over ``columns`` of ``model``. The first column is the
+    title that gets highlighted; ``weights`` are the bm25 column weights.
+    """
+
+    def __init__(self, model, columns, weights):
+        self.model = model
+        self.content_table = model._meta.db_table
+        self.table = f'{self.content_table}_fts'
+        self.columns = columns
+        self.weights = weights
+        INDEXES.append(self)
+
+    def _columns(self, prefix=''):
+        return ', '.join(f'{prefix}{column}' for column in self.columns)
+
+    def ensure(self, using='default'):
+        """Create the FTS table and sync triggers if missing; reindex if anything was"""
+        table, content, columns = self.table, self.content_table, self._columns()
+        delete_old = f"INSERT INTO {table}({table}, rowid, {columns}) VALUES ('delete', old.id, {self._columns('old.')});"
+        insert_new = f"INSERT INTO {table}(rowid, {columns}) VALUES (new.id, {self._columns('new.')});"
+        objects = {
+            table: f"CREATE VIRTUAL TABLE {table} USING fts5({columns}, content='{content}', content_rowid='id', "
+                   f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f'{table}_ai': f"CREATE TRIGGER {table}_ai AFTER INSERT ON {content} BEGIN {insert_new} END",
+            f'{table}_ad': f"CREATE TRIGGER {table}_ad AFTER DELETE ON {content} BEGIN {delete_old} END",
+            f'{table}_au': f"CREATE TRIGGER {table}_au AFTER UPDATE ON {content} BEGIN {delete_old} {insert_new} END",
+        }
+        names = [content, *objects]
+        with connections[using].cursor() as cursor:
+            cursor.execute(f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(names))})", names)
+            existing = {row[0] for row in cursor.fetchall()}
+            if content not in existing:
+                # Migrated backwards past the model
+                return False
+            missing = [sql for name, sql in objects.items() if name not in existing]
+            for sql in missing:
+                cursor.execute(sql)
+            if missing:
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        return bool(missing)
+
+    def search(self, query):
+        return SearchResults(self, query)
+
+    def fallback_queryset(self, query):
+        terms = re.findall(r'\w+', query)[:MAX_TERMS]
+        queryset = self.model.objects.all()
+        for term in terms:
+            queryset = queryset.filter(reduce(or_, (Q(**{f'{column}__icontains': term}) for column in self.columns)))
+        return queryset
+
+    def filter(self, queryset, query):
+        """Restrict ``queryset`` to rows matching ``query``"""
+        if not fts_available():
+            return queryset & self.fallback_queryset(query)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match_expression(query)]
+        ))
+
+
+class FullTextSearchMixin:
+    """
+    ``GET <resource>/search/?q=...``: ranked, paginated matches from
+    ``search_index``. Each result is the usual representation plus a
+    ``search`` object with the rank, highlighted title and snippet.
+    """
+    search_index = None
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '')
+        if not match_expression(query):
+            return Response(
+                {'error': True, 'message': 'Query parameter "q" must contain at least one word'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        page = self.paginate_queryset(self.search_index.search(query))
+        instances = [instance for instance, _ in page]
+        data = self.get_serializer(instances, many=True).data
+        for item, (_, match) in zip(data, page):
+            item['search'] = match
+        return self.get_paginated_response(data)
+
+
+class FullTextSearchAdminMixin:
+    """Admin search through ``search_index`` instead of icontains scans"""
+    search_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not match_expression(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        return self.search_index.filter(queryset, search_term), False
+
+
+def ensure_indexes(using='default', verbosity=1, **kwargs):
+    """post_migrate handler: bring every registered FTS index up to date"""
+    if connections[using].vendor != 'sqlite':
+        return
+    for index in INDEXES:
+        if index.ensure(using) and verbosity >= 1:
+            print(f"Rebuilt full-text index {index.table}")
+
+
+service_index = FullTextIndex(Service, columns=('name', 'description'), weights=(10.0, 1.0))
@@ -0,0 +1,244 @@
+"""
+Media and static file serving.
+
+Every response carries Last-Modified, an ETag and Cache-Control. Blobs and
+image derivatives have content-addressed names that never change meaning,
+so they are cached for a year and marked ``immutable``. Other files get
+``MEDIA_CACHE_MAX_AGE``. Conditional GETs are answered with 304 before the
+file is opened.
+
+With ``MEDIA_SENDFILE`` set, the transfer is handed to the front server:
+
+    'xsendfile'  X-Sendfile: <absolute path> (Apache mod_xsendfile, lighttpd)
+    'nginx'      X-Accel-Redirect: <MEDIA_SENDFILE_PREFIX><path>, e.g.
+
+                     location /protected-media/ {
+                         internal;
+                         alias /srv/sarb/backend/media/;
+                     }
+
+Otherwise the file is streamed from here, honouring single byte ranges
+(``Range``/``If-Range``); requests with several ranges get the whole file.
+
+Static files are served from STATIC_ROOT the same way, choosing the
+precompressed ``.br``/``.gz`` variant ``collectstatic`` wrote when the client
+accepts it. Fingerprinted names (from the staticfiles manifest, or Vite's
+hashed ``assets/``) are immutable; others get ``STATIC_CACHE_MAX_AGE``.
+"""
+import functools
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .images import DERIVED_PREFIX
+from .staticfiles import PRECOMPRESSED_ENCODINGS
+from .storage import ContentAddressedStorage
+
+IMMUTABLE_PREFIXES = (f'{ContentAddressedStorage.blob_prefix}/', f'{DERIVED_PREFIX}/')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+# Vite's build output: assets/<name>-<8 character hash>.<ext>
+VITE_ASSET = re.compile(r'(^|/)assets/[^/]+-[A-Za-z0-9_-]{8}\.\w+$')
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+UNSATISFIABLE = object()
+
+
+def parse_range(header, size):
+    """
+    (first, last) byte positions for a single-range ``Range`` header,
+    UNSATISFIABLE, or None to send the whole file (no, invalid or multiple ranges)
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            return UNSATISFIABLE
+        return max(0, size - int(last)), size - 1
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        return UNSATISFIABLE
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+def _read_range(path, first, length):
+    with open(path, 'rb') as file:
+        file.seek(first)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _resolve(root, path):
+    """Absolute path and stat of the regular file ``path`` under ``root``, or 404"""
+    try:
+        full_path = safe_join(root, path)
+        stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Not found')
+    return full_path, stat
+
+
+def _cache_headers(response, etag, last_modified, immutable, max_age):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if immutable:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def _file_response(request, full_path, size, etag, last_modified, content_type):
+    """The whole file, or the single byte range the request asks for"""
+    byte_range = None
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if request.method == 'GET' and (not if_range or if_range in (etag, http_date(last_modified))):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+
+    if byte_range is UNSATISFIABLE:
+        response = HttpResponse(status=416, content_type=content_type)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range is not None:
+        first, last = byte_range
+        response = StreamingHttpResponse(_read_range(full_path, first, last - first + 1), status=206,
+                                         content_type=content_type)
+        response['Content-Range'] = f'bytes {first}-{last}/{size}'
+        response['Content-Length'] = str(last - first + 1)
+    elif request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(size)
+    else:
+        # Full file: the WSGI server can use sendfile(2) through wsgi.file_wrapper
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    full_path, stat = _resolve(settings.MEDIA_ROOT, path)
+    name = path.replace(os.sep, '/')
+    if name.startswith(f'{ContentAddressedStorage.blob_prefix}/'):
+        # The name is the content hash
+        etag = f'"{os.path.splitext(os.path.basename(name))[0]}"'
+    else:
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    last_modified = int(stat.st_mtime)
+    immutable = name.startswith(IMMUTABLE_PREFIXES)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return _cache_headers(not_modified, etag, last_modified, immutable, settings.MEDIA_CACHE_MAX_AGE)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    sendfile = settings.MEDIA_SENDFILE
+    if sendfile:
+        # The front server reads the file and handles ranges itself
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'nginx':
+            response['X-Accel-Redirect'] = quote(f"{settings.MEDIA_SENDFILE_PREFIX.rstrip('/')}/{name}")
+        else:
+            response['X-Sendfile'] = full_path
+    else:
+        response = _file_response(request, full_path, stat.st_size, etag, last_modified, content_type)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return _cache_headers(response, etag, last_modified, immutable, settings.MEDIA_CACHE_MAX_AGE)
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header"""
+    weights = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+
+@functools.lru_cache(maxsize=4)
+def _fingerprinted_names(manifest_hash):
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+
+
+def is_fingerprinted(name):
+    """Whether ``name`` carries a content hash: from the staticfiles manifest, or a Vite asset"""
+    if VITE_ASSET.search(name):
+        return True
+    return name in _fingerprinted_names(getattr(staticfiles_storage, 'manifest_hash', ''))
+
+
+@require_safe
+def serve_static(request, path):
+    """
+    A collected static file, or its precompressed variant (core/staticfiles.py)
+    when the client accepts that encoding
+    """
+    full_path, stat = _resolve(settings.STATIC_ROOT, path)
+    name = path.replace(os.sep, '/')
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    variants = [
+        (coding, full_path + suffix) for coding, suffix in PRECOMPRESSED_ENCODINGS
+        if os.path.isfile(full_path + suffix)
+    ]
+    weights = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING'))
+    acceptable = [
+        (weights.get(coding, weights.get('*', 0)), -position, coding, variant_path)
+        for position, (coding, variant_path) in enumerate(variants)
+    ]
+    acceptable = [candidate for candidate in acceptable if candidate[0] > 0]
+    coding = None
+    if acceptable:
+        _, _, coding, full_path = max(acceptable)
+        stat = os.stat(full_path)
+
+    # Each encoding is a different representation with its own validator
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}{"-" + coding if coding else ""}"'
+    last_modified = int(stat.st_mtime)
+    immutable = is_fingerprinted(name)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        response = not_modified
+    else:
+        response = _file_response(request, full_path, stat.st_size, etag, last_modified, content_type)
+        if coding:
+            response['Content-Encoding'] = coding
+    if variants:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return _cache_headers(response, etag, last_modified, immutable, settings.STATIC_CACHE_MAX_AGE)
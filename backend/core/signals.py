@@ -0,0 +1,50 @@
+import threading
+from contextlib import contextmanager
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from .cache import invalidate_model
+from .models import Service, CaseStudy, TeamMember, ContactMessage, ContentVersion
+
+_bulk = threading.local()
+
+
+def content_changed(model):
+    """
+    Bump the content version of ``model`` and invalidate its cached responses.
+    The bump is part of the writer's transaction; the invalidation waits for
+    the commit, or a read in between would cache the old rows under the new
+    generation.
+    """
+    ContentVersion.bump(model)
+    transaction.on_commit(lambda: invalidate_model(model))
+
+
+@contextmanager
+def bulk_change(model):
+    """
+    Collapse the per-row save/delete notifications for ``model`` inside the
+    block into a single ``content_changed`` call at the end. Also covers
+    bulk_create/bulk_update, which send no signals at all.
+    """
+    models = getattr(_bulk, 'models', set())
+    _bulk.models = models | {model}
+    try:
+        yield
+    finally:
+        _bulk.models = models
+        content_changed(model)
+
+
+def notify_change(model):
+    """``content_changed(model)``, unless a ``bulk_change(model)`` block will report it"""
+    if model not in getattr(_bulk, 'models', ()):
+        content_changed(model)
+
+
+def handle_content_change(sender, **kwargs):
+    notify_change(sender)
+
+
+for model in (Service, CaseStudy, TeamMember, ContactMessage):
+    post_save.connect(handle_content_change, sender=model, dispatch_uid=f'content-save-{model._meta.label_lower}')
+    post_delete.connect(handle_content_change, sender=model, dispatch_uid=f'content-delete-{model._meta.label_lower}')
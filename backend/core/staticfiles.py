@@ -0,0 +1,92 @@
+"""
+Static files storage: fingerprinted names plus precompressed variants.
+
+On top of ManifestStaticFilesStorage (``app.3f2a9c1b.js`` names, rewritten
+CSS references, staticfiles.json), ``collectstatic`` writes ``<name>.gz``
+and, when the optional ``brotli`` package is installed, ``<name>.br`` next
+to every compressible file. A variant is only kept when it saves at least
+COMPRESSION_MIN_SAVING of the original. Sizes per asset are recorded in
+``compression.json`` in STATIC_ROOT:
+
+    python manage.py static_report
+
+``core.serving.serve_static`` picks the variant matching Accept-Encoding;
+nginx can serve the same files with ``gzip_static on`` / ``brotli_static on``.
+"""
+import gzip
+import json
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.mjs', '.map', '.json', '.html', '.txt', '.xml', '.svg', '.ico',
+    '.ttf', '.otf', '.eot', '.wasm',
+)
+COMPRESSION_MIN_SAVING = 0.05
+REPORT_NAME = 'compression.json'
+
+# (Content-Encoding, file suffix) in order of preference
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _encoders():
+    """(Content-Encoding, file suffix, compress) for the available compressors"""
+    compressors = {'gzip': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors['br'] = lambda data: brotli.compress(data, quality=11)
+    return [(coding, suffix, compressors[coding]) for coding, suffix in PRECOMPRESSED_ENCODINGS if coding in compressors]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+
+    def stored_name(self, name):
+        # Without a manifest (collectstatic not run yet, e.g. in development
+        # or tests) fall back to the plain name instead of failing
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def _replace(self, name, data):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(data))
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        names = sorted({*paths, *self.hashed_files.values()})
+        report = {}
+        for name in names:
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS) or not self.exists(name):
+                continue
+            with self.open(name) as file:
+                data = file.read()
+            entry = report[name] = {'size': len(data)}
+            for encoding, suffix, compress in _encoders():
+                compressed = compress(data)
+                if len(compressed) <= len(data) * (1 - COMPRESSION_MIN_SAVING):
+                    self._replace(name + suffix, compressed)
+                    entry[encoding] = len(compressed)
+                elif self.exists(name + suffix):
+                    self.delete(name + suffix)
+        self._replace(REPORT_NAME, json.dumps(report, indent=1, sort_keys=True).encode())
+
+        original = sum(entry['size'] for entry in report.values())
+        for encoding, _, _ in _encoders():
+            compressed = sum(entry.get(encoding, entry['size']) for entry in report.values())
+            print(f"{encoding}: {len(report)} files, {original} -> {compressed} bytes")
+
+    def compression_report(self):
+        """Per-asset sizes recorded by the last collectstatic, {} if none"""
+        if not self.exists(REPORT_NAME):
+            return {}
+        with self.open(REPORT_NAME) as file:
+            return json.load(file)
@@ -0,0 +1,186 @@
+"""
+Content-addressed media storage.
+
+Uploads are hashed while they stream to a temporary file next to their final
+location and stored once, as ``blobs/<aa>/<sha256><ext>``. Saving content
+that is already stored returns the existing name instead of writing another
+``healthcare_ai_0bmzgBM.jpg``. Names never change meaning, so browsers and
+CDNs can cache them indefinitely.
+
+``MediaBlob`` holds the reference count of every blob across the file fields
+tracked by ``core.media``, refreshed after each commit that changes which
+files rows point to.
+
+    python manage.py gc_media            # delete blobs nothing references
+    python manage.py gc_media --adopt    # move older uploads into the store first
+
+Blobs are only deleted once they have been unreferenced and untouched for a
+grace period, so an upload reusing a blob is never raced by the collector.
+"""
+import hashlib
+import os
+import tempfile
+import time
+
+from django.core.files.storage import FileSystemStorage, default_storage
+
+from . import media
+from .models import MediaBlob
+from .signals import bulk_change
+
+TEMP_PREFIX = '.upload-'
+EXTENSION_ALIASES = {'.jpeg': '.jpg', '.tif': '.tiff'}
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    blob_prefix = 'blobs'
+    # Callers that already chose a content-addressed name (image derivatives)
+    # are stored under that name
+    passthrough_prefixes = ('derived/',)
+
+    def is_blob(self, name):
+        return name.startswith(f'{self.blob_prefix}/')
+
+    def blob_name(self, digest, name):
+        extension = os.path.splitext(name)[1].lower()
+        return f'{self.blob_prefix}/{digest[:2]}/{digest}{EXTENSION_ALIASES.get(extension, extension)}'
+
+    def get_available_name(self, name, max_length=None):
+        if name.startswith(self.passthrough_prefixes):
+            return super().get_available_name(name, max_length)
+        # _save() replaces the name with the content address
+        return name
+
+    def _save(self, name, content):
+        if name.startswith(self.passthrough_prefixes):
+            return super()._save(name, content)
+
+        directory = self.path(self.blob_prefix)
+        os.makedirs(directory, exist_ok=True)
+        sha = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as temp:
+                for chunk in content.chunks():
+                    sha.update(chunk)
+                    temp.write(chunk)
+            name = self.blob_name(sha.hexdigest(), name)
+            path = self.path(name)
+            if os.path.exists(path):
+                # Restart the collector's grace period for a blob being reused
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, path)
+                temp_path = None
+        finally:
+            if temp_path is not None:
+                os.unlink(temp_path)
+        return name
+
+    def blob_files(self):
+        """(name, size, mtime) of every stored blob, plus leftover temporary files"""
+        root = self.path(self.blob_prefix)
+        for directory, _, files in os.walk(root):
+            for filename in files:
+                path = os.path.join(directory, filename)
+                stat = os.stat(path)
+                name = os.path.relpath(path, self.location).replace(os.sep, '/')
+                yield name, stat.st_size, stat.st_mtime
+
+
+def _content_addressed():
+    return isinstance(default_storage, ContentAddressedStorage)
+
+
+@media.on_change
+def update_refcounts(names):
+    if not _content_addressed():
+        return
+    blobs = [name for name in names if default_storage.is_blob(name)]
+    if not blobs:
+        return
+    sizes = {name: default_storage.size(name) if default_storage.exists(name) else 0 for name in blobs}
+    MediaBlob.refresh(sizes, media.references(blobs))
+
+
+def collect_garbage(grace_seconds=3600, dry_run=False):
+    """
+    Recount the references of every blob, then delete the blobs nothing
+    references that have not been touched for ``grace_seconds``. Returns
+    (deleted names, bytes freed, referenced names missing from disk).
+    """
+    cutoff = time.time() - grace_seconds
+    files = {name: (size, mtime) for name, size, mtime in default_storage.blob_files()}
+    counts = media.references()
+    missing = sorted(name for name in counts if default_storage.is_blob(name) and name not in files)
+
+    # Includes temporary files of uploads that never finished
+    orphans = [name for name, (size, mtime) in files.items() if mtime < cutoff and not counts.get(name)]
+    freed = sum(files[name][0] for name in orphans)
+    if dry_run:
+        return sorted(orphans), freed, missing
+
+    for name in orphans:
+        default_storage.delete(name)
+    kept = {
+        name: size for name, (size, _) in files.items()
+        if name not in orphans and not os.path.basename(name).startswith(TEMP_PREFIX)
+    }
+    MediaBlob.objects.exclude(name__in=kept).delete()
+    MediaBlob.refresh(kept, counts)
+    return sorted(orphans), freed, missing
+
+
+def adopt(grace_seconds=3600, dry_run=False):
+    """
+    Move every referenced file stored before this backend into the blob
+    store, pointing rows at the blob, then delete the old files - along with
+    the unreferenced copies left in the upload directories. Returns
+    (adopted {old name: blob name}, deleted old names, bytes freed).
+    """
+    cutoff = time.time() - grace_seconds
+    adopted = {}
+    for model, field in media.FIELDS:
+        names = model._base_manager.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}) \
+            .values_list(field, flat=True).distinct()
+        for name in names:
+            if default_storage.is_blob(name) or name in adopted or not default_storage.exists(name):
+                continue
+            if dry_run:
+                adopted[name] = None
+                continue
+            with default_storage.open(name, 'rb') as file:
+                adopted[name] = default_storage.save(name, file)
+
+    if not dry_run:
+        for model, field in media.FIELDS:
+            # update() sends no signals: invalidate cached responses that
+            # still point at the old files before those are deleted
+            with bulk_change(model):
+                for old, blob in adopted.items():
+                    model._base_manager.filter(**{field: old}).update(**{field: blob})
+        media.changed(set(adopted) | set(adopted.values()))
+
+    # Upload directories of the tracked fields, e.g. team/ and case_studies/
+    directories = {
+        model._meta.get_field(field).upload_to for model, field in media.FIELDS
+        if isinstance(model._meta.get_field(field).upload_to, str)
+    }
+    referenced = set(media.references()) if not dry_run else set(media.references()) - set(adopted)
+    deleted, freed = [], 0
+    for directory in sorted(directories):
+        directory = directory.rstrip('/')
+        if not directory or not default_storage.exists(directory):
+            continue
+        for filename in default_storage.listdir(directory)[1]:
+            name = f'{directory}/{filename}'
+            if name in referenced or default_storage.get_modified_time(name).timestamp() >= cutoff:
+                continue
+            freed += default_storage.size(name)
+            deleted.append(name)
+            if not dry_run:
+                default_storage.delete(name)
+    return adopted, deleted, freed
@@ -0,0 +1,119 @@
+"""
+Test helpers for the database behaviour of the API.
+
+Index usage:
+
+    with self.assertQueriesUseIndex('core_contactmessage', 'contact_created_idx'):
+        self.client.get('/api/contact/')
+
+Every SELECT on the table that runs inside the block is re-run under
+EXPLAIN, and at least one of the plans must name the index. On PostgreSQL
+sequential scans are disabled for the EXPLAIN, since small test tables would
+otherwise always be scanned.
+
+Query budgets:
+
+    response = self.assertWithinQueryBudget(api_client, 'GET', '/api/services/')
+
+The request must stay within the endpoint's entry in
+``core.querybudget.QUERY_BUDGETS`` and must not repeat queries (N+1).
+
+Uploaded files: ``TemporaryMediaMixin`` gives every test its own
+MEDIA_ROOT, removed afterwards.
+
+Test classes derive from ``core.testing.TestCase``, which turns API
+throttling off (every test request comes from the same address) and lets a
+configured read replica share the test database.
+"""
+import shutil
+import tempfile
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import TestCase as DjangoTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import replicas
+from .querybudget import QUERY_BUDGETS, QueryRecorder, endpoint_name
+
+
+@override_settings(API_THROTTLE_ENABLED=False, DATABASE_REPLICA_LAG=0)
+class TestCase(DjangoTestCase):
+    """
+    Base class for the project's tests. A configured replica mirrors the test
+    database (TEST MIRROR) and shares its connection here, so reads routed to
+    it see what the test wrote inside its transaction, and it never lags.
+    """
+    databases = '__all__'
+
+    @classmethod
+    def setUpClass(cls):
+        if replicas.enabled():
+            replica = connections[replicas.REPLICA_ALIAS]
+            connections[replicas.REPLICA_ALIAS] = connections[DEFAULT_DB_ALIAS]
+            cls.addClassCleanup(connections.__setitem__, replicas.REPLICA_ALIAS, replica)
+        super().setUpClass()
+
+
+def explain(sql):
+    """Return the query plan for ``sql`` as a list of lines"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+
+def table_selects(queries, table):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].lstrip().upper().startswith('SELECT') and f'"{table}"' in query['sql']
+    ]
+
+
+class QueryPlanAssertionsMixin:
+    @contextmanager
+    def assertQueriesUseIndex(self, table, index):
+        with CaptureQueriesContext(connection) as captured:
+            yield captured
+        selects = table_selects(captured.captured_queries, table)
+        self.assertTrue(selects, f'No SELECT on {table} was executed')
+        plans = [(sql, explain(sql)) for sql in selects]
+        if not any(index in line for _, plan in plans for line in plan):
+            report = '\n\n'.join(f'{sql}\n  ' + '\n  '.join(plan) for sql, plan in plans)
+            self.fail(f'No query on {table} used {index}:\n\n{report}')
+
+
+class QueryBudgetAssertionsMixin:
+    def assertWithinQueryBudget(self, client, method, path, data=None, **kwargs):
+        endpoint = endpoint_name(method, urlsplit(path).path)
+        self.assertIn(endpoint, QUERY_BUDGETS, f'No query budget for {endpoint}')
+        budget = QUERY_BUDGETS[endpoint]
+
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = getattr(client, method.lower())(path, data, **kwargs)
+
+        report = '\n'.join(f'  {sql} {params}' for sql, params in recorder.queries)
+        self.assertLessEqual(len(recorder), budget,
+                             f'{endpoint} ran {len(recorder)} queries, budget {budget}:\n{report}')
+        self.assertFalse(recorder.duplicates(), f'{endpoint} ran identical queries:\n{report}')
+        self.assertFalse(recorder.repeated(), f'{endpoint} repeated a query per row (N+1):\n{report}')
+        return response
+
+
+class TemporaryMediaMixin:
+    """Store each test's uploads in a fresh MEDIA_ROOT; ``media_settings`` are overridden too"""
+    media_settings = {}
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp(prefix='sarb-test-media-')
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root, **self.media_settings)
+        override.enable()
+        self.addCleanup(override.disable)
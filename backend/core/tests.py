@@ -1,3 +1,841 @@
-from django.test import TestCase
+import base64
+import datetime
+import decimal
+import gzip
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import uuid
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import caches
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.utils.http import http_date
+from django.utils.translation import gettext_lazy
+from PIL import Image
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .cache import cache_metrics, get_cache, get_generation
+from . import replicas, storage, throttling
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .models import ContactMessage, ContentVersion, MediaBlob, ResponsiveImage, Service, TeamMember
+from .testing import QueryBudgetAssertionsMixin, QueryPlanAssertionsMixin, TemporaryMediaMixin, TestCase
+
+
+class QueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', contact_messages=120, stdout=StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+
+    def test_team_list_uses_order_index(self):
+        with self.assertQueriesUseIndex('core_teammember', 'team_member_order_idx'):
+            self.assertEqual(self.api.get('/api/team/').status_code, 200)
+
+    def test_contact_pages_use_created_index(self):
+        self.api.force_authenticate(self.admin)
+        with self.assertQueriesUseIndex('core_contactmessage', 'contact_created_idx'):
+            response = self.api.get('/api/contact/?page_size=50')
+        self.assertEqual(response.status_code, 200)
+        with self.assertQueriesUseIndex('core_contactmessage', 'contact_created_idx'):
+            self.assertEqual(self.api.get(response.json()['next']).status_code, 200)
+
+    def test_admin_contact_filters_use_indexes(self):
+        self.client.force_login(self.admin)
+        url = '/admin/core/contactmessage/'
+        with self.assertQueriesUseIndex('core_contactmessage', 'contact_unread_idx'):
+            self.assertEqual(self.client.get(url, {'is_read__exact': '0'}, HTTP_HOST='localhost').status_code, 200)
+        with self.assertQueriesUseIndex('core_contactmessage', 'contact_created_idx'):
+            self.assertEqual(self.client.get(url, HTTP_HOST='localhost').status_code, 200)
+
+
+class IndexViewQueryBudgetTests(QueryBudgetAssertionsMixin, TestCase):
+    def test_index(self):
+        response = self.assertWithinQueryBudget(self.client, 'GET', '/', HTTP_HOST='localhost')
+        self.assertEqual(response.status_code, 200)
+
+
+def jpeg_upload(name='photo.jpg', size=(700, 400), color='teal'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/jpeg')
+
+
+class ImageDerivativeTests(TemporaryMediaMixin, TestCase):
+    media_settings = {
+        'IMAGE_DERIVATIVE_WIDTHS': [320, 640, 960],
+        'IMAGE_DERIVATIVE_FORMATS': ['avif', 'webp', 'jpeg'],
+    }
+
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+
+    def create_member(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TeamMember.objects.create(name='Ada', position='CTO', bio='Bio', image=image)
+
+    def test_upload_generates_derivatives(self):
+        member = self.create_member(jpeg_upload())
+        responsive = ResponsiveImage.objects.get(source=member.image.name)
+        self.assertEqual((responsive.width, responsive.height), (700, 400))
+        self.assertEqual(
+            [(variant['format'], variant['width']) for variant in responsive.variants],
+            [(name, width) for width in (320, 640, 700) for name in ('avif', 'webp', 'jpeg')],
+        )
+        for variant in responsive.variants:
+            self.assertTrue(variant['name'].startswith(f'derived/{responsive.digest[:2]}/{responsive.digest}/'))
+            self.assertTrue(default_storage.exists(variant['name']))
+
+        data = self.api.get(f'/api/team/{member.pk}/').json()['image_variants']
+        self.assertEqual(data['src'], f'http://localhost/media/derived/{responsive.digest[:2]}/{responsive.digest}/700w.jpg')
+        self.assertEqual(data['srcset'].count('w, '), 2)
+        self.assertEqual([source['type'] for source in data['sources']], ['image/avif', 'image/webp'])
+
+    def test_unavailable_formats_are_skipped(self):
+        # Pillow built without libavif has no AVIF encoder
+        with mock.patch.dict(Image.SAVE):
+            del Image.SAVE['AVIF']
+            member = self.create_member(jpeg_upload())
+        responsive = ResponsiveImage.objects.get(source=member.image.name)
+        self.assertEqual({variant['format'] for variant in responsive.variants}, {'webp', 'jpeg'})
+
+    def test_identical_uploads_share_derivatives(self):
+        first = self.create_member(jpeg_upload('a.jpg'))
+        second = self.create_member(jpeg_upload('b.jpg'))
+        self.assertEqual(first.image.name, second.image.name)
+        responsive = ResponsiveImage.objects.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(ResponsiveImage.objects.exists())
+        self.assertTrue(all(default_storage.exists(variant['name']) for variant in responsive.variants))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(ResponsiveImage.objects.exists())
+        self.assertFalse(any(default_storage.exists(variant['name']) for variant in responsive.variants))
+
+    def test_replaced_image_releases_derivatives(self):
+        member = self.create_member(jpeg_upload())
+        old = ResponsiveImage.objects.get(source=member.image.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            member.image = jpeg_upload('new.jpg', color='orange')
+            member.save()
+
+        self.assertFalse(ResponsiveImage.objects.filter(source=old.source).exists())
+        self.assertFalse(any(default_storage.exists(variant['name']) for variant in old.variants))
+        new = ResponsiveImage.objects.get(source=member.image.name)
+        self.assertNotEqual(new.digest, old.digest)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            TeamMember.objects.filter(pk=member.pk).delete()
+        self.assertFalse(ResponsiveImage.objects.exists())
+        self.assertFalse(any(default_storage.exists(variant['name']) for variant in new.variants))
+
+    def test_generated_derivatives_invalidate_cached_responses(self):
+        # Created without running the upload's on-commit derivative generation
+        member = TeamMember.objects.create(name='Ada', position='CTO', bio='Bio', image=jpeg_upload())
+        before = self.api.get('/api/team/')
+        self.assertIsNone(before.json()['results'][0]['image_variants'])
+        self.assertEqual(self.api.get('/api/team/')['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('generate_image_derivatives', stdout=StringIO())
+        after = self.api.get('/api/team/')
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        variants = after.json()['results'][0]['image_variants']
+        self.assertIn(ResponsiveImage.objects.get(source=member.image.name).digest, variants['src'])
+
+    def test_missing_derivatives_serialize_as_null(self):
+        member = TeamMember.objects.create(name='Ada', position='CTO', bio='Bio', image='team/missing.jpg')
+        self.assertIsNone(self.api.get(f'/api/team/{member.pk}/').json()['image_variants'])
+
+
+class ContentAddressedStorageTests(TemporaryMediaMixin, TestCase):
+    media_settings = {'IMAGE_DERIVATIVE_FORMATS': ['jpeg']}
+
+    def create_member(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return TeamMember.objects.create(name='Ada', position='CTO', bio='Bio', image=image)
+
+    def blob_count(self):
+        return sum(1 for _ in default_storage.blob_files())
+
+    def test_identical_content_is_stored_once(self):
+        first = default_storage.save('team/a.jpeg', ContentFile(b'same bytes'))
+        second = default_storage.save('case_studies/b.jpg', ContentFile(b'same bytes'))
+        self.assertEqual(first, second)
+        self.assertRegex(first, r'^blobs/[0-9a-f]{2}/[0-9a-f]{64}\.jpg$')
+        self.assertEqual(self.blob_count(), 1)
+        self.assertNotEqual(default_storage.save('team/c.jpg', ContentFile(b'other bytes')), first)
+
+    def test_refcounts_follow_references(self):
+        first = self.create_member(jpeg_upload())
+        second = self.create_member(jpeg_upload())
+        blob = MediaBlob.objects.get(name=first.image.name)
+        self.assertEqual((blob.refcount, blob.size), (2, first.image.size))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = jpeg_upload(color='orange')
+            second.save()
+        self.assertEqual(MediaBlob.objects.get(name=first.image.name).refcount, 1)
+        self.assertEqual(MediaBlob.objects.get(name=second.image.name).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertEqual(MediaBlob.objects.get(name=blob.name).refcount, 0)
+
+    def test_gc_deletes_unreferenced_blobs(self):
+        member = self.create_member(jpeg_upload())
+        orphan = default_storage.save('team/orphan.jpg', ContentFile(b'nobody uses this'))
+
+        deleted, freed, missing = storage.collect_garbage(grace_seconds=3600)
+        self.assertEqual((deleted, missing), ([], []))
+
+        deleted, freed, missing = storage.collect_garbage(grace_seconds=0)
+        self.assertEqual((deleted, freed), ([orphan], 16))
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(member.image.name))
+        self.assertEqual(list(MediaBlob.objects.values_list('name', 'refcount')), [(member.image.name, 1)])
+
+    def test_adopt_moves_old_uploads_into_the_store(self):
+        legacy = FileSystemStorage(location=self.media_root)
+        content = jpeg_upload().read()
+        for name in ('team/photo.jpg', 'team/photo_x1Y2z3.jpg', 'team/unused.jpg'):
+            legacy.save(name, ContentFile(content))
+        member = TeamMember.objects.create(name='Ada', position='CTO', bio='Bio', image='team/photo.jpg')
+        other = TeamMember.objects.create(name='Bob', position='CEO', bio='Bio', image='team/photo_x1Y2z3.jpg')
+        api = APIClient(HTTP_HOST='localhost')
+        before = api.get('/api/team/')
+        self.assertIn('/media/team/photo.jpg', before.json()['results'][0]['image'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('gc_media', adopt=True, grace_hours=0, stdout=StringIO())
+
+        after = api.get('/api/team/')
+        self.assertEqual(after['X-Cache'], 'MISS')
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertTrue(all('/media/blobs/' in row['image'] for row in after.json()['results']))
+
+        member.refresh_from_db()
+        other.refresh_from_db()
+        self.assertTrue(member.image.name.startswith('blobs/'))
+        self.assertEqual(member.image.name, other.image.name)
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'team')), [])
+        self.assertEqual(self.blob_count(), 1)
+        self.assertEqual(MediaBlob.objects.get().refcount, 2)
+        self.assertTrue(ResponsiveImage.objects.filter(source=member.image.name).exists())
+
+
+class MediaServingTests(TemporaryMediaMixin, QueryBudgetAssertionsMixin, TestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.blob = default_storage.save('team/photo.jpg', ContentFile(self.content))
+        FileSystemStorage(location=self.media_root).save('team/legacy.jpg', ContentFile(self.content))
+
+    def get(self, name, **headers):
+        return self.client.get(f'/media/{name}', headers=headers)
+
+    def body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_full_response(self):
+        response = self.assertWithinQueryBudget(self.client, 'GET', f'/media/{self.blob}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], f'"{self.blob.split("/")[-1][:-4]}"')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+    def test_mutable_names_get_a_short_max_age(self):
+        with override_settings(MEDIA_CACHE_MAX_AGE=600):
+            response = self.get('team/legacy.jpg')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=600')
+        self.assertEqual(self.body(response), self.content)
+
+    def test_byte_ranges(self):
+        for header, expected, content_range in [
+            ('bytes=2-5', self.content[2:6], 'bytes 2-5/1024'),
+            ('bytes=1000-', self.content[1000:], 'bytes 1000-1023/1024'),
+            ('bytes=-4', self.content[-4:], 'bytes 1020-1023/1024'),
+            ('bytes=1020-5000', self.content[1020:], 'bytes 1020-1023/1024'),
+        ]:
+            response = self.get(self.blob, range=header)
+            self.assertEqual(response.status_code, 206, header)
+            self.assertEqual(response['Content-Range'], content_range)
+            self.assertEqual(response['Content-Length'], str(len(expected)))
+            self.assertEqual(self.body(response), expected)
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        response = self.get(self.blob, range='bytes=1024-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, 'bytes */1024'))
+        # Several ranges, or a stale If-Range: the whole file
+        self.assertEqual(self.get(self.blob, range='bytes=0-1,5-6').status_code, 200)
+        self.assertEqual(self.get(self.blob, range='bytes=0-1', if_range='"stale"').status_code, 200)
+        etag = self.get(self.blob)['ETag']
+        self.assertEqual(self.get(self.blob, range='bytes=0-1', if_range=etag).status_code, 206)
+
+    def test_conditional_get(self):
+        response = self.get(self.blob)
+        not_modified = self.get(self.blob, if_none_match=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['Cache-Control'], response['Cache-Control'])
+        self.assertEqual(self.get(self.blob, if_modified_since=response['Last-Modified']).status_code, 304)
+        self.assertEqual(self.get(self.blob, if_modified_since=http_date(0)).status_code, 200)
+
+    def test_sendfile_offload(self):
+        with override_settings(MEDIA_SENDFILE='nginx'):
+            response = self.get(self.blob)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.blob}')
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+
+        with override_settings(MEDIA_SENDFILE='xsendfile'):
+            response = self.get(self.blob)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media_root, self.blob))
+
+    def test_missing_and_outside_files(self):
+        self.assertEqual(self.get('team/missing.jpg').status_code, 404)
+        self.assertEqual(self.get('team').status_code, 404)
+        self.assertEqual(self.get('../manage.py').status_code, 404)
+        self.assertEqual(self.client.post(f'/media/{self.blob}').status_code, 405)
+
+
+class StaticFilesTests(TestCase):
+    script = b'function greet(name) { return "Hello, " + name; }\n' * 200
+
+    def setUp(self):
+        source = tempfile.mkdtemp(prefix='sarb-test-static-src-')
+        root = tempfile.mkdtemp(prefix='sarb-test-static-')
+        self.addCleanup(shutil.rmtree, source, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with open(os.path.join(source, 'app.js'), 'wb') as file:
+            file.write(self.script)
+        with open(os.path.join(source, 'tiny.css'), 'wb') as file:
+            file.write(b'a{}')
+        override = override_settings(
+            STATIC_ROOT=root,
+            STATICFILES_DIRS=[source],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def collect(self):
+        with redirect_stdout(StringIO()):
+            call_command('collectstatic', interactive=False, verbosity=0)
+        return staticfiles_storage.stored_name('app.js')
+
+    def get(self, name, **headers):
+        response = self.client.get(f'/static/{name}', headers=headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_unfingerprinted_names_without_manifest(self):
+        self.assertEqual(staticfiles_storage.url('app.js'), '/static/app.js')
+
+    def test_collectstatic_fingerprints_and_precompresses(self):
+        name = self.collect()
+        self.assertRegex(name, r'^app\.[0-9a-f]{12}\.js$')
+        self.assertTrue(staticfiles_storage.exists(f'{name}.gz'))
+        # Not worth compressing
+        self.assertFalse(staticfiles_storage.exists(staticfiles_storage.stored_name('tiny.css') + '.gz'))
+
+        report = staticfiles_storage.compression_report()
+        self.assertEqual(report[name]['size'], len(self.script))
+        self.assertLess(report[name]['gzip'], len(self.script) // 10)
+        self.assertNotIn('gzip', report['tiny.css'])
+
+        out = StringIO()
+        call_command('static_report', stdout=out)
+        self.assertIn(name, out.getvalue())
+
+    def test_serves_negotiated_encoding(self):
+        name = self.collect()
+        response, body = self.get(name, accept_encoding='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(body), self.script)
+        self.assertEqual(response['Content-Type'], 'text/javascript')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        identity, body = self.get(name, accept_encoding='gzip;q=0')
+        self.assertFalse(identity.has_header('Content-Encoding'))
+        self.assertEqual(body, self.script)
+        self.assertNotEqual(identity['ETag'], response['ETag'])
+
+        not_modified, _ = self.get(name, accept_encoding='gzip', if_none_match=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_unfingerprinted_names_get_a_short_max_age(self):
+        self.collect()
+        response, body = self.get('app.js')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=300')
+        self.assertEqual(body, self.script)
+
+
+class FastJSONTests(TestCase):
+    data = {
+        'created': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+        'local': datetime.datetime(2024, 5, 1, 14, 30, tzinfo=datetime.timezone(datetime.timedelta(hours=2))),
+        'naive': datetime.datetime(2024, 5, 1, 12, 30),
+        'day': datetime.date(2024, 5, 1),
+        'at': datetime.time(9, 15, 30, 500),
+        'duration': datetime.timedelta(minutes=90),
+        'price': decimal.Decimal('19.90'),
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'label': gettext_lazy('Services'),
+        'text': 'Arabic سلام, separators    , quote " and \\',
+        'nested': [{1: 'int key', None: 'none key'}, (1, 2.5, True, None)],
+        'huge': 2 ** 70,
+    }
+
+    def test_renders_same_bytes_as_stdlib(self):
+        self.assertEqual(FastJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_indented_output_falls_back(self):
+        media_type = 'application/json; indent=4'
+        self.assertEqual(FastJSONRenderer().render(self.data, media_type), JSONRenderer().render(self.data, media_type))
+
+    def test_parses_like_stdlib(self):
+        body = '{"image": "%s", "type": "crop-health", "n": [1, 2.5, null, -9223372036854775808]}' % (
+            base64.b64encode(os.urandom(3000)).decode())
+        parsed = FastJSONParser().parse(io.BytesIO(body.encode()))
+        self.assertEqual(parsed, JSONParser().parse(io.BytesIO(body.encode())))
+
+        for invalid in (b'{"a": ', b'{"a": NaN}'):
+            with self.assertRaises(ParseError) as fast:
+                FastJSONParser().parse(io.BytesIO(invalid))
+            with self.assertRaises(ParseError) as stdlib:
+                JSONParser().parse(io.BytesIO(invalid))
+            self.assertEqual(str(fast.exception), str(stdlib.exception))
+
+    def test_api_responses_match_stdlib(self):
+        call_command('reset_and_populate_db', contact_messages=5, stdout=StringIO())
+        api = APIClient(HTTP_HOST='localhost')
+        for url in ('/api/services/', '/api/team/', '/api/case-studies/'):
+            get_cache().clear()
+            response = api.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, JSONRenderer().render(response.data))
+
+
+class ThrottlingTests(TestCase):
+    rates = {'anon': '5/min', 'user': '60/min'}
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', stdout=StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+        caches[throttling.CACHE_ALIAS].clear()
+        override = override_settings(
+            API_THROTTLE_ENABLED=True,
+            REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=self.rates),
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.api = APIClient(HTTP_HOST='localhost')
+
+    def test_reads_take_one_token(self):
+        for _ in range(5):
+            self.assertEqual(self.api.get('/api/services/').status_code, 200)
+        response = self.api.get('/api/services/')
+        self.assertEqual(response.status_code, 429)
+        # One token comes back every 12 seconds
+        self.assertEqual(response['Retry-After'], '12')
+        # Buckets are per address
+        self.assertEqual(self.api.get('/api/services/', REMOTE_ADDR='10.0.0.2').status_code, 200)
+
+    def test_forwarded_for_is_ignored_without_proxies(self):
+        for index in range(5):
+            self.assertEqual(self.api.get('/api/services/', HTTP_X_FORWARDED_FOR=f'203.0.113.{index}').status_code, 200)
+        self.assertEqual(self.api.get('/api/services/', HTTP_X_FORWARDED_FOR='203.0.113.99').status_code, 429)
+
+        # Behind one proxy, its last entry is the client
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=self.rates, NUM_PROXIES=1)):
+            self.assertEqual(self.api.get('/api/services/', HTTP_X_FORWARDED_FOR='203.0.113.99').status_code, 200)
+
+    def test_writes_and_inference_cost_more(self):
+        message = {'name': 'Sara', 'email': 'sara@example.com', 'subject': 'Hello', 'message': 'Hi there'}
+        self.assertEqual(self.api.post('/api/contact/', message, format='json').status_code, 201)
+        self.assertEqual(self.api.get('/api/services/').status_code, 429)
+
+        # An analysis is refused before its body is even read
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={'anon': '60/min'})):
+            cost = settings.AGRICULTURE_THROTTLE_COST
+            for _ in range(60 // cost):
+                self.assertEqual(self.api.post('/api/agriculture/analyze/', {}, format='json',
+                                               REMOTE_ADDR='10.0.0.3').status_code, 400)
+            response = self.api.post('/api/agriculture/analyze/', {}, format='json', REMOTE_ADDR='10.0.0.3')
+            self.assertEqual(response.status_code, 429)
+            self.assertEqual(response['Retry-After'], str(cost))
+
+    def test_users_have_their_own_bucket(self):
+        for _ in range(5):
+            self.api.get('/api/services/')
+        self.api.force_authenticate(self.admin)
+        for _ in range(10):
+            self.assertEqual(self.api.get('/api/contact/').status_code, 200)
+
+    def test_buckets_refill(self):
+        state, wait = throttling.take(None, 3, capacity=5, rate=1.0, now=100.0)
+        self.assertEqual((state, wait), ((2.0, 100.0), 0.0))
+        state, wait = throttling.take(state, 4, capacity=5, rate=1.0, now=101.0)
+        self.assertEqual((state, wait), ((3.0, 101.0), 1.0))
+        state, wait = throttling.take(state, 4, capacity=5, rate=1.0, now=110.0)
+        self.assertEqual((state, wait), ((1.0, 110.0), 0.0))
+        # More than the capacity needs a full bucket
+        self.assertEqual(throttling.take(None, 50, capacity=5, rate=1.0, now=0.0)[1], 0.0)
+
+    def test_sqlite_buckets(self):
+        directory = tempfile.mkdtemp(prefix='sarb-test-throttle-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = os.path.join(directory, 'throttle.sqlite3')
+        buckets = throttling.SQLiteBuckets(path)
+        self.assertEqual(buckets.take('a', 2, 2, 1.0), 0.0)
+        self.assertGreater(throttling.SQLiteBuckets(path).take('a', 1, 2, 1.0), 0.0)
+        self.assertEqual(buckets.take('b', 1, 2, 1.0), 0.0)
+
+        with override_settings(THROTTLE_BACKEND='core.throttling.SQLiteBuckets', THROTTLE_SQLITE_PATH=path):
+            for _ in range(5):
+                self.assertEqual(self.api.get('/api/team/').status_code, 200)
+            self.assertEqual(self.api.get('/api/team/').status_code, 429)
+
+
+class SQLiteProfileTests(TestCase):
+    def test_production_options_apply_pragmas(self):
+        directory = tempfile.mkdtemp(prefix='sarb-test-sqlite-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        wrapper = SQLiteDatabaseWrapper({
+            **connection.settings_dict,
+            'NAME': os.path.join(directory, 'profile.sqlite3'),
+            'OPTIONS': settings.SQLITE_PRODUCTION_OPTIONS,
+        }, alias='sqlite-profile')
+        self.addCleanup(wrapper.close)
+
+        with wrapper.cursor() as cursor:
+            pragmas = {}
+            for pragma in ('journal_mode', 'synchronous', 'mmap_size', 'busy_timeout', 'temp_store'):
+                cursor.execute(f'PRAGMA {pragma}')
+                pragmas[pragma] = cursor.fetchone()[0]
+        self.assertEqual(pragmas['journal_mode'], 'wal')
+        self.assertEqual(pragmas['synchronous'], 1)  # NORMAL
+        self.assertEqual(pragmas['mmap_size'], 256 * 1024 * 1024)
+        self.assertEqual(pragmas['busy_timeout'], settings.SQLITE_PRODUCTION_OPTIONS['timeout'] * 1000)
+        self.assertEqual(pragmas['temp_store'], 2)  # MEMORY
+        self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+
+
+@override_settings(DATABASE_REPLICA_LAG=5)
+class ReplicaRoutingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.editor = User.objects.create_user('editor', 'editor@example.com', 'password')
+
+    def setUp(self):
+        caches['default'].clear()
+        get_cache().clear()
+        self.router = replicas.ReplicaRouter()
+
+    def serve(self, view, user=None, cookies=None):
+        request = RequestFactory().get('/')
+        request.user = user or AnonymousUser()
+        request.COOKIES.update(cookies or {})
+        return replicas.ReplicaPinningMiddleware(view)(request)
+
+    def test_reads_go_to_replica_until_the_request_writes(self):
+        routes = []
+
+        def view(request):
+            routes.append(self.router.db_for_read(Service))
+            with replicas.replica_reads():
+                routes.append(self.router.db_for_read(Service))
+                routes.append(self.router.db_for_write(Service))
+                routes.append(self.router.db_for_read(Service))
+            return HttpResponse()
+
+        response = self.serve(view)
+        self.assertEqual(routes, ['default', 'replica', 'default', 'default'])
+        self.assertEqual(response.cookies[replicas.PIN_COOKIE]['max-age'], int(settings.DATABASE_REPLICA_LAG))
+        self.assertFalse(self.router.allow_migrate('replica', 'core'))
+        self.assertTrue(self.router.allow_migrate('default', 'core'))
+
+    def test_writers_stay_on_primary(self):
+        routes = []
+
+        def read(request):
+            with replicas.replica_reads(request.user):
+                routes.append(self.router.db_for_read(Service))
+            return HttpResponse()
+
+        def write(request):
+            self.router.db_for_write(Service)
+            return HttpResponse()
+
+        self.assertNotIn(replicas.PIN_COOKIE, self.serve(read).cookies)
+        self.serve(read, cookies={replicas.PIN_COOKIE: '1'})
+        # A token client that drops the cookie is pinned by user
+        self.serve(write, user=self.admin)
+        self.serve(read, user=self.admin)
+        self.serve(read, user=self.editor)
+        self.assertEqual(routes, ['replica', 'default', 'default', 'replica'])
+
+    def test_lagging_reads_are_not_cached(self):
+        api = APIClient(HTTP_HOST='localhost')
+        get_cache().set('api-changed:core.service', True)
+        with redirect_stdout(io.StringIO()):
+            responses = [api.get('/api/services/') for _ in range(2)]
+            get_cache().delete('api-changed:core.service')
+            responses += [api.get('/api/services/') for _ in range(2)]
+        self.assertEqual([response.get('X-Cache') for response in responses], [None, None, 'MISS', 'HIT'])
+
+
+class WorkerStartupTests(TestCase):
+    def test_urlconf_does_not_import_torch(self):
+        # A fresh interpreter: this one may have imported torch already
+        code = (
+            "import sys, django; django.setup(); "
+            "from django.urls import get_resolver; get_resolver().url_patterns; "
+            "print(sorted(name for name in ('torch', 'torchvision') if name in sys.modules))"
+        )
+        process = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, capture_output=True, text=True,
+                                 env=dict(os.environ, DJANGO_SETTINGS_MODULE='backend.settings'))
+        self.assertEqual(process.returncode, 0, process.stderr)
+        self.assertEqual(process.stdout.strip().splitlines()[-1], '[]')
+
+
+class ResponseCacheTests(QueryBudgetAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = Service.objects.create(name='Vision QA', description='Inspection', icon='visibility')
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+        cache_metrics.reset()
+        self.api = APIClient(HTTP_HOST='localhost')
+        quiet = redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def get(self, path):
+        response = self.api.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_miss_then_hit(self):
+        miss = self.get('/api/services/')
+        # Only the content version lookup of the conditional GET
+        with self.assertNumQueries(1):
+            hit = self.get('/api/services/')
+        self.assertEqual((miss['X-Cache'], hit['X-Cache']), ('MISS', 'HIT'))
+        self.assertEqual(hit.content, miss.content)
+        self.assertEqual(self.get('/api/services/?page_size=1')['X-Cache'], 'MISS')
+        self.assertEqual(cache_metrics.snapshot()['service-list'], {'hits': 1, 'misses': 2, 'hit_rate': 0.3333})
+
+    def test_save_and_delete_invalidate(self):
+        url = f'/api/services/{self.service.pk}/'
+        self.get(url)
+        self.get('/api/services/')
+        self.assertEqual(self.get(url)['X-Cache'], 'HIT')
+
+        self.service.name = 'Vision QA 2'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+        response = self.get(url)
+        self.assertEqual((response['X-Cache'], response.json()['name']), ('MISS', 'Vision QA 2'))
+        self.assertEqual(self.get('/api/services/')['X-Cache'], 'MISS')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.delete()
+        self.assertEqual(self.api.get(url).status_code, 404)
+        response = self.get('/api/services/')
+        self.assertEqual((response['X-Cache'], response.json()['results']), ('MISS', []))
+
+    def test_invalidated_on_commit(self):
+        before = get_generation(Service)
+        version = ContentVersion.lookup(Service)[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.service.name = 'Vision QA 2'
+                self.service.save()
+                # A read now still sees the old row: it must not be cached
+                # under a new generation
+                self.assertEqual(get_generation(Service), before)
+                self.assertEqual(ContentVersion.lookup(Service)[0], version + 1)
+                Service.objects.filter(pk=self.service.pk).delete()
+                self.assertEqual(get_generation(Service), before)
+        self.assertGreater(get_generation(Service), before)
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.api.force_authenticate(self.admin)
+        self.assertNotIn('X-Cache', self.get('/api/services/'))
+        self.assertNotIn('X-Cache', self.get('/api/services/'))
+        self.api.force_authenticate(None)
+        self.assertEqual(self.get('/api/services/')['X-Cache'], 'MISS')
+        self.assertEqual(cache_metrics.snapshot()['service-list']['misses'], 1)
+
+    def test_stats_endpoint(self):
+        self.get('/api/services/')
+        self.get('/api/services/')
+        self.assertEqual(self.api.get('/api/cache/stats/').status_code, 403)
+        self.api.force_authenticate(self.admin)
+        response = self.assertWithinQueryBudget(self.api, 'GET', '/api/cache/stats/')
+        self.assertEqual(response.data, {'service-list': {'hits': 1, 'misses': 1, 'hit_rate': 0.5}})
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.service = Service.objects.create(name='Vision QA', description='Inspection', icon='visibility')
+
+    def setUp(self):
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+        quiet = redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def test_if_none_match_skips_the_queryset(self):
+        for url in ('/api/services/', f'/api/services/{self.service.pk}/'):
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            # Only the content version lookup
+            with self.assertNumQueries(1):
+                not_modified = self.api.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(not_modified.status_code, 304)
+            self.assertEqual(not_modified['ETag'], response['ETag'])
+            self.assertEqual(not_modified.content, b'')
+
+    def test_if_modified_since_skips_the_queryset(self):
+        response = self.api.get('/api/services/')
+        with self.assertNumQueries(1):
+            not_modified = self.api.get('/api/services/', HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_save_changes_the_etag(self):
+        etag = self.api.get('/api/services/')['ETag']
+        self.service.name = 'Vision QA 2'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.service.save()
+        response = self.api.get('/api/services/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['name'], 'Vision QA 2')
+
+    def test_etag_varies_with_the_query(self):
+        etag = self.api.get('/api/services/')['ETag']
+        self.assertEqual(self.api.get('/api/services/?page_size=1', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ResetAndPopulateTests(TestCase):
+    def setUp(self):
+        self.message = ContactMessage.objects.create(name='Ada', email='ada@example.com', message='Real enquiry')
+
+    def test_default_run_keeps_contact_messages(self):
+        Service.objects.create(name='Stale', description='Old')
+        call_command('reset_and_populate_db', stdout=StringIO())
+        self.assertFalse(Service.objects.filter(name='Stale').exists())
+        self.assertEqual(list(ContactMessage.objects.all()), [self.message])
+
+    def test_synthetic_messages_replace_existing_ones(self):
+        call_command('reset_and_populate_db', contact_messages=5, stdout=StringIO())
+        self.assertEqual(ContactMessage.objects.count(), 5)
+        self.assertFalse(ContactMessage.objects.filter(message='Real enquiry').exists())
+
+
+class PaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', services=250, contact_messages=90, stdout=StringIO())
+        # Messages sharing a timestamp are ordered by id
+        ContactMessage.objects.filter(pk__lte=30).update(created_at=datetime.datetime(2024, 6, 1, tzinfo=datetime.timezone.utc))
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+        self.api.force_authenticate(self.admin)
+        quiet = redirect_stdout(StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def get(self, path, params=None):
+        response = self.api.get(path, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_page_number_response(self):
+        page = self.get('/api/services/', {'page_size': 20, 'page': 2})
+        self.assertEqual(set(page), {'count', 'next', 'previous', 'results'})
+        self.assertEqual(page['count'], Service.objects.count())
+        self.assertEqual(len(page['results']), 20)
+        self.assertIn('page=3', page['next'])
+        self.assertIn('page_size=20', page['next'])
+        self.assertNotIn('page=', page['previous'])
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(len(self.get('/api/services/')['results']), settings.REST_FRAMEWORK['PAGE_SIZE'])
+        self.assertEqual(len(self.get('/api/services/', {'page_size': 10000})['results']), settings.API_MAX_PAGE_SIZE)
+        for invalid in ('0', '-5', 'abc'):
+            page = self.get('/api/services/', {'page_size': invalid})
+            self.assertEqual(len(page['results']), settings.REST_FRAMEWORK['PAGE_SIZE'], invalid)
+
+    def test_cursor_pages_are_stable(self):
+        page = self.get('/api/contact/', {'page_size': 25})
+        self.assertEqual(set(page), {'next', 'previous', 'results'})
+        self.assertIsNone(page['previous'])
+        first_ids = [message['id'] for message in page['results']]
+
+        ids, pages = list(first_ids), [page]
+        while page['next']:
+            # New messages arrive at the front and do not shift later pages
+            ContactMessage.objects.create(name='New', email='new@example.com', message='Hi')
+            page = self.get(page['next'])
+            pages.append(page)
+            ids += [message['id'] for message in page['results']]
+
+        expected = list(
+            ContactMessage.objects.filter(pk__lte=max(ids)).exclude(name='New')
+            .order_by('-created_at', '-id').values_list('pk', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(ids), len(set(ids)))
+
+        previous = self.get(pages[1]['previous'])
+        self.assertEqual([message['id'] for message in previous['results']], first_ids)
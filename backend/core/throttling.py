@@ -0,0 +1,164 @@
+"""
+Token-bucket throttling for the API.
+
+Each client has a bucket per scope: ``user`` keyed by user id when the
+request is authenticated, ``anon`` keyed by address otherwise. A rate of
+'300/min' in DEFAULT_THROTTLE_RATES is a bucket of 300 tokens refilled at 5
+per second. Requests take their cost out of the bucket: 1 for reads,
+API_THROTTLE_WRITE_COST for writes, or the view's ``throttle_cost`` (an int,
+or {method: cost}), which is how an agriculture analysis is priced above a
+list page. A client can spend a full bucket at once and then proceeds at the
+refill rate; when the bucket is short the request gets 429 with Retry-After
+set to when enough tokens will be back.
+
+Buckets are kept by THROTTLE_BACKEND:
+
+    core.throttling.CacheBuckets    the 'throttle' cache (local memory: per process)
+    core.throttling.SQLiteBuckets   THROTTLE_SQLITE_PATH, shared by every worker
+                                    on the host, one transaction per request
+"""
+import functools
+import math
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+CACHE_ALIAS = 'throttle'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """(capacity, tokens per second) for 'N/period', None for no limit"""
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period[0]]
+
+
+def take(state, cost, capacity, rate, now):
+    """
+    Refill the bucket ``state`` (tokens, updated), None for a full one, up to
+    ``now`` and take ``cost`` tokens out of it. Returns the new state and the
+    seconds to wait, 0 when the tokens were taken. A cost above the capacity
+    needs a full bucket.
+    """
+    tokens, updated = state if state else (capacity, now)
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+    cost = min(cost, capacity)
+    if tokens >= cost:
+        return (tokens - cost, now), 0.0
+    return (tokens, now), (cost - tokens) / rate
+
+
+class CacheBuckets:
+    """
+    Buckets in the 'throttle' cache. Updates are atomic within a process; on
+    a cache shared between processes (Redis, files) concurrent requests of
+    one client can occasionally both be admitted.
+    """
+    _lock = threading.Lock()
+
+    def take(self, key, cost, capacity, rate):
+        cache = caches[CACHE_ALIAS]
+        with self._lock:
+            state, wait = take(cache.get(key), cost, capacity, rate, time.time())
+            # Once refilled the bucket is the same as a missing entry
+            cache.set(key, state, timeout=math.ceil((capacity - state[0]) / rate) + 1)
+        return wait
+
+
+class SQLiteBuckets:
+    """
+    Buckets in a SQLite file in WAL mode, read and written under one
+    ``BEGIN IMMEDIATE`` transaction so workers never lose each other's
+    updates. Rows of refilled buckets are pruned every ``prune_every`` calls.
+    """
+    prune_every = 1000
+
+    def __init__(self, path=None):
+        self.path = path or settings.THROTTLE_SQLITE_PATH
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_bucket ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL'
+                ') WITHOUT ROWID'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS throttle_bucket_full_idx ON throttle_bucket (full_at)')
+            self._local.connection = connection
+        return connection
+
+    def take(self, key, cost, capacity, rate):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = connection.execute('SELECT tokens, updated FROM throttle_bucket WHERE key = ?', (key,)).fetchone()
+            state, wait = take(row, cost, capacity, rate, now)
+            connection.execute(
+                'INSERT INTO throttle_bucket (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, '
+                'full_at = excluded.full_at',
+                (key, *state, now + (capacity - state[0]) / rate),
+            )
+            self._calls += 1
+            if self._calls % self.prune_every == 0:
+                connection.execute('DELETE FROM throttle_bucket WHERE full_at < ?', (now,))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return wait
+
+
+@functools.lru_cache(maxsize=None)
+def _backend(path):
+    return import_string(path)()
+
+
+def get_backend():
+    return _backend(settings.THROTTLE_BACKEND)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    wait_seconds = None
+
+    def get_scope(self, request):
+        return 'user' if request.user and request.user.is_authenticated else 'anon'
+
+    def get_cost(self, request, view):
+        cost = getattr(view, 'throttle_cost', None)
+        if isinstance(cost, dict):
+            cost = cost.get(request.method)
+        if cost is None:
+            cost = 1 if request.method in SAFE_METHODS else settings.API_THROTTLE_WRITE_COST
+        return cost
+
+    def allow_request(self, request, view):
+        self.wait_seconds = None
+        if not settings.API_THROTTLE_ENABLED:
+            return True
+        scope = self.get_scope(request)
+        limit = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(scope))
+        if limit is None:
+            return True
+        ident = request.user.pk if scope == 'user' else self.get_ident(request)
+        self.wait_seconds = get_backend().take(f'throttle:{scope}:{ident}', self.get_cost(request, view), *limit)
+        return not self.wait_seconds
+
+    def wait(self):
+        return self.wait_seconds
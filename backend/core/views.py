@@ -4,7 +4,9 @@ from django.views.decorators.csrf import ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
+from rest_framework.views import APIView
+from .cache import cache_metrics
 from .models import ContactMessage
 from .serializers import ContactMessageSerializer
 
@@ -19,6 +21,13 @@ class IndexView(TemplateView):
         context['title'] = 'Sarb - AI & Computer Vision Solutions'
         return context
 
+class CacheStatsView(APIView):
+    """Response cache hits, misses and hit rate per endpoint, for this worker process"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_metrics.snapshot())
+
 class ContactMessageViewSet(viewsets.ModelViewSet):
     queryset = ContactMessage.objects.all().order_by('-created_at')
     serializer_class = ContactMessageSerializer
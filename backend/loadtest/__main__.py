@@ -0,0 +1,152 @@
+"""
+Load-test harness for the Django API.
+
+Run from backend/:
+
+    python -m loadtest --users 50 --duration 60
+    python -m loadtest --mix services=5,team=5 --users 200 --duration 30
+    python -m loadtest --url http://127.0.0.1:8000 --users 20
+
+Without ``--url`` a local server is started on a throwaway SQLite database
+seeded by ``manage.py reset_and_populate_db`` (``--case-studies`` and
+``--contact-messages`` add synthetic rows), and stopped afterwards. Each virtual
+user keeps one connection open and issues requests back to back (closed-loop),
+choosing an endpoint by scenario weight each time. Throughput and latency
+percentiles are reported per endpoint.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from .client import HTTPConnection
+from .scenarios import choose, parse_mix
+from .server import LocalServer
+
+
+class Results:
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.statuses = {}
+
+    def record(self, name, seconds, status=None, error=None):
+        if error is not None or status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        else:
+            self.latencies.setdefault(name, []).append(seconds * 1000)
+        key = status if error is None else type(error).__name__
+        counts = self.statuses.setdefault(name, {})
+        counts[key] = counts.get(key, 0) + 1
+
+    def summary(self, elapsed):
+        rows = {}
+        names = sorted(set(self.latencies) | set(self.errors))
+        for name in names + ['TOTAL']:
+            if name == 'TOTAL':
+                latencies = [value for values in self.latencies.values() for value in values]
+                errors = sum(self.errors.values())
+            else:
+                latencies = self.latencies.get(name, [])
+                errors = self.errors.get(name, 0)
+            row = {'requests': len(latencies) + errors, 'errors': errors,
+                   'rps': round(len(latencies) / elapsed, 2)}
+            if len(latencies) > 1:
+                cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+                row.update(mean_ms=round(statistics.fmean(latencies), 2), p50_ms=round(cuts[49], 2),
+                           p90_ms=round(cuts[89], 2), p95_ms=round(cuts[94], 2),
+                           p99_ms=round(cuts[98], 2), max_ms=round(max(latencies), 2))
+            if name != 'TOTAL':
+                row['statuses'] = {str(k): v for k, v in self.statuses.get(name, {}).items()}
+            rows[name] = row
+        return rows
+
+
+def print_report(summary, elapsed, users):
+    print(f"\n{users} users, {elapsed:.1f}s\n")
+    columns = ('requests', 'errors', 'rps', 'mean_ms', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms')
+    print(f"{'endpoint':<14}" + ''.join(f'{c:>10}' for c in columns))
+    for name, row in summary.items():
+        print(f"{name:<14}" + ''.join(f"{row.get(c, '-'):>10}" for c in columns))
+
+
+async def virtual_user(host, port, scenarios, results, deadline, start_delay, seed):
+    rng = random.Random(seed)
+    await asyncio.sleep(start_delay)
+    connection = HTTPConnection(host, port)
+    try:
+        while time.monotonic() < deadline:
+            scenario = choose(scenarios, rng)
+            method, path, body, headers = scenario.request(rng)
+            started = time.perf_counter()
+            try:
+                status, _ = await connection.request(method, path, body, headers)
+            except Exception as e:
+                results.record(scenario.name, time.perf_counter() - started, error=e)
+                await asyncio.sleep(0.1)
+            else:
+                results.record(scenario.name, time.perf_counter() - started, status=status)
+    finally:
+        await connection.close()
+
+
+async def run(host, port, scenarios, users, duration, ramp_up, seed):
+    results = Results()
+    started = time.monotonic()
+    deadline = started + ramp_up + duration
+    await asyncio.gather(*(
+        virtual_user(host, port, scenarios, results, deadline, ramp_up * i / users, seed + i)
+        for i in range(users)
+    ))
+    return results, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', help='Target an already running server instead of starting one')
+    parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of load after ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users start')
+    parser.add_argument('--mix', default='', help='Scenario weights, e.g. services=10,contact=1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--case-studies', type=int, default=0, help='Synthetic case studies in the local database')
+    parser.add_argument('--contact-messages', type=int, default=0, help='Synthetic contact messages in the local database')
+    parser.add_argument('--json', help='Also write the report to this JSON file')
+    args = parser.parse_args()
+
+    scenarios = parse_mix(args.mix)
+    server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        server = LocalServer()
+        server.prepare(seed_options=(
+            f'--case-studies={args.case_studies}', f'--contact-messages={args.contact_messages}', f'--seed={args.seed}',
+        ))
+        server.start()
+        host, port = '127.0.0.1', server.port
+
+    try:
+        print(f"Running {args.users} users against {host}:{port}: "
+              + ', '.join(f'{s.name}={s.weight:g}' for s in scenarios))
+        results, elapsed = asyncio.run(
+            run(host, port, scenarios, args.users, args.duration, args.ramp_up, args.seed)
+        )
+    finally:
+        if server is not None:
+            server.stop()
+
+    summary = results.summary(elapsed)
+    print_report(summary, elapsed, args.users)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'users': args.users, 'elapsed': elapsed, 'endpoints': summary}, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
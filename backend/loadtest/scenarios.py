@@ -0,0 +1,103 @@
+"""
+Load-test scenarios: one entry per endpoint, picked by weight on every step of
+a virtual user.
+"""
+import io
+import json
+import random
+import uuid
+
+from PIL import Image
+
+JSON_HEADERS = {'Content-Type': 'application/json', 'Accept': 'application/json'}
+
+
+def _leaf_jpeg():
+    """A small generated JPEG, so the analyze scenario needs no fixture files"""
+    image = Image.new('RGB', (256, 256), (70, 140, 60))
+    for x in range(0, 256, 16):
+        for y in range(0, 256, 16):
+            image.putpixel((x, y), (120, 90, 40))
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=85)
+    return buffer.getvalue()
+
+
+def _multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+        )
+    for name, (filename, content_type, content) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'.encode() + content + b'\r\n'
+        )
+    parts.append(f'--{boundary}--\r\n'.encode())
+    return b''.join(parts), {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+class Scenario:
+    def __init__(self, name, weight, build):
+        self.name = name
+        self.weight = weight
+        self.build = build
+
+    def request(self, rng):
+        """Return (method, path, body, headers) for one request"""
+        return self.build(rng)
+
+
+def _get(path):
+    return lambda rng: ('GET', path, b'', {'Accept': 'application/json'})
+
+
+def _contact(rng):
+    body = json.dumps({
+        'name': f'Load Test {rng.randrange(1_000_000)}',
+        'email': 'loadtest@example.com',
+        'company': 'Load Test Inc.',
+        'message': 'Automated load-test submission.',
+    }).encode()
+    return 'POST', '/api/contact/', body, JSON_HEADERS
+
+
+_LEAF = None
+
+
+def _analyze(rng):
+    global _LEAF
+    if _LEAF is None:
+        _LEAF = _leaf_jpeg()
+    body, headers = _multipart({'type': 'plant-disease'}, {'image': ('leaf.jpg', 'image/jpeg', _LEAF)})
+    return 'POST', '/api/agriculture/analyze/', body, headers
+
+
+SCENARIOS = {
+    'services': Scenario('services', 10, _get('/api/services/')),
+    'case-studies': Scenario('case-studies', 10, _get('/api/case-studies/')),
+    'team': Scenario('team', 6, _get('/api/team/')),
+    'contact': Scenario('contact', 2, _contact),
+    'analyze': Scenario('analyze', 1, _analyze),
+}
+
+
+def parse_mix(mix):
+    """Parse ``name=weight,...`` into a list of scenarios; '' means the defaults"""
+    if not mix:
+        return list(SCENARIOS.values())
+    selected = []
+    for item in mix.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'; choose from {', '.join(SCENARIOS)}")
+        scenario = SCENARIOS[name]
+        selected.append(Scenario(name, float(weight) if weight else scenario.weight, scenario.build))
+    return selected
+
+
+def choose(scenarios, rng=random):
+    return rng.choices(scenarios, weights=[s.weight for s in scenarios])[0]
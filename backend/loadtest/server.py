@@ -0,0 +1,76 @@
+"""
+Local stand-in for the deployed API: a throwaway SQLite database, migrated and
+seeded with ``manage.py reset_and_populate_db``, served by ``manage.py runserver``.
+"""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    def __init__(self, port=None, workdir=None):
+        self.port = port or _free_port()
+        self.workdir = workdir or tempfile.mkdtemp(prefix='sarb-loadtest-')
+        self.log_path = os.path.join(self.workdir, 'server.log')
+        self.process = None
+        self.env = dict(
+            os.environ,
+            SQLITE_PATH=os.path.join(self.workdir, 'loadtest.sqlite3'),
+            DEBUG='False',
+            ALLOWED_HOSTS='127.0.0.1,localhost',
+            PYTHONUNBUFFERED='1',
+            # Every simulated user shares one address
+            API_THROTTLE_ENABLED=os.getenv('API_THROTTLE_ENABLED', 'False'),
+        )
+
+    def _run(self, *args):
+        print(f"$ {' '.join(args)}")
+        subprocess.run([sys.executable, *args], cwd=BACKEND_DIR, env=self.env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    def prepare(self, seed_options=()):
+        """Create the schema and seed the throwaway database"""
+        self._run('manage.py', 'migrate', '--noinput')
+        self._run('manage.py', 'reset_and_populate_db', *seed_options)
+
+    def start(self, timeout=60):
+        self._log = open(self.log_path, 'w')
+        self.process = subprocess.Popen(
+            [sys.executable, 'manage.py', 'runserver', '--noreload', f'127.0.0.1:{self.port}'],
+            cwd=BACKEND_DIR, env=self.env, stdout=self._log, stderr=subprocess.STDOUT,
+        )
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f'Server exited early, see {self.log_path}')
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{self.port}/api/services/', timeout=2)
+                print(f"Server ready on 127.0.0.1:{self.port} (log: {self.log_path})")
+                return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f'Server did not become ready in {timeout}s, see {self.log_path}')
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+            self._log.close()
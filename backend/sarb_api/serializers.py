@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from core.images import ResponsiveImageField
 from core.models import Service, CaseStudy, TeamMember, ContactMessage
 
 class ServiceSerializer(serializers.ModelSerializer):
@@ -8,17 +9,21 @@ class ServiceSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at', 'updated_at']
 
 class CaseStudySerializer(serializers.ModelSerializer):
+    image_variants = ResponsiveImageField(source='image')
+
     class Meta:
         model = CaseStudy
         fields = ['id', 'title', 'slug', 'description', 'challenge', 'solution', 
-                 'results', 'image', 'client_name', 'client_industry', 
+                 'results', 'image', 'image_variants', 'client_name', 'client_industry', 
                  'created_at', 'updated_at']
         read_only_fields = ['slug', 'created_at', 'updated_at']
 
 class TeamMemberSerializer(serializers.ModelSerializer):
+    image_variants = ResponsiveImageField(source='image')
+
     class Meta:
         model = TeamMember
-        fields = ['id', 'name', 'position', 'bio', 'image', 'linkedin_url', 
+        fields = ['id', 'name', 'position', 'bio', 'image', 'image_variants', 'linkedin_url', 
                  'github_url', 'order', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
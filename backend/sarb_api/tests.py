@@ -1,3 +1,294 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+
+from core import ingest
+from core.cache import get_cache
+from core.models import ContactMessage, ContentVersion, Service, TeamMember
+from core.testing import QueryBudgetAssertionsMixin, TestCase
+
+
+def image_upload(name='photo.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (8, 8), 'white').save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class QueryBudgetTests(QueryBudgetAssertionsMixin, TestCase):
+    """Every sarb_api endpoint against a few dozen rows per table"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        media_root = tempfile.mkdtemp(prefix='sarb-test-media-')
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=media_root)
+        override.enable()
+        cls.addClassCleanup(override.disable)
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', services=30, team_members=30, contact_messages=60, stdout=io.StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        get_cache().clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+        self.admin_api = APIClient(HTTP_HOST='localhost')
+        self.admin_api.force_authenticate(self.admin)
+        # The viewsets print debugging output on every request
+        quiet = redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def assertStatus(self, response, status_code):
+        self.assertEqual(response.status_code, status_code, getattr(response, 'data', response))
+
+    def test_api_root(self):
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/'), 200)
+
+    def test_service_endpoints(self):
+        service = Service.objects.first()
+        url = f'/api/services/{service.pk}/'
+        payload = {'name': 'Vision QA', 'description': 'Inspection', 'icon': 'visibility'}
+
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/services/'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', url), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/services/search/?q=vision'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'POST', '/api/services/', payload, format='json'), 201)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PUT', url, dict(payload, name='Vision QA 2'), format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', url, {'icon': 'science'}, format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', url), 204)
+
+    def test_service_bulk_endpoints(self):
+        items = [{'name': f'Bulk service {i}', 'description': 'Bulk', 'icon': 'hub'} for i in range(20)]
+        response = self.assertWithinQueryBudget(self.admin_api, 'POST', '/api/services/bulk/', items, format='json')
+        self.assertStatus(response, 201)
+        ids = [result['data']['id'] for result in response.data['results']]
+        updates = [{'id': pk, 'icon': 'memory'} for pk in ids]
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', '/api/services/bulk/', updates, format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', '/api/services/bulk/', {'ids': ids}, format='json'), 200)
+
+    def test_team_endpoints(self):
+        member = TeamMember.objects.first()
+        url = f'/api/team/{member.pk}/'
+        payload = {'name': 'New Member', 'position': 'ML Engineer', 'bio': 'Bio', 'order': 99}
+
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', '/api/team/'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'GET', url), 200)
+        self.assertStatus(self.assertWithinQueryBudget(
+            self.admin_api, 'POST', '/api/team/', dict(payload, image=image_upload()), format='multipart'), 201)
+        self.assertStatus(self.assertWithinQueryBudget(
+            self.admin_api, 'PUT', url, dict(payload, name='Renamed'), format='multipart'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', url, {'order': 7}, format='multipart'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', url), 204)
+
+    def test_team_bulk_endpoints(self):
+        ids = list(TeamMember.objects.values_list('pk', flat=True)[:20])
+        updates = [{'id': pk, 'order': 100 + i} for i, pk in enumerate(ids)]
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', '/api/team/bulk/', updates, format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', '/api/team/bulk/', {'ids': ids}, format='json'), 200)
+
+    def test_contact_endpoints(self):
+        message = ContactMessage.objects.first()
+        url = f'/api/contact/{message.pk}/'
+        payload = {'name': 'Ada', 'email': 'ada@example.com', 'message': 'Hello'}
+
+        self.assertStatus(self.assertWithinQueryBudget(self.api, 'POST', '/api/contact/', payload, format='json'), 201)
+        response = self.assertWithinQueryBudget(self.admin_api, 'GET', '/api/contact/')
+        self.assertStatus(response, 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'GET', response.data['next']), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'GET', url), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PUT', url, payload, format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'PATCH', url, {'company': 'Acme'}, format='json'), 200)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'DELETE', url), 204)
+        self.assertStatus(self.assertWithinQueryBudget(self.admin_api, 'GET', '/api/contact/ingest/'), 200)
+
+
+class BulkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('reset_and_populate_db', stdout=io.StringIO())
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        self.api = APIClient(HTTP_HOST='localhost')
+        self.api.force_authenticate(self.admin)
+        quiet = redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def bulk(self, method, path, data):
+        return getattr(self.api, method)(path, data, format='json')
+
+    def test_one_invalid_item_writes_nothing(self):
+        items = [{'name': 'Good', 'description': 'Ok', 'icon': 'hub'}, {'name': 'Bad'}]
+        response = self.bulk('post', '/api/services/bulk/', items)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([result['status'] for result in response.data['results']], ['valid', 'invalid'])
+        self.assertIn('description', response.data['results'][1]['errors'])
+        self.assertFalse(Service.objects.filter(name='Good').exists())
+
+    def test_create_requires_files(self):
+        items = [{'name': 'No Photo', 'position': 'Engineer', 'bio': 'Bio', 'order': 1}]
+        response = self.bulk('post', '/api/team/bulk/', items)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('image', response.data['message'])
+        self.assertFalse(TeamMember.objects.filter(name='No Photo').exists())
+
+    def test_unknown_ids(self):
+        service = Service.objects.first()
+        response = self.bulk('patch', '/api/services/bulk/', [{'id': service.pk, 'icon': 'memory'}, {'id': 999999, 'icon': 'memory'}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['results'][1], {'index': 1, 'status': 'not_found', 'id': 999999})
+        service.refresh_from_db()
+        self.assertNotEqual(service.icon, 'memory')
+
+        response = self.bulk('delete', '/api/services/bulk/', {'ids': [service.pk, 999999]})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], ['deleted', 'not_found'])
+        self.assertFalse(Service.objects.filter(pk=service.pk).exists())
+
+    def test_malformed_ids(self):
+        service = Service.objects.first()
+        for items in ([{'id': {}}], [{'id': 'abc'}], [{'icon': 'memory'}], ['abc']):
+            response = self.bulk('patch', '/api/services/bulk/', items)
+            self.assertEqual(response.status_code, 400, items)
+            self.assertEqual(response.data['results'][0]['status'], 'invalid')
+        for ids in ([{}], ['abc'], [[1]], 'abc'):
+            self.assertEqual(self.bulk('delete', '/api/services/bulk/', {'ids': ids}).status_code, 400, ids)
+
+        # Numeric strings are accepted as ids
+        response = self.bulk('patch', '/api/services/bulk/', [{'id': str(service.pk), 'icon': 'memory'}])
+        self.assertEqual(response.status_code, 200)
+
+
+class ContactIngestTests(TestCase):
+    message = {'name': 'Ada', 'email': 'ada@example.com', 'company': 'Acme', 'message': 'Do you build OCR?'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix='sarb-test-ingest-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        override = override_settings(
+            CONTACT_INGEST_MODE='batched', CONTACT_INGEST_DIR=directory, CONTACT_INGEST_FLUSH_INTERVAL=0,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        self.api = APIClient(HTTP_HOST='localhost')
+        quiet = redirect_stdout(io.StringIO())
+        quiet.__enter__()
+        self.addCleanup(quiet.__exit__, None, None, None)
+
+    def post(self, **changes):
+        return self.api.post('/api/contact/', dict(self.message, **changes), format='json')
+
+    def test_acknowledged_before_stored(self):
+        with self.assertNumQueries(0):
+            response = self.post()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['email'], 'ada@example.com')
+        self.assertEqual(ingest.status()['queue_depth'], 1)
+        self.assertFalse(ContactMessage.objects.exists())
+
+        self.post(email='grace@example.com')
+        self.post(email='alan@example.com')
+        self.assertEqual(ingest.flush(), (3, 0))
+        # The submission time is kept, and the batch bumps the version once
+        stored = ContactMessage.objects.get(email='ada@example.com')
+        self.assertEqual(stored.created_at.isoformat(), response.data['created_at'])
+        self.assertEqual(ContentVersion.lookup(ContactMessage)[0], 1)
+        self.assertEqual(ingest.status()['queue_depth'], 0)
+        self.assertEqual(ingest.status()['stored'], 3)
+
+    def test_batches_of_batch_size(self):
+        for index in range(5):
+            self.post(email=f'user{index}@example.com')
+        with override_settings(CONTACT_INGEST_BATCH_SIZE=2), CaptureQueriesContext(connection) as queries:
+            self.assertEqual(ingest.flush(), (5, 0))
+        inserts = [query for query in queries if query['sql'].startswith('INSERT INTO "core_contactmessage"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(ContactMessage.objects.count(), 5)
+
+    def test_duplicates_stored_once(self):
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(self.post(message='  do you build   OCR? ').status_code, 202)
+        self.assertEqual(ingest.status()['queue_depth'], 1)
+        # Another worker, with its own cache, accepts it into the log
+        cache.clear()
+        self.post()
+        self.assertEqual(ingest.flush(), (1, 1))
+        cache.clear()
+        self.post()
+        self.assertEqual(ingest.flush(), (0, 1))
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_failed_append_is_not_a_duplicate(self):
+        with mock.patch('core.ingest.os.write', side_effect=OSError(28, 'No space left on device')):
+            with self.assertRaises(OSError):
+                ingest.enqueue(self.message)
+        self.assertEqual(ingest.status()['queue_depth'], 0)
+
+        # The client retries
+        self.assertEqual(self.post().status_code, 202)
+        self.assertEqual(ingest.status()['queue_depth'], 1)
+        self.assertEqual(ingest.flush(), (1, 0))
+
+    def test_invalidated_after_commit(self):
+        self.post()
+        outer = len(connection.savepoint_ids)
+        depths = []
+        with mock.patch('core.signals.invalidate_model', side_effect=lambda model: depths.append(len(connection.savepoint_ids))):
+            with self.captureOnCommitCallbacks(execute=True):
+                ingest.flush()
+        self.assertEqual(depths, [outer])
+
+    def test_replayed_segment_and_torn_line(self):
+        self.post()
+        ingest._rotate()
+        segment, = ingest._segments()
+        with open(segment, 'rb') as file:
+            data = file.read()
+        self.assertEqual(ingest.flush(), (1, 0))
+
+        # A crash after the commit but before the segment was deleted, and a
+        # worker killed in the middle of a write
+        with open(segment, 'wb') as file:
+            file.write(data + data[:20])
+        self.assertEqual(ingest.flush(), (0, 1))
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(ingest.status()['unreadable'], 1)
+
+    def test_status_and_command(self):
+        self.post()
+        self.assertEqual(self.api.get('/api/contact/ingest/').status_code, 403)
+        self.api.force_authenticate(self.admin)
+        response = self.api.get('/api/contact/ingest/')
+        self.assertEqual(response.data['queue_depth'], 1)
+        self.assertEqual(response.data['mode'], 'batched')
+
+        out = io.StringIO()
+        call_command('flush_contact_messages', stdout=out)
+        self.assertIn('Stored 1 messages', out.getvalue())
+        self.assertIn('queue_depth: 0', out.getvalue())
+
+    def test_direct_mode(self):
+        with override_settings(CONTACT_INGEST_MODE='direct'):
+            self.assertEqual(self.post().status_code, 201)
+        self.assertEqual(ContactMessage.objects.count(), 1)
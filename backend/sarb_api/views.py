@@ -1,5 +1,6 @@
 from django.shortcuts import render
 from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from core.models import Service, CaseStudy, TeamMember, ContactMessage
 from .serializers import (
@@ -7,9 +8,16 @@ from .serializers import (
     TeamMemberSerializer, ContactMessageSerializer
 )
 from drf_spectacular.utils import extend_schema, OpenApiParameter
+from core.cache import CachedResponseMixin
+from core import ingest
+from core.bulk import BulkModelMixin
+from core.conditional import ConditionalGetMixin
+from core.replicas import ReplicaReadMixin
+from core.pagination import CreatedAtCursorPagination
+from core.search import FullTextSearchMixin, service_index
 
 @extend_schema(tags=['services'])
-class ServiceViewSet(viewsets.ModelViewSet):
+class ServiceViewSet(ReplicaReadMixin, FullTextSearchMixin, BulkModelMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing AI/ML services.
     
@@ -27,15 +35,19 @@ class ServiceViewSet(viewsets.ModelViewSet):
         
     delete:
         Delete a service (admin only).
+
+    search:
+        Full-text search over service names and descriptions (?q=).
     """
-    queryset = Service.objects.all()
+    queryset = Service.objects.order_by('id')
     serializer_class = ServiceSerializer
+    search_index = service_index
     lookup_field = 'pk'  # Change to primary key (ID) lookup
     lookup_value_regex = r'\d+'  # Ensure only numeric IDs are accepted
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 @extend_schema(tags=['case-studies'])
-class CaseStudyViewSet(viewsets.ModelViewSet):
+class CaseStudyViewSet(ReplicaReadMixin, BulkModelMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing case studies.
     
@@ -54,13 +66,13 @@ class CaseStudyViewSet(viewsets.ModelViewSet):
     delete:
         Delete a case study (admin only).
     """
-    queryset = CaseStudy.objects.all()
+    queryset = CaseStudy.objects.order_by('id')
     serializer_class = CaseStudySerializer
     lookup_field = 'slug'
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
 @extend_schema(tags=['team'])
-class TeamMemberViewSet(viewsets.ModelViewSet):
+class TeamMemberViewSet(ReplicaReadMixin, BulkModelMixin, ConditionalGetMixin, CachedResponseMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing team members.
     
@@ -140,15 +152,16 @@ class TeamMemberViewSet(viewsets.ModelViewSet):
             )
 
 @extend_schema(tags=['contact'])
-class ContactMessageViewSet(viewsets.ModelViewSet):
+class ContactMessageViewSet(ReplicaReadMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for managing contact messages.
     
     list:
-        Get a list of all contact messages (admin only).
+        Get contact messages, newest first, a cursor page at a time (admin only).
     
     create:
-        Submit a new contact message (public).
+        Submit a new contact message (public). With CONTACT_INGEST_MODE=batched
+        the message is queued and acknowledged with 202 (core/ingest.py).
         
     retrieve:
         Get details of a specific message (admin only).
@@ -161,6 +174,7 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
     """
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    pagination_class = CreatedAtCursorPagination
 
     def get_permissions(self):
         """
@@ -191,3 +205,25 @@ class ContactMessageViewSet(viewsets.ModelViewSet):
             )
         
         return super().list(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        if not ingest.batched():
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        # Duplicates get the same answer; they are only stored once
+        entry, duplicate = ingest.enqueue(serializer.validated_data)
+        return Response(
+            {**serializer.data, 'created_at': entry['created_at'], 'is_read': False},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=False, methods=['get'], url_path='ingest')
+    def ingest_status(self, request):
+        """Queue depth and flush statistics of batched ingestion (admin only)"""
+        if not request.user.is_staff and not request.user.is_superuser:
+            return Response(
+                {"detail": "Only staff or superusers can view the ingestion status."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        return Response(ingest.status())
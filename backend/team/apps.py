@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class TeamConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'team'
+
+    def ready(self):
+        from core import media
+        from .models import TeamMember
+
+        # Shares media/team/ with core.TeamMember; tracked so that media
+        # garbage collection never deletes a photo this table still uses
+        media.track(TeamMember)